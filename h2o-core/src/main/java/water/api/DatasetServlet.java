@@ -1,8 +1,13 @@
 package water.api;
 
+import com.google.gson.Gson;
 import water.DKV;
 import water.JettyHTTPD;
+import water.fvec.Chunk;
 import water.fvec.Frame;
+import water.fvec.Vec;
+import water.parser.BufferedString;
+import water.util.PrettyPrint;
 
 import javax.servlet.ServletException;
 import javax.servlet.http.HttpServlet;
@@ -11,6 +16,16 @@ import javax.servlet.http.HttpServletResponse;
 import java.io.IOException;
 import java.io.InputStream;
 import java.io.OutputStream;
+import java.nio.ByteBuffer;
+import java.nio.ByteOrder;
+import java.nio.charset.StandardCharsets;
+import java.util.ArrayList;
+import java.util.LinkedHashMap;
+import java.util.List;
+import java.util.Map;
+import java.util.UUID;
+import java.util.zip.Deflater;
+import java.util.zip.GZIPOutputStream;
 
 /**
  */
@@ -31,6 +46,17 @@ public class DatasetServlet extends HttpServlet {
       }
 
       Frame dataset = DKV.getGet(f_name);
+      if ("columnar".equals(request.getParameter("format"))) {
+        response.setContentType(COLUMNAR_CONTENT_TYPE);
+        JettyHTTPD.setResponseStatus(response, HttpServletResponse.SC_OK);
+        OutputStream os = outputStream(request, response);
+        String row_offset = request.getParameter("row_offset");
+        String row_count = request.getParameter("row_count");
+        writeColumnar(dataset, os, row_offset == null ? 0 : Long.parseLong(row_offset),
+                      row_count == null ? -1 : Long.parseLong(row_count));
+        os.close();
+        return;
+      }
       // TODO: Find a way to determing the hex_string parameter. It should not always be false
       InputStream is = dataset.toCSV(true, use_hex);
       response.setContentType("application/octet-stream");
@@ -47,8 +73,9 @@ public class DatasetServlet extends HttpServlet {
       f_name = suggested_fname;
       response.addHeader("Content-Disposition", "attachment; filename=" + f_name);
       JettyHTTPD.setResponseStatus(response, HttpServletResponse.SC_OK);
-      OutputStream os = response.getOutputStream();
+      OutputStream os = outputStream(request, response);
       water.util.FileUtils.copyStream(is, os, 2048);
+      os.close();
     } catch (Exception e) {
       JettyHTTPD.sendErrorResponse(response, e, uri);
     } finally {
@@ -56,4 +83,133 @@ public class DatasetServlet extends HttpServlet {
     }
   }
 
+  /**
+   * The output stream of the response, compressing the data with gzip if the client accepts it (the data being mostly
+   * text, this reduces the transfer several times, at the speed of the fastest compression level).
+   */
+  private static OutputStream outputStream(HttpServletRequest request, HttpServletResponse response)
+      throws IOException {
+    String accepted = request.getHeader("Accept-Encoding");
+    if (accepted == null || !accepted.toLowerCase().contains("gzip"))
+      return response.getOutputStream();
+    response.setHeader("Content-Encoding", "gzip");
+    return new GZIPOutputStream(response.getOutputStream(), 1 << 16) {{ def.setLevel(Deflater.BEST_SPEED); }};
+  }
+
+  static final String COLUMNAR_CONTENT_TYPE = "application/x-h2o-columnar";
+  // Every stream in the columnar format starts with these bytes (the last two being the format version)
+  static final byte[] COLUMNAR_MAGIC = "H2OCOL01".getBytes(StandardCharsets.US_ASCII);
+
+  // Encodings of the column data in the columnar format
+  private static final byte ENC_FLOAT64 = 0;
+  private static final byte ENC_INT64 = 1;
+  private static final byte ENC_INT32 = 2;
+  private static final byte ENC_UTF8 = 3;
+  private static final String[] ENC_NAMES = {"float64", "int64", "int32", "utf8"};
+
+  /**
+   * Write the frame in a binary columnar layout, which clients can load directly into typed arrays without
+   * formatting and parsing any text.
+   *
+   * The stream starts with the 8 bytes "H2OCOL01", then a 4-byte big-endian length followed by a UTF-8 JSON header
+   * of that length:
+   * {"rows": N, "columns": [{"name": ..., "type": ..., "encoding": ..., "domain": [...]}, ...]}. Then come the N
+   * values of each column in turn, encoded (in little-endian byte order) as given by the column's "encoding":
+   * <ul>
+   *   <li>"float64": doubles, NaN for missing values ("real" columns, "int" columns with missing values);</li>
+   *   <li>"int64": longs ("int" columns without missing values; "time" columns as milliseconds since the epoch,
+   *       with Long.MIN_VALUE for missing values);</li>
+   *   <li>"int32": category codes into the "domain", -1 for missing values ("enum" columns);</li>
+   *   <li>"utf8": a 4-byte length (-1 for missing values) followed by that many bytes ("string", "uuid").</li>
+   * </ul>
+   * Only the rows starting at rowOffset are written, at most rowCount of them (all of them if rowCount is negative),
+   * so that clients can stream a large frame in blocks without creating a frame for each block.
+   */
+  static void writeColumnar(Frame fr, OutputStream os, long rowOffset, long rowCount) throws IOException {
+    long from = Math.min(Math.max(rowOffset, 0), fr.numRows());
+    long to = rowCount < 0 ? fr.numRows() : Math.min(fr.numRows(), from + rowCount);
+    Vec[] vecs = fr.vecs();
+    byte[] encodings = new byte[vecs.length];
+    List<Map<String, Object>> columns = new ArrayList<>();
+    for (int i = 0; i < vecs.length; i++) {
+      Vec vec = vecs[i];
+      encodings[i] = vec.isUUID() || vec.isString() ? ENC_UTF8 :
+                     vec.isCategorical() ? ENC_INT32 :
+                     vec.isTime() || (vec.isInt() && vec.naCnt() == 0) ? ENC_INT64 : ENC_FLOAT64;
+      Map<String, Object> column = new LinkedHashMap<>();
+      column.put("name", fr.name(i));
+      column.put("type", vec.isUUID() ? "uuid" :
+                         vec.isString() ? "string" :
+                         vec.isCategorical() ? "enum" :
+                         vec.isTime() ? "time" :
+                         vec.isInt() ? "int" : "real");
+      column.put("encoding", ENC_NAMES[encodings[i]]);
+      if (vec.isCategorical()) column.put("domain", vec.domain());
+      columns.add(column);
+    }
+    Map<String, Object> header = new LinkedHashMap<>();
+    header.put("rows", to - from);
+    header.put("columns", columns);
+    byte[] headerBytes = new Gson().toJson(header).getBytes(StandardCharsets.UTF_8);
+    ByteBuffer bb = ByteBuffer.allocate(1 << 16);
+    bb.put(COLUMNAR_MAGIC);
+    bb.putInt(headerBytes.length);  // big-endian
+    os.write(bb.array(), 0, bb.position());
+    os.write(headerBytes);
+    bb.clear();
+    bb.order(ByteOrder.LITTLE_ENDIAN);
+
+    BufferedString str = new BufferedString();
+    for (int i = 0; i < vecs.length && from < to; i++) {
+      Vec vec = vecs[i];
+      long[] espc = vec.espc();
+      for (int cidx = vec.elem2ChunkIdx(from); cidx < vec.nChunks() && espc[cidx] < to; cidx++) {
+        Chunk chk = vec.chunkForChunkIdx(cidx);
+        int end = (int) Math.min(chk._len, to - espc[cidx]);
+        for (int row = (int) Math.max(0, from - espc[cidx]); row < end; row++) {
+          if (bb.remaining() < 8) bb = flush(bb, os);
+          switch (encodings[i]) {
+            case ENC_FLOAT64:
+              bb.putDouble(chk.atd(row));
+              break;
+            case ENC_INT64:
+              bb.putLong(chk.isNA(row) ? Long.MIN_VALUE : chk.at8(row));
+              break;
+            case ENC_INT32:
+              bb.putInt(chk.isNA(row) ? -1 : (int) chk.at8(row));
+              break;
+            default:
+              if (chk.isNA(row)) {
+                bb.putInt(-1);
+                break;
+              }
+              byte[] bytes;
+              int off, len;
+              if (vec.isUUID()) {
+                bytes = PrettyPrint.uuid(new UUID(chk.at16h(row), chk.at16l(row))).getBytes(StandardCharsets.UTF_8);
+                off = 0;
+                len = bytes.length;
+              } else {
+                chk.atStr(str, row);
+                bytes = str.getBuffer();
+                off = str.getOffset();
+                len = str.length();
+              }
+              bb.putInt(len);
+              if (bb.remaining() < len) bb = flush(bb, os);
+              if (bb.remaining() < len) os.write(bytes, off, len);  // longer than the whole buffer
+              else bb.put(bytes, off, len);
+          }
+        }
+      }
+    }
+    flush(bb, os);
+  }
+
+  private static ByteBuffer flush(ByteBuffer bb, OutputStream os) throws IOException {
+    os.write(bb.array(), 0, bb.position());
+    bb.clear();
+    return bb;
+  }
+
 }
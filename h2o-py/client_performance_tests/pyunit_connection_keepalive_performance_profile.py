@@ -0,0 +1,41 @@
+from __future__ import print_function
+
+import sys
+import time
+
+sys.path.insert(1,"../../")
+import h2o
+import requests
+from tests import pyunit_utils
+from h2o.backend import H2OConnection
+
+# This test measures the round-trip latency of many tiny REST calls, comparing a brand-new connection per request
+# (what H2OConnection used to do via the module-level requests.request) with the pooled keep-alive session.  This
+# test should not be run on Jenkins: it makes tens of thousands of requests.
+
+def connection_keepalive_profile():
+  num_calls = 10000
+  conn = h2o.connection()
+  url = conn.base_url + "/3/Jobs"
+
+  def timeit(fn):
+    start = time.time()
+    for _ in range(num_calls):
+      fn()
+    return (time.time() - start) * 1000.0 / num_calls
+
+  unpooled_ms = timeit(lambda: requests.request("GET", url, verify=False).json())
+  no_keepalive = H2OConnection.open(url=conn.base_url, verbose=False, keep_alive=False)
+  no_keepalive_ms = timeit(lambda: no_keepalive.request("GET /3/Jobs"))
+  pooled_ms = timeit(lambda: conn.request("GET /3/Jobs"))
+
+  print("Average latency of GET /3/Jobs over {0} calls:".format(num_calls))
+  print("  requests.request (no session):  {0:.3f} ms".format(unpooled_ms))
+  print("  H2OConnection, keep_alive=False: {0:.3f} ms".format(no_keepalive_ms))
+  print("  H2OConnection, pooled session:   {0:.3f} ms".format(pooled_ms))
+  sys.stdout.flush()
+
+if __name__ == "__main__":
+  pyunit_utils.standalone_test(connection_keepalive_profile)
+else:
+  connection_keepalive_profile()
@@ -0,0 +1,61 @@
+from __future__ import print_function
+
+import sys
+import time
+
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+from h2o.expr import ExprNode
+
+# This test measures the client-side cost of serialising very deep and very wide lazy expression DAGs into Rapids
+# strings.  The serialisation time should grow linearly with the number of nodes, and DAGs far deeper than the Python
+# recursion limit must serialise without errors.  This test should not be run on Jenkins.
+
+def deep_chain(src, nnodes):
+  expr = src._ex
+  for i in range(nnodes):
+    expr = ExprNode("ifelse", expr, i, 0)
+  return expr
+
+def wide_tree(src, nnodes):
+  level = [ExprNode("+", src._ex, i) for i in range(nnodes // 2)]
+  while len(level) > 1:
+    level = [ExprNode("cbind", *level[i:i + 2]) for i in range(0, len(level), 2)]
+  return level[0]
+
+def time_serialisation(expr):
+  start = time.time()
+  exec_str = expr._get_ast_str(False)
+  return (time.time() - start) * 1000.0, len(exec_str)
+
+def updated_columns(src, nupdates):
+  fr = src[:, :]
+  start = time.time()
+  for i in range(nupdates):
+    fr[0] = fr[0].ifelse(i, 0)
+  build_ms = (time.time() - start) * 1000.0
+  start = time.time()
+  ExprNode.rapids(fr._ex._get_ast_str(True))
+  return build_ms, (time.time() - start) * 1000.0
+
+def expr_deep_dag_profile():
+  src = h2o.H2OFrame(list(range(100)))
+  results = []
+  for nnodes in [1000, 10000, 100000]:
+    for shape, build in [("deep", deep_chain), ("wide", wide_tree)]:
+      ms, nchars = time_serialisation(build(src, nnodes))
+      results.append((shape, nnodes, nchars, ms))
+
+  print("shape   DAG nodes   Rapids chars   serialisation time")
+  for shape, nnodes, nchars, ms in results:
+    print("{0:<5}  {1:>10}  {2:>13}  {3:>16.3f} ms".format(shape, nnodes, nchars, ms))
+
+  build_ms, run_ms = updated_columns(src, 2000)
+  print("2000 chained column updates: built in {0:.3f} ms, serialised and evaluated in {1:.3f} ms".format(build_ms, run_ms))
+  sys.stdout.flush()
+
+if __name__ == "__main__":
+  pyunit_utils.standalone_test(expr_deep_dag_profile)
+else:
+  expr_deep_dag_profile()
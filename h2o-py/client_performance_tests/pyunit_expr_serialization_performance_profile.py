@@ -0,0 +1,47 @@
+from __future__ import print_function
+
+import sys
+import time
+
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+from h2o.expr import ExprNode
+
+# This test measures the client-side cost of serialising large lazy expression DAGs into Rapids strings, both with an
+# empty interpreter and with millions of live Python objects on the heap.  Deciding which nodes become temporaries
+# must not depend on the size of the heap.  This test should not be run on Jenkins.
+
+def build_dag(fr, nops):
+  for i in range(nops):
+    fr = (fr + i) * 0.5 if i % 2 else fr.ifelse(fr, fr - 1)
+  return fr
+
+def time_serialisation(src, nops, repeats):
+  elapsed = 0.0
+  for _ in range(repeats):
+    dag = build_dag(src, nops)
+    start = time.time()
+    exec_str = dag._ex._get_ast_str(True)
+    elapsed += time.time() - start
+    ExprNode.rapids(exec_str)  # keep the temporaries created by the serialisation consistent with the cluster
+  return elapsed * 1000.0 / repeats
+
+def expr_serialization_profile():
+  src = h2o.H2OFrame(list(range(100)))
+  results = []
+  for heap_size in [0, 1000000, 5000000]:
+    heap = [{"i": i} for i in range(heap_size)]
+    for nops in [50, 200]:
+      results.append((heap_size, nops, time_serialisation(src, nops, 5)))
+    del heap
+
+  print("heap objects      DAG ops   serialisation time")
+  for heap_size, nops, ms in results:
+    print("{0:>12}  {1:>10}  {2:>14.3f} ms".format(heap_size, nops, ms))
+  sys.stdout.flush()
+
+if __name__ == "__main__":
+  pyunit_utils.standalone_test(expr_serialization_profile)
+else:
+  expr_serialization_profile()
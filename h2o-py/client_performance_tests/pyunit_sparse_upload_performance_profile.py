@@ -0,0 +1,84 @@
+from __future__ import print_function
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+import numpy as np
+import scipy.sparse as sp
+from h2o.job import H2OJob
+from h2o.utils.shared_utils import _encode_svmlight
+
+# This test compares the upload of scipy sparse matrices through the CSR-based SVMLight encoder with the previous
+# implementation, which sorted the (row, column, value) tuples of sp.find() and wrote them token by token into a
+# temporary file.  Both the encoding alone and the complete upload (including the parse) are timed.  This test should
+# not be run on Jenkins.
+
+def write_svmlight_by_tuples(matrix, path):
+  with open(path, "wt") as out:
+    data = list(zip(*sp.find(matrix)))
+    data.sort()
+    idata = 0
+    for irow in range(matrix.shape[0]):
+      if idata < len(data) and data[idata][0] == irow and data[idata][1] == 0:
+        y = data[idata][2]
+        idata += 1
+      else:
+        y = 0
+      out.write(str(y))
+      while idata < len(data) and data[idata][0] == irow:
+        out.write(" ")
+        out.write(str(data[idata][1]))
+        out.write(":")
+        out.write(str(data[idata][2]))
+        idata += 1
+      out.write("\n")
+
+def upload_by_tuples(matrix):
+  tmp_handle, tmp_path = tempfile.mkstemp(suffix=".svmlight")
+  os.close(tmp_handle)
+  write_svmlight_by_tuples(matrix, tmp_path)
+  rawkey = h2o.api("POST /3/PostFile", filename=tmp_path)["destination_frame"]
+  os.remove(tmp_path)
+  job = H2OJob(h2o.api("POST /3/ParseSVMLight", data={"source_frames": [rawkey]}), "Parse").poll()
+  h2o.get_frame(job.dest_key)  # fetches the frame's summary, as H2OFrame() does
+
+def random_matrix(nrows, ncols, nnz):
+  rng = np.random.RandomState(42)
+  return sp.coo_matrix((rng.rand(nnz), (rng.randint(0, nrows, nnz), rng.randint(0, ncols, nnz))),
+                       shape=(nrows, ncols)).tocsr()
+
+def timed(fun):
+  start = time.time()
+  fun()
+  elapsed = time.time() - start
+  h2o.remove_all()  # the parse slows down as the memory of the cluster fills up
+  return elapsed
+
+def sparse_upload_profile():
+  results = []
+  for nrows, ncols, nnz in [(10000, 1000, 100000), (100000, 10000, 1000000), (300000, 50000, 3000000)]:
+    matrix = random_matrix(nrows, ncols, nnz)
+    tmp_handle, tmp_path = tempfile.mkstemp(suffix=".svmlight")
+    os.close(tmp_handle)
+    old_encode = timed(lambda: write_svmlight_by_tuples(matrix, tmp_path))
+    os.remove(tmp_path)
+    new_encode = timed(lambda: sum(len(block) for block in _encode_svmlight(matrix)))
+    old_upload = timed(lambda: upload_by_tuples(matrix))
+    new_upload = timed(lambda: h2o.H2OFrame(matrix))
+    results.append((matrix.nnz, old_encode, new_encode, old_upload, new_upload))
+
+  print("   non-zeros   encode: tuples       CSR     upload: tuples       CSR")
+  for nnz, old_encode, new_encode, old_upload, new_upload in results:
+    print("{0:>12}  {1:>14.3f}s  {2:>8.3f}s  {3:>14.3f}s  {4:>8.3f}s"
+          .format(nnz, old_encode, new_encode, old_upload, new_upload))
+  sys.stdout.flush()
+
+if __name__ == "__main__":
+  pyunit_utils.standalone_test(sparse_upload_profile)
+else:
+  sparse_upload_profile()
@@ -10,18 +10,20 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 from h2o.h2o import (connect, init, api, connection,
                      lazy_import, upload_file, import_file, import_sql_table, import_sql_select,
-                     parse_setup, parse_raw, assign, deep_copy, get_model, get_grid, get_frame,
+                     parse_setup, parse_raw, save_parse_template, assign, deep_copy, get_model, get_grid, get_frame,
                      show_progress, no_progress, log_and_echo, remove, remove_all, rapids,
                      ls, frame, frames, create_frame,
                      download_pojo, download_csv, download_all_logs, save_model, load_model, export_file,
                      cluster_status, cluster_info, shutdown, network_test, cluster,
                      interaction, as_list,
                      get_timezone, set_timezone, list_timezones,
-                     load_dataset, demo, make_metrics)
+                     load_dataset, demo, make_metrics, evaluate, deferred_evaluation, scope,
+                     enable_upload_cache, disable_upload_cache, enable_training_cache, disable_training_cache)
 # We have substantial amount of code relying on h2o.H2OFrame to exist. Thus, we make this class available from
 # root h2o module, without exporting it explicitly. In the future this import may be removed entirely, so that
 # one would have to import it from h2o.frames.
 from h2o.frame import H2OFrame  # NOQA
+from h2o.executor import ModelExecutor
 
 __version__ = "SUBST_PROJECT_VERSION"
 
@@ -31,4 +33,6 @@ __all__ = ("connect", "init", "api", "connection", "upload_file", "lazy_import",
            "show_progress", "no_progress", "log_and_echo", "remove", "remove_all", "rapids", "ls", "frame",
            "frames", "download_pojo", "download_csv", "download_all_logs", "save_model", "load_model", "export_file",
            "cluster_status", "cluster_info", "shutdown", "create_frame", "interaction", "as_list", "network_test",
-           "set_timezone", "get_timezone", "list_timezones", "demo", "make_metrics", "cluster", "load_dataset")
+           "set_timezone", "get_timezone", "list_timezones", "demo", "make_metrics", "cluster", "load_dataset",
+           "evaluate", "deferred_evaluation", "scope", "enable_upload_cache", "disable_upload_cache",
+           "save_parse_template", "ModelExecutor", "enable_training_cache", "disable_training_cache")
@@ -0,0 +1,373 @@
+# -*- encoding: utf-8 -*-
+"""
+Asyncio interface to the H2O REST API.
+
+This module allows many independent requests to be in flight at the same time, which is useful for orchestration
+scripts that need to fetch lots of models / frames or monitor many jobs concurrently::
+
+    import asyncio
+    import h2o.aio
+
+    async def fetch_all(model_ids):
+        return await asyncio.gather(*[h2o.aio.get_model(mid) for mid in model_ids])
+
+    models = asyncio.get_event_loop().run_until_complete(fetch_all(ids))
+
+The asynchronous connection is built on top of the regular connection established with :func:`h2o.connect` /
+:func:`h2o.init`: it talks to the same server, uses the same session id and credentials, and decodes the responses
+in exactly the same way as :meth:`H2OConnection.request <h2o.backend.H2OConnection.request>`. The HTTP protocol is
+implemented with the standard ``asyncio`` streams, so no additional dependencies are needed.
+
+This module requires Python 3.5 or newer, and is not imported by ``import h2o``.
+
+:copyright: (c) 2016 H2O.ai
+:license:   Apache License Version 2.0 (see LICENSE for details)
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import asyncio
+import base64
+import json as jsonlib
+import ssl
+import sys
+import time
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+import h2o
+from h2o.h2o import _check_connection, _model_from_json
+from h2o.backend.connection import H2OConnection
+from h2o.exceptions import H2OConnectionError, H2OResponseError, H2OValueError
+from h2o.frame import H2OFrame
+from h2o.job import H2OJob
+from h2o.utils.typechecks import assert_is_type, assert_matches, assert_satisfies
+
+__all__ = ("H2OAsyncConnection", "api", "close", "connection", "get_frame", "get_model", "poll_job")
+
+
+class H2OAsyncConnection(object):
+    """
+    Asynchronous counterpart of :class:`H2OConnection <h2o.backend.H2OConnection>`.
+
+    The connection keeps a pool of at most ``max_connections`` keep-alive HTTP connections to the server; requests
+    issued while all of them are busy will wait for one to become available.
+    """
+
+    def __init__(self, conn=None, max_connections=10):
+        """
+        Create a new asynchronous connection.
+
+        :param conn: the :class:`H2OConnection` to mirror (default is the current connection, :func:`h2o.connection`).
+        :param max_connections: maximum number of requests that may be in flight simultaneously.
+        """
+        if conn is None: conn = h2o.connection()
+        assert_is_type(conn, H2OConnection)
+        assert_is_type(max_connections, int)
+        assert_satisfies(max_connections, max_connections >= 1)
+        if conn.base_url is None:
+            raise H2OConnectionError("Connection not initialized; run h2o.connect() first.")
+        if getattr(conn, "_proxies"):
+            raise H2OValueError("Asynchronous connections through a proxy are not supported.")
+        auth = getattr(conn, "_auth")
+        if auth is not None and not isinstance(auth, tuple):
+            raise H2OValueError("Only (username, password) authentication is supported by asynchronous connections.")
+        parts = urlsplit(conn.base_url)
+        self._conn = conn
+        self._host = parts.hostname
+        self._port = parts.port
+        self._ssl = None
+        if parts.scheme == "https":
+            self._ssl = ssl.create_default_context()
+            if not getattr(conn, "_verify_ssl_cert"):
+                self._ssl.check_hostname = False
+                self._ssl.verify_mode = ssl.CERT_NONE
+        self._context_path = parts.path.rstrip("/")
+        self._authorization = None
+        if auth is not None:
+            token = base64.b64encode(("%s:%s" % auth).encode("utf-8")).decode("ascii")
+            self._authorization = "Basic " + token
+        self._max_connections = max_connections
+        self._semaphore = None  # created lazily, since it must be bound to the running event loop
+        self._loop = None
+        self._idle = []         # idle keep-alive (reader, writer) pairs
+
+
+    @property
+    def session_id(self):
+        """Session id of the connection; this is the same session as the one of the underlying H2OConnection."""
+        return self._conn.session_id
+
+    @property
+    def base_url(self):
+        """Base URL of the server, without trailing ``"/"``."""
+        return self._conn.base_url
+
+
+    async def request(self, endpoint, data=None, json=None):
+        """
+        Perform a REST API request to the backend H2O server.
+
+        This is a coroutine with the same semantics as :meth:`H2OConnection.request`, except that file uploads and
+        downloads (``filename`` / ``save_to``) are not supported.
+
+        :param endpoint: (str) The endpoint's URL, for example "GET /4/schemas/KeyV4"
+        :param data: data payload for POST (and sometimes GET) requests.
+        :param json: also data payload, but it will be sent as a JSON body. Cannot be used together with `data`.
+
+        :returns: an H2OResponse object representing the server's response.
+        :raises H2OConnectionError: if the H2O server cannot be reached
+        :raises H2OServerError: if there was a server error (http 500), or server returned malformed JSON
+        :raises H2OResponseError: if the server returned an H2OErrorV3 response
+        """
+        assert_is_type(endpoint, str)
+        match = assert_matches(str(endpoint), r"^(GET|POST|PUT|DELETE|PATCH|HEAD) (/.*)$")
+        method = match.group(1)
+        urltail = match.group(2)
+        if data is not None:
+            assert_is_type(data, dict)
+            assert_is_type(json, None, "Argument `json` should be None when `data` is used.")
+        elif json is not None:
+            assert_is_type(json, dict)
+
+        data = H2OConnection._prepare_data_payload(data)
+        params = None
+        if method == "GET" and data:
+            params = data
+            data = None
+        path = self._context_path + urltail
+        if params:
+            path += ("&" if "?" in path else "?") + urlencode(params)
+
+        headers = {"User-Agent": "H2O Python client/" + sys.version.replace("\n", ""),
+                   "Host": "%s:%d" % (self._host, self._port),
+                   "Accept-Encoding": "identity",
+                   "Connection": "keep-alive"}
+        if getattr(self._conn, "_cluster_id") is not None:
+            headers["X-Cluster"] = getattr(self._conn, "_cluster_id")
+        cookies = getattr(self._conn, "_cookies")
+        if cookies:
+            headers["Cookie"] = ";".join(cookies) if isinstance(cookies, list) else cookies
+        if self._authorization:
+            headers["Authorization"] = self._authorization
+        body = b""
+        if data:
+            body = urlencode(data).encode("utf-8")
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        elif json is not None:
+            body = jsonlib.dumps(json).encode("utf-8")
+            headers["Content-Type"] = "application/json"
+        if body or method in {"POST", "PUT", "PATCH"}:
+            headers["Content-Length"] = str(len(body))
+
+        start_time = time.time()
+        timeout = self._conn.timeout_interval
+        try:
+            getattr(self._conn, "_log_start_transaction")(endpoint, data, json, None, params)
+            coro = self._roundtrip(method, path, headers, body)
+            resp = await (coro if timeout is None else asyncio.wait_for(coro, timeout))
+        except asyncio.TimeoutError as e:
+            getattr(self._conn, "_log_end_exception")(e)
+            raise H2OConnectionError("Timeout after %.3fs" % (time.time() - start_time))
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            getattr(self._conn, "_log_end_exception")(e)
+            raise H2OConnectionError("Unexpected HTTP error: %s" % e)
+
+        getattr(self._conn, "_log_end_transaction")(start_time, resp)
+        resp.url = self.base_url + urltail
+        try:
+            return H2OConnection._process_response(resp, None)
+        except H2OResponseError as e:
+            err = e.args[0]
+            err.endpoint = endpoint
+            err.payload = (data, json, None, params)
+            raise
+
+
+    async def close(self):
+        """Close all idle HTTP connections. The object may still be used afterwards (new connections get opened)."""
+        idle, self._idle = self._idle, []
+        for _, writer in idle:
+            writer.close()
+
+
+    #-------------------------------------------------------------------------------------------------------------------
+    # PRIVATE
+    #-------------------------------------------------------------------------------------------------------------------
+
+    async def _roundtrip(self, method, path, headers, body):
+        """Send a single HTTP request and read the response, reusing an idle connection when possible."""
+        loop = asyncio.get_event_loop()
+        if self._loop is not loop:
+            # Streams and semaphores cannot be shared across event loops
+            self._loop = loop
+            self._idle = []
+            self._semaphore = asyncio.Semaphore(self._max_connections)
+        head = "%s %s HTTP/1.1\r\n" % (method, path)
+        head += "".join("%s: %s\r\n" % kv for kv in headers.items()) + "\r\n"
+        payload = head.encode("latin-1") + body
+
+        async with self._semaphore:
+            while True:
+                reused = bool(self._idle)
+                if reused:
+                    reader, writer = self._idle.pop()
+                else:
+                    reader, writer = await asyncio.open_connection(self._host, self._port, ssl=self._ssl)
+                try:
+                    writer.write(payload)
+                    await writer.drain()
+                    resp, keep_alive = await self._read_response(reader, method)
+                except (OSError, asyncio.IncompleteReadError):
+                    writer.close()
+                    if reused: continue  # the server may have dropped an idle connection; retry with a fresh one
+                    raise
+                except BaseException:
+                    writer.close()
+                    raise
+                if keep_alive:
+                    self._idle.append((reader, writer))
+                else:
+                    writer.close()
+                return resp
+
+
+    @staticmethod
+    async def _read_response(reader, method):
+        """Parse an HTTP/1.1 response into a ``requests.Response`` object; also return whether to keep-alive."""
+        status_line = (await reader.readline()).decode("latin-1").rstrip("\r\n")
+        if not status_line:
+            raise asyncio.IncompleteReadError(b"", None)
+        parts = status_line.split(" ", 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise ValueError("Malformed HTTP status line: %r" % status_line)
+        version = parts[0]
+        status_code = int(parts[1])
+        headers = CaseInsensitiveDict()
+        while True:
+            line = (await reader.readline()).decode("latin-1").rstrip("\r\n")
+            if not line: break
+            name, _, value = line.partition(":")
+            name = name.strip()
+            value = value.strip()
+            headers[name] = headers[name] + ", " + value if name in headers else value
+
+        connection_hdr = headers.get("Connection", "").lower()
+        keep_alive = connection_hdr != "close" and (version != "HTTP/1.0" or connection_hdr == "keep-alive")
+        if method == "HEAD" or status_code in {204, 304} or 100 <= status_code < 200:
+            content = b""
+        elif "chunked" in headers.get("Transfer-Encoding", "").lower():
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";", 1)[0].strip(), 16)
+                if size == 0: break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            while (await reader.readline()).strip():
+                pass  # skip trailers
+            content = b"".join(chunks)
+        elif "Content-Length" in headers:
+            content = await reader.readexactly(int(headers["Content-Length"]))
+        else:
+            content = await reader.read()
+            keep_alive = False
+
+        resp = requests.Response()
+        resp.status_code = status_code
+        resp.reason = parts[2] if len(parts) > 2 else ""
+        resp.headers = headers
+        resp.encoding = get_encoding_from_headers(headers)
+        resp._content = content
+        return resp, keep_alive
+
+
+
+
+#-----------------------------------------------------------------------------------------------------------------------
+# Module-level API, mirroring the synchronous h2o.api(), h2o.get_model(), etc.
+#-----------------------------------------------------------------------------------------------------------------------
+
+_aconn = None  # type: H2OAsyncConnection
+
+def connection():
+    """Return the :class:`H2OAsyncConnection` mirroring the current :func:`h2o.connection`, creating it if needed."""
+    global _aconn
+    _check_connection()
+    if _aconn is None or getattr(_aconn, "_conn") is not h2o.connection():
+        _aconn = H2OAsyncConnection(h2o.connection())
+    return _aconn
+
+
+async def close():
+    """Close idle HTTP connections of the default asynchronous connection."""
+    if _aconn is not None:
+        await _aconn.close()
+
+
+async def api(endpoint, data=None, json=None):
+    """
+    Perform a REST API request to a previously connected server, asynchronously.
+
+    This is the awaitable version of :func:`h2o.api`.
+    """
+    return await connection().request(endpoint, data=data, json=json)
+
+
+async def poll_job(job, poll_interval=0.2):
+    """
+    Wait until the job finishes, without blocking the event loop.
+
+    This is the awaitable version of :meth:`H2OJob.poll <h2o.job.H2OJob.poll>`; no progress bar is displayed.
+
+    :param H2OJob job: the job to wait for.
+    :param poll_interval: number of seconds between consecutive status queries.
+    :returns: the same ``job`` object, now completed.
+    :raises H2OJobCancelled: if the job was cancelled.
+    :raises EnvironmentError: if the job has failed.
+    """
+    assert_is_type(job, H2OJob)
+    while True:
+        job._update_from_json(await api("GET /3/Jobs/%s" % job.job_key))
+        if job.status not in {"CREATED", "RUNNING"}: break
+        await asyncio.sleep(poll_interval)
+    job._check_completion()
+    return job
+
+
+async def get_frame(frame_id, rows=10):
+    """
+    Retrieve an existing H2OFrame from the H2O cluster, asynchronously.
+
+    This is the awaitable version of :meth:`H2OFrame.get_frame <h2o.H2OFrame.get_frame>`.
+
+    :param str frame_id: id of the frame to retrieve.
+    :param int rows: number of rows of data to pre-fetch into the frame's cache.
+    :returns: an existing H2OFrame with the id provided; or None if such frame doesn't exist.
+    """
+    assert_is_type(frame_id, str)
+    try:
+        res = (await api("GET /3/Frames/%s" % frame_id, data={"row_count": rows}))["frames"][0]
+    except EnvironmentError:
+        return None
+    fr = H2OFrame()
+    fr._ex._cache._id = frame_id
+    fr._ex._cache._fill_from_frame_json(res, rows)
+    return fr
+
+
+async def get_model(model_id):
+    """
+    Load a model from the server, asynchronously.
+
+    This is the awaitable version of :func:`h2o.get_model`. Unlike the latter, it fetches the whole model at once,
+    heavy sections included (through this asynchronous connection): the sections that :func:`h2o.get_model` leaves
+    out are fetched when first accessed, with blocking requests that would stall the event loop.
+
+    :param model_id: The model identification in H2O
+    :returns: Model object, a subclass of H2OEstimator
+    """
+    assert_is_type(model_id, str)
+    model_json = (await api("GET /3/Models/%s" % model_id))["models"][0]
+    return _model_from_json(model_id, model_json)
@@ -15,14 +15,19 @@ Class for communication with an H2O server.
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import atexit
+import itertools
 import os
 import re
 import sys
 import tempfile
 import time
+import uuid
+import zlib
+from types import GeneratorType
 from warnings import warn
 
 import requests
+from requests.adapters import DEFAULT_POOLSIZE, HTTPAdapter
 from requests.auth import AuthBase
 
 from h2o.backend import H2OCluster, H2OLocalServer
@@ -31,7 +36,7 @@ from h2o.schemas.error import H2OErrorV3, H2OModelBuilderErrorV3
 from h2o.two_dim_table import H2OTwoDimTable
 from h2o.utils.backward_compatibility import backwards_compatible, CallableString
 from h2o.utils.compatibility import *  # NOQA
-from h2o.utils.shared_utils import stringify_list, print2
+from h2o.utils.shared_utils import _COMPRESSED_MAGICS, stringify_list, print2
 from h2o.utils.typechecks import (assert_is_type, assert_matches, assert_satisfies, is_type, numeric)
 from h2o.model.metrics_base import (H2ORegressionModelMetrics, H2OClusteringModelMetrics, H2OBinomialModelMetrics,
                                     H2OMultinomialModelMetrics, H2OAutoEncoderModelMetrics)
@@ -63,13 +68,16 @@ class H2OConnectionConf(object):
         self._auth = None
         self._cookies = None
         self._verbose = True
+        self._pool_connections = None
+        self._pool_maxsize = None
+        self._keep_alive = True
         # Fill from config if it is specified
         if config is not None:
             self._fill_from_config(config)
 
     """List of allowed property names exposed by this class"""
     allowed_properties = ["ip", "port", "https", "context_path", "verify_ssl_certificates",
-                          "proxy", "auth", "cookies", "verbose"]
+                          "proxy", "auth", "cookies", "verbose", "pool_connections", "pool_maxsize", "keep_alive"]
     
     def _fill_from_config(self, config):
         """
@@ -167,6 +175,33 @@ class H2OConnectionConf(object):
         assert_is_type(value, bool)
         self._verbose = value
 
+    @property
+    def pool_connections(self):
+        return self._pool_connections
+
+    @pool_connections.setter
+    def pool_connections(self, value):
+        assert_is_type(value, int, None)
+        self._pool_connections = value
+
+    @property
+    def pool_maxsize(self):
+        return self._pool_maxsize
+
+    @pool_maxsize.setter
+    def pool_maxsize(self, value):
+        assert_is_type(value, int, None)
+        self._pool_maxsize = value
+
+    @property
+    def keep_alive(self):
+        return self._keep_alive
+
+    @keep_alive.setter
+    def keep_alive(self, value):
+        assert_is_type(value, bool)
+        self._keep_alive = value
+
     @property
     def url(self):
         if self.https:
@@ -208,14 +243,22 @@ class H2OConnection(backwards_compatible()):
     """
     url_pattern = r"^(https?)://((?:[\w-]+\.)*[\w-]+):(\d+)/?((/[\w-]+)+)?$"
 
+    """Maximum number of temporaries queued by :meth:`defer_removal` before they are removed from the server."""
+    removal_batch_size = 1000
+
+    """Maximum time (in seconds) a temporary queued by :meth:`defer_removal` waits before it is removed."""
+    removal_delay = 5.0
+
     @staticmethod
     def open(server=None, url=None, ip=None, port=None, https=None, auth=None, verify_ssl_certificates=True,
-             proxy=None, cookies=None, verbose=True, _msgs=None):
+             proxy=None, cookies=None, verbose=True, pool_connections=None, pool_maxsize=None, keep_alive=True,
+             _msgs=None):
         r"""
         Establish connection to an existing H2O server.
 
-        The connection is not kept alive, so what this method actually does is it attempts to connect to the
-        specified server, and checks that the server is healthy and responds to REST API requests. If the H2O server
+        What this method actually does is it attempts to connect to the specified server, and checks that the server
+        is healthy and responds to REST API requests. All subsequent requests are sent through a pooled HTTP
+        session, so that the underlying TCP (and TLS) connections are reused between calls. If the H2O server
         cannot be reached, an :class:`H2OConnectionError` will be raised. On success this method returns a new
         :class:`H2OConnection` object, and it is the only "official" way to create instances of this class.
 
@@ -246,6 +289,12 @@ class H2OConnection(backwards_compatible()):
             that warning and use proxy from the environment, pass ``proxy="(default)"``.
         :param cookies: Cookie (or list of) to add to requests
         :param verbose: if True, then connection progress info will be printed to the stdout.
+        :param pool_connections: number of per-host connection pools to cache (default is the requests module's
+            default of 10).
+        :param pool_maxsize: maximum number of connections kept open to a single host (default 10). Raise this if
+            you make requests to the server from many threads at once.
+        :param keep_alive: if False, then every request will ask the server to close the connection afterwards,
+            i.e. connections will not be reused (default True).
         :param _msgs: custom messages to display during connection. This is a tuple (initial message, success message,
             failure message).
 
@@ -291,6 +340,9 @@ class H2OConnection(backwards_compatible()):
         assert_is_type(proxy, str, None)
         assert_is_type(auth, AuthBase, (str, str), None)
         assert_is_type(cookies, str, [str], None)
+        assert_is_type(pool_connections, int, None)
+        assert_is_type(pool_maxsize, int, None)
+        assert_is_type(keep_alive, bool)
         assert_is_type(_msgs, None, (str, str, str))
 
         conn = H2OConnection()
@@ -310,6 +362,8 @@ class H2OConnection(backwards_compatible()):
                 if name.lower() == scheme + "_proxy":
                     warn("Proxy is defined in the environment: %s. "
                          "This may interfere with your H2O Connection." % os.environ[name])
+        conn._session = H2OConnection._make_session(pool_connections, pool_maxsize, keep_alive)
+        conn._pool_maxsize = pool_maxsize or DEFAULT_POOLSIZE
 
         try:
             retries = 20 if server else 5
@@ -330,7 +384,7 @@ class H2OConnection(backwards_compatible()):
         return conn
 
 
-    def request(self, endpoint, data=None, json=None, filename=None, save_to=None):
+    def request(self, endpoint, data=None, json=None, filename=None, save_to=None, stream=False):
         """
         Perform a REST API request to the backend H2O server.
 
@@ -338,19 +392,25 @@ class H2OConnection(backwards_compatible()):
         :param data: data payload for POST (and sometimes GET) requests. This should be a dictionary of simple
             key/value pairs (values can also be arrays), which will be sent over in x-www-form-encoded format.
         :param json: also data payload, but it will be sent as a JSON body. Cannot be used together with `data`.
-        :param filename: file to upload to the server. Cannot be used with `data` or `json`.
+        :param filename: file to upload to the server, or a generator of the blocks of bytes to upload (which are
+            then streamed to the server as they are generated). Cannot be used with `data` or `json`.
         :param save_to: if provided, will write the response to that file (additionally, the response will be
             streamed, so large files can be downloaded seamlessly). This parameter can be either a file name,
             or a folder name. If the folder doesn't exist, it will be created automatically.
+        :param stream: if True, the response will be streamed, and returned as a binary file-like object from which
+            the body can be read incrementally. The caller is responsible for closing it. Cannot be used together
+            with `save_to`.
 
-        :returns: an H2OResponse object representing the server's response (unless ``save_to`` parameter is
-            provided, in which case the output file's name will be returned).
+        :returns: an H2OResponse object representing the server's response (unless ``save_to`` or ``stream``
+            parameter is provided, in which case the output file's name or the response stream will be returned).
         :raises H2OConnectionError: if the H2O server cannot be reached (or connection is not initialized)
         :raises H2OServerError: if there was a server error (http 500), or server returned malformed JSON
         :raises H2OResponseError: if the server returned an H2OErrorV3 response (e.g. if the parameters were invalid)
         """
         if self._stage == 0: raise H2OConnectionError("Connection not initialized; run .connect() first.")
         if self._stage == -1: raise H2OConnectionError("Connection was closed, and can no longer be used.")
+        if self._removal_queue and self._removal_due():
+            self.flush_removals()
 
         # Prepare URL
         assert_is_type(endpoint, str)
@@ -361,7 +421,7 @@ class H2OConnection(backwards_compatible()):
 
         # Prepare data
         if filename is not None:
-            assert_is_type(filename, str)
+            assert_is_type(filename, str, GeneratorType)
             assert_is_type(json, None, "Argument `json` should be None when `filename` is used.")
             assert_is_type(data, None, "Argument `data` should be None when `filename` is used.")
             assert_satisfies(method, method == "POST",
@@ -372,17 +432,25 @@ class H2OConnection(backwards_compatible()):
         elif json is not None:
             assert_is_type(json, dict)
 
+        compress = self._compression
         data = self._prepare_data_payload(data)
-        files = self._prepare_file_payload(filename)
+        files = None
+        content_type = None
+        if is_type(filename, str) and compress:
+            filename = self._file_blocks(filename)
+        if is_type(filename, GeneratorType):
+            data, content_type = self._prepare_stream_payload(self._gzip_blocks(filename) if compress else filename)
+        else:
+            files = self._prepare_file_payload(filename)
         params = None
         if method == "GET" and data:
             params = data
             data = None
 
-        stream = False
+        assert_is_type(stream, bool)
         if save_to is not None:
             assert_is_type(save_to, str)
-            stream = True
+            assert_satisfies(stream, not stream, "Arguments `save_to` and `stream` cannot be used together.")
 
         if self._cookies is not None and isinstance(self._cookies, list):
             self._cookies = ";".join(self._cookies)
@@ -394,12 +462,16 @@ class H2OConnection(backwards_compatible()):
 
             headers = {"User-Agent": "H2O Python client/" + sys.version.replace("\n", ""),
                        "X-Cluster": self._cluster_id,
-                       "Cookie": self._cookies}
-            resp = requests.request(method=method, url=url, data=data, json=json, files=files, params=params,
-                                    headers=headers, timeout=self._timeout, stream=stream,
-                                    auth=self._auth, verify=self._verify_ssl_cert, proxies=self._proxies)
+                       "Cookie": self._cookies,
+                       "Accept-Encoding": "gzip" if compress else "identity"}
+            if content_type:
+                headers["Content-Type"] = content_type
+            resp = self._session.request(method=method, url=url, data=data, json=json, files=files, params=params,
+                                         headers=headers, timeout=self._timeout,
+                                         stream=stream or save_to is not None,
+                                         auth=self._auth, verify=self._verify_ssl_cert, proxies=self._proxies)
             self._log_end_transaction(start_time, resp)
-            return self._process_response(resp, save_to)
+            return self._process_response(resp, save_to, stream)
 
         except (requests.exceptions.ConnectionError, requests.exceptions.HTTPError) as e:
             if self._local_server and not self._local_server.is_running():
@@ -431,11 +503,15 @@ class H2OConnection(backwards_compatible()):
             try:
                 # If the server gone bad, we don't want to wait forever...
                 if self._timeout is None: self._timeout = 1
+                self.flush_removals()
                 self.request("DELETE /4/sessions/%s" % self._session_id)
                 self._print("H2O session %s closed." % self._session_id)
             except Exception:
                 pass
             self._session_id = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
         self._stage = -1
 
 
@@ -474,12 +550,71 @@ class H2OConnection(backwards_compatible()):
         """Handler to the H2OLocalServer instance (if connected to one)."""
         return self._local_server
 
+    @property
+    def pool_maxsize(self):
+        """Maximum number of connections kept open to the server, and so of the requests worth making at once."""
+        return self._pool_maxsize
+
+
+    def defer_removal(self, key):
+        """
+        Schedule removal of a temporary object from the server.
+
+        Instead of issuing a separate request for every temporary as soon as it is garbage-collected, the keys are
+        collected in a queue and removed with a single Rapids call. The queue is flushed before the next request once
+        it holds ``removal_batch_size`` keys or its oldest key has waited ``removal_delay`` seconds, and also when
+        the connection is closed (which happens automatically at interpreter exit). This method never makes an HTTP
+        request itself, so it is safe to call from finalizers.
+
+        :param key: id of the temporary object to remove.
+        """
+        if self._stage != 1 or not self._session_id: return  # temporaries die together with the session anyway
+        if not self._removal_queue:
+            self._removal_queue_since = time.time()
+        self._removal_queue.append(key)
+
+    def flush_removals(self):
+        """Remove from the server all temporaries currently waiting in the removal queue (see :meth:`defer_removal`)."""
+        keys = self._removal_queue
+        if not keys: return
+        self._removal_queue = []  # swap the queue out first: the requests below must not trigger another flush
+        self._removal_flushes += 1
+        self._remove_keys(keys)
+
+    @property
+    def removal_queue_depth(self):
+        """Number of temporaries currently waiting to be removed from the server (see :meth:`defer_removal`)."""
+        return len(self._removal_queue)
+
+    @property
+    def removal_flushes_count(self):
+        """Number of batched removal requests made since the connection was opened."""
+        return self._removal_flushes
 
     @property
     def requests_count(self):
         """Total number of request requests made since the connection was opened (used for debug purposes)."""
         return self._requests_counter
 
+    @property
+    def compression(self):
+        """
+        Whether the data exchanged with the server is compressed with gzip.
+
+        This applies to the uploads of files and python objects (compressed on the fly, unless they are compressed
+        already) and to the downloads of frames. It is off by default: turn it on for the servers behind slow links,
+        where it saves more time on the wire than it costs in CPU time on both ends (on a local server, or on a fast
+        network, it only slows the transfers down)::
+
+            h2o.connection().compression = True
+        """
+        return self._compression
+
+    @compression.setter
+    def compression(self, v):
+        assert_is_type(v, bool)
+        self._compression = v
+
     @property
     def timeout_interval(self):
         """Timeout length for each request, in seconds."""
@@ -522,6 +657,8 @@ class H2OConnection(backwards_compatible()):
         globals()["__H2OCONN__"] = self  # for backward-compatibility: __H2OCONN__ is the latest instantiated object
         self._stage = 0             # 0 = not connected, 1 = connected, -1 = disconnected
         self._session_id = None     # Rapids session id; issued upon request only
+        self._session = None        # requests.Session holding the pool of keep-alive HTTP connections
+        self._pool_maxsize = None   # maximum number of connections kept open in that pool
         self._base_url = None       # "{scheme}://{ip}:{port}"
         self._verify_ssl_cert = None
         self._auth = None           # Authentication token
@@ -535,9 +672,32 @@ class H2OConnection(backwards_compatible()):
         self._is_logging = False    # when True, log every request
         self._logging_dest = None   # where the log messages will be written, either filename or open file handle
         self._local_server = None   # H2OLocalServer instance to which we are connected (if known)
+        self._removal_queue = []    # ids of temporaries waiting to be removed from the server
+        self._removal_queue_since = None  # time when the oldest id in the queue was added
+        self._removal_flushes = 0   # how many batched removal requests were made
+        self._compression = False   # whether to compress the transfers with gzip
         # self.start_logging(sys.stdout)
 
 
+    def _remove_keys(self, keys):
+        """Remove frames and/or models with the given keys from the server, using a single Rapids request."""
+        rm_cmds = ["(rm %s)" % key for key in keys]
+        try:
+            self.request("POST /99/Rapids", data={"ast": "(, %s)" % " ".join(rm_cmds), "session_id": self.session_id})
+        except H2OResponseError:
+            # The batch stops at the first failure, so retry the keys one by one ignoring individual errors
+            for rm_cmd in rm_cmds:
+                try:
+                    self.request("POST /99/Rapids", data={"ast": rm_cmd, "session_id": self.session_id})
+                except H2OResponseError:
+                    pass
+
+    def _removal_due(self):
+        """True if the removal queue is large enough, or old enough, to be flushed."""
+        return (len(self._removal_queue) >= self.removal_batch_size or
+                time.time() - self._removal_queue_since >= self.removal_delay)
+
+
     def _test_connection(self, max_retries=5, messages=None):
         """
         Test that the H2O cluster can be reached, and retrieve basic cloud status info.
@@ -588,6 +748,24 @@ class H2OConnection(backwards_compatible()):
                                      % (self._base_url, max_retries, "\n".join(errors)))
 
 
+    @staticmethod
+    def _make_session(pool_connections=None, pool_maxsize=None, keep_alive=True):
+        """
+        Create a ``requests.Session`` through which all API requests of this connection will be sent.
+
+        The session keeps a pool of open connections to the server, so that consecutive requests do not have to
+        perform a new TCP / TLS handshake each time.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections or DEFAULT_POOLSIZE,
+                              pool_maxsize=pool_maxsize or DEFAULT_POOLSIZE)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        if not keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+
     @staticmethod
     def _prepare_data_payload(data):
         """
@@ -625,6 +803,58 @@ class H2OConnection(backwards_compatible()):
         return {os.path.basename(absfilename): open(absfilename, "rb")}
 
 
+    @staticmethod
+    def _file_blocks(filename):
+        """Open the file to be uploaded, and return a generator of the blocks of its bytes."""
+        if not os.path.exists(os.path.abspath(filename)):
+            raise H2OValueError("File %s does not exist" % filename, skip_frames=1)
+
+        def blocks(f):
+            with f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    yield block
+
+        return blocks(open(filename, "rb"))
+
+
+    @staticmethod
+    def _gzip_blocks(blocks):
+        """Compress the generator `blocks` of bytes into a gzip stream on the fly, unless they are compressed already."""
+        blocks = iter(blocks)
+        first = next((block for block in blocks if block), b"")
+        if first.startswith(_COMPRESSED_MAGICS):
+            yield first
+            for block in blocks:
+                yield block
+            return
+        compressor = zlib.compressobj(1, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+        for block in itertools.chain([first], blocks):
+            data = compressor.compress(block)
+            if data:
+                yield data
+        yield compressor.flush()
+
+
+    @staticmethod
+    def _prepare_stream_payload(blocks):
+        """
+        Prepare the generator `blocks` of bytes to be streamed to the server as an uploaded file.
+
+        Returns the body of the request (a generator of the multipart/form-data payload), and its content type.
+        """
+        boundary = "----H2OUploadBoundary" + uuid.uuid4().hex
+
+        def body():
+            yield ("--%s\r\nContent-Disposition: form-data; name=\"file\"; filename=\"upload\"\r\n"
+                   "Content-Type: application/octet-stream\r\n\r\n" % boundary).encode("ascii")
+            for block in blocks:
+                if block:
+                    yield block
+            yield ("\r\n--%s--\r\n" % boundary).encode("ascii")
+
+        return body(), "multipart/form-data; boundary=" + boundary
+
+
     def _log_start_transaction(self, endpoint, data, json, files, params):
         """Log the beginning of an API request."""
         # TODO: add information about the caller, i.e. which module + line of code called the .request() method
@@ -634,7 +864,8 @@ class H2OConnection(backwards_compatible()):
         msg = "\n---- %d --------------------------------------------------------\n" % self._requests_counter
         msg += "[%s] %s\n" % (time.strftime("%H:%M:%S"), endpoint)
         if params is not None: msg += "     params: {%s}\n" % ", ".join("%s:%s" % item for item in viewitems(params))
-        if data is not None:   msg += "     body: {%s}\n" % ", ".join("%s:%s" % item for item in viewitems(data))
+        if is_type(data, dict): msg += "     body: {%s}\n" % ", ".join("%s:%s" % item for item in viewitems(data))
+        elif data is not None: msg += "     body: <streamed file upload>\n"
         if json is not None:
             import json as j
             msg += "     json: %s\n" % j.dumps(json)
@@ -675,7 +906,7 @@ class H2OConnection(backwards_compatible()):
 
 
     @staticmethod
-    def _process_response(response, save_to):
+    def _process_response(response, save_to, stream=False):
         """
         Given a response object, prepare it to be handed over to the external caller.
 
@@ -684,6 +915,9 @@ class H2OConnection(backwards_compatible()):
            * detect Content-Type, and based on that either parse the response as JSON or return as plain text.
         """
         status_code = response.status_code
+        if status_code == 200 and stream:
+            response.raw.decode_content = True
+            return response.raw
         if status_code == 200 and save_to:
             if save_to.startswith("~"): save_to = os.path.expanduser(save_to)
             if os.path.isdir(save_to) or save_to.endswith(os.path.sep):
@@ -838,6 +1072,10 @@ class H2OResponse(dict):
         if schema == "ModelMetricsAutoEncoderV3": return H2OAutoEncoderModelMetrics.make(keyvals)
         return super(H2OResponse, cls).__new__(cls, keyvals)
 
+    def __reduce__(self):
+        # Objects of the schemas made into other classes are not H2OResponse objects anymore
+        return H2OResponse, (list(viewitems(self)), )
+
     # def __getattr__(self, key):
     #     """This gets invoked for any attribute "key" that is NOT yet defined on the object."""
     #     if key in self:
@@ -5,12 +5,17 @@
 #
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import hashlib
 import inspect
+import json
+import os
+import time
 import types
 import warnings
 
 import h2o
 from h2o.exceptions import H2OValueError
+from h2o.expr import Scope
 from h2o.frame import H2OFrame
 from h2o.job import H2OJob
 from h2o.utils.compatibility import *  # NOQA
@@ -23,7 +28,7 @@ from ..model.dim_reduction import H2ODimReductionModel
 from ..model.metrics_base import (H2OBinomialModelMetrics, H2OClusteringModelMetrics, H2ORegressionModelMetrics,
                                   H2OMultinomialModelMetrics, H2OAutoEncoderModelMetrics, H2ODimReductionModelMetrics,
                                   H2OWordEmbeddingModelMetrics)
-from ..model.model_base import ModelBase
+from ..model.model_base import ModelBase, _fetch_model_json
 from ..model.multinomial import H2OMultinomialModel
 from ..model.regression import H2ORegressionModel
 from ..model.word_embedding import H2OWordEmbeddingModel
@@ -48,6 +53,10 @@ class H2OEstimator(ModelBase):
     Because H2OEstimator instances are instances of ModelBase, these objects can use the H2O model API.
     """
 
+    # Cache of the built models (a ``_TrainingCache``), if enabled with ``h2o.enable_training_cache()``
+    _training_cache = None
+    _training_fingerprint = None
+
     def start(self, x, y=None, training_frame=None, offset_column=None, fold_column=None,
               weights_column=None, validation_frame=None, **params):
         """
@@ -77,16 +86,25 @@ class H2OEstimator(ModelBase):
     def join(self):
         """Wait until job's completion."""
         self._future = False
+        if self._job is None: return  # the model has been taken from the training cache
         self._job.poll()
+        self._resolve_job()
+
+
+    def _resolve_job(self):
+        """Load the model built by the completed job started with :meth:`start`."""
         model_key = self._job.dest_key
         self._job = None
-        model_json = h2o.api("GET /%d/Models/%s" % (self._rest_version, model_key))["models"][0]
+        model_json = _fetch_model_json(model_key, self._rest_version, self.algo)
         self._resolve_model(model_key, model_json)
+        cache = H2OEstimator._training_cache
+        if cache and self._training_fingerprint:
+            cache.store(self._training_fingerprint, model_json)
 
 
     def train(self, x=None, y=None, training_frame=None, offset_column=None, fold_column=None,
               weights_column=None, validation_frame=None, max_runtime_secs=None, ignored_columns=None,
-              model_id=None):
+              model_id=None, force=False):
         """
         Train the H2O model.
 
@@ -100,6 +118,9 @@ class H2OEstimator(ModelBase):
         :param weights_column: The name or index of the column in training_frame that holds the per-row weights.
         :param validation_frame: H2OFrame with validation data to be scored on while training.
         :param float max_runtime_secs: Maximum allowed runtime in seconds for model training. Use 0 to disable.
+        :param bool force: Train the model even if the training cache (see :func:`h2o.enable_training_cache`) holds
+            a model built from the same data with the same parameters. The new model then replaces that one in the
+            cache.
         """
         assert_is_type(training_frame, H2OFrame)
         assert_is_type(validation_frame, None, H2OFrame)
@@ -190,9 +211,20 @@ class H2OEstimator(ModelBase):
         parms["ignored_columns"] = None if ignored_columns == [] else [quoted(col) for col in ignored_columns]
         parms["interactions"] = (None if "interactions" not in parms or parms["interactions"] is None else
                                  [quoted(col) for col in parms["interactions"]])
+        cache = H2OEstimator._training_cache
+        frames = {k: v for k, v in parms.items() if isinstance(v, H2OFrame)}
         parms = {k: H2OEstimator._keyify_if_h2oframe(parms[k]) for k in parms}
         rest_ver = parms.pop("_rest_version") if "_rest_version" in parms else 3
 
+        self._training_fingerprint = cache.fingerprint(self.algo, rest_ver, parms, frames) if cache else None
+        if self._training_fingerprint and not force:
+            model_json = cache.load(self._training_fingerprint, rest_ver, self.algo)
+            if model_json is not None:
+                self._future = False
+                self._job = None
+                self._resolve_model(model_json["model_id"]["name"], model_json)
+                return
+
         model = H2OJob(h2o.api("POST /%d/ModelBuilders/%s" % (rest_ver, self.algo), data=parms),
                        job_type=(self.algo + " Model Build"))
 
@@ -202,8 +234,10 @@ class H2OEstimator(ModelBase):
             return
 
         model.poll()
-        model_json = h2o.api("GET /%d/Models/%s" % (rest_ver, model.dest_key))["models"][0]
+        model_json = _fetch_model_json(model.dest_key, rest_ver, self.algo)
         self._resolve_model(model.dest_key, model_json)
+        if self._training_fingerprint:
+            cache.store(self._training_fingerprint, model_json)
 
 
     @staticmethod
@@ -220,6 +254,7 @@ class H2OEstimator(ModelBase):
         metrics_class, model_class = H2OEstimator._metrics_class(model_json)
         m = model_class()
         m._id = model_id
+        if model_id is not None: Scope._record(model_id)
         m._model_json = model_json
         m._metrics_class = metrics_class
         m._parms = self._parms
@@ -237,6 +272,8 @@ class H2OEstimator(ModelBase):
 
             if m._is_xvalidated:
                 m._xval_keys = [i["name"] for i in model_json["output"]["cross_validation_models"]]
+                for xval_key in m._xval_keys:
+                    Scope._record(xval_key)
 
             # build a useful dict of the params
             for p in m._model_json["parameters"]:
@@ -355,3 +392,64 @@ class H2OEstimator(ModelBase):
         else:
             raise NotImplementedError(model_type)
         return [metrics_class, model_class]
+
+
+
+class _TrainingCache(object):
+    """
+    Models built by :meth:`H2OEstimator.train`, keyed by the fingerprint of their parameters and data.
+
+    The fingerprint covers the algorithm and the parameters sent to the server, with the ids of the frames replaced by
+    the frames' checksums, so that the same data loaded again into another frame still matches. A model is taken from
+    the cache only if the cluster still holds it, as it was when it was stored. Past ``max_models`` models, the least
+    recently used ones are evicted from the cache (but not removed from the cluster).
+
+    If ``index`` is given, the cache is kept in that JSON file, so that it survives restarts of the python session.
+    """
+
+    def __init__(self, index=None, max_models=1000):
+        self.index = index
+        self.max_models = max_models
+        self.models = {}  # fingerprint => [model_id, model's start time, time of last use]
+        if index is not None and os.path.exists(index):
+            with open(index) as f:
+                self.models = json.load(f)["models"]
+
+    def fingerprint(self, algo, rest_ver, parms, frames):
+        """Fingerprint of the model build, given its parameters and the frames among them."""
+        checksums = {}
+        for frame in frames.values():
+            res = h2o.api("GET /3/Frames/%s" % frame.frame_id,
+                          data={"_exclude_fields": "frames/columns,frames/chunk_summary,frames/distribution_summary"})
+            checksums[frame.frame_id] = res["frames"][0]["checksum"]
+        parms = {k: ["frame", checksums[frames[k].frame_id]] if k in frames else v for k, v in parms.items()}
+        data = json.dumps([algo, rest_ver, parms], sort_keys=True, default=str)
+        return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+    def load(self, fingerprint, rest_ver, algo):
+        """The JSON of the model built with this fingerprint, or None if there is no such model."""
+        entry = self.models.get(fingerprint)
+        if entry is None: return None
+        try:
+            model_json = _fetch_model_json(entry[0], rest_ver, algo)
+        except EnvironmentError:
+            model_json = None
+        if model_json is None or model_json["output"].get("start_time") != entry[1]:
+            del self.models[fingerprint]
+            self._save()
+            return None
+        entry[2] = time.time()
+        self._save()
+        return model_json
+
+    def store(self, fingerprint, model_json):
+        self.models[fingerprint] = [model_json["model_id"]["name"], model_json["output"].get("start_time"),
+                                    time.time()]
+        for fp, _ in sorted(self.models.items(), key=lambda kv: kv[1][2])[:-self.max_models]:
+            del self.models[fp]
+        self._save()
+
+    def _save(self):
+        if self.index is None: return
+        with open(self.index, "w") as f:
+            json.dump({"models": self.models}, f)
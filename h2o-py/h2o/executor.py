@@ -0,0 +1,218 @@
+# -*- encoding: utf-8 -*-
+"""
+Executor of many model builds, which keeps only a limited number of them running on the cluster at the same time.
+
+:copyright: (c) 2016 H2O.ai
+:license:   Apache License Version 2.0 (see LICENSE for details)
+"""
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import collections
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+import concurrent.futures
+
+from h2o.estimators.estimator_base import H2OEstimator
+from h2o.exceptions import H2OValueError
+from h2o.utils.typechecks import assert_is_type, assert_satisfies, numeric
+
+
+class ModelExecutor(object):
+    """
+    Executor of model builds, with at most ``max_concurrent`` of them running on the cluster at any time.
+
+    Each build is submitted as an estimator along with the arguments of its :meth:`H2OEstimator.train` method, and
+    it is started once fewer than ``max_concurrent`` builds are running: in the order of the priorities, then in the
+    order of submission. The builds are started, and their models fetched once their jobs are done, on the executor's
+    own thread; the running jobs are monitored by the shared :class:`H2OJobPoller <h2o.job.H2OJobPoller>`::
+
+        with h2o.ModelExecutor(max_concurrent=8) as executor:
+            futures = [executor.submit(H2OGradientBoostingEstimator(max_depth=d), x=x, y=y, training_frame=train)
+                       for d in range(2, 20)]
+        models = [f.result() for f in futures]
+    """
+
+    def __init__(self, max_concurrent=4):
+        """
+        Create a new executor.
+
+        :param int max_concurrent: maximum number of models being built at the same time.
+        """
+        assert_is_type(max_concurrent, int)
+        assert_satisfies(max_concurrent, max_concurrent >= 1)
+        self._max_concurrent = max_concurrent
+        self._lock = threading.Condition(threading.RLock())
+        self._queue = []     # heap of (-priority, submission number, future, estimator, train args)
+        self._running = {}   # future => future of the job, None while the job is being started
+        self._tasks = collections.deque()  # (function, args) to be run on the worker thread
+        self._worker = None
+        self._futures = set()
+        self._counter = itertools.count()
+        self._shutdown = False
+
+
+    def submit(self, estimator, priority=0, **train_args):
+        """
+        Schedule a model build.
+
+        :param H2OEstimator estimator: the model to build.
+        :param priority: the builds of higher priority are started first.
+        :param train_args: the arguments to :meth:`H2OEstimator.train`.
+        :returns: a ``concurrent.futures.Future`` resolved with the trained ``estimator``. Cancelling it removes the
+            build from the queue, or cancels its job if the build is already running.
+        """
+        assert_is_type(estimator, H2OEstimator)
+        assert_is_type(priority, numeric)
+        future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise H2OValueError("Cannot schedule new model builds after shutdown()")
+            heapq.heappush(self._queue, (-priority, next(self._counter), future, estimator, train_args))
+            self._futures.add(future)
+        future.add_done_callback(self._on_done)
+        self._schedule()
+        return future
+
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        """
+        Stop accepting new model builds.
+
+        :param wait: if True, wait until all the submitted builds complete.
+        :param cancel_futures: if True, cancel the builds which have not been started yet.
+        """
+        with self._lock:
+            self._shutdown = True
+            futures = list(self._futures)
+            queued = [entry[2] for entry in self._queue]
+        if cancel_futures:
+            for future in queued:
+                future.cancel()
+        if wait:
+            concurrent.futures.wait(futures)
+
+
+    @property
+    def max_concurrent(self):
+        """Maximum number of models being built at the same time."""
+        return self._max_concurrent
+
+    @property
+    def running(self):
+        """Number of models being built."""
+        with self._lock:
+            return len(self._running)
+
+    @property
+    def queued(self):
+        """Number of model builds waiting to be started."""
+        with self._lock:
+            return sum(1 for entry in self._queue if not entry[2].cancelled())
+
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown(wait=True)
+
+
+    #-------------------------------------------------------------------------------------------------------------------
+    # PRIVATE
+    #-------------------------------------------------------------------------------------------------------------------
+
+    def _schedule(self):
+        """Reserve the free slots for the queued builds, and hand the start of those builds to the worker thread."""
+        with self._lock:
+            while len(self._running) < self._max_concurrent and self._queue:
+                _, _, future, estimator, train_args = heapq.heappop(self._queue)
+                if future.cancelled(): continue
+                self._running[future] = None
+                self._post(self._start, future, estimator, train_args)
+
+
+    def _post(self, fn, *args):
+        """Run the function on the worker thread, which is started if necessary."""
+        with self._lock:
+            self._tasks.append((fn, args))
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._work, name="ModelExecutor")
+                self._worker.daemon = True
+                self._worker.start()
+            self._lock.notify()
+
+
+    def _work(self):
+        """
+        Run the posted functions, until no builds are running anymore.
+
+        The builds are started here rather than on the threads that submit them or that complete the previous
+        builds: :meth:`H2OEstimator.train` makes requests to the server, and the completions come from the thread of
+        the job poller, which must not be held up.
+        """
+        while True:
+            with self._lock:
+                while not self._tasks:
+                    if not self._running:
+                        self._worker = None
+                        return
+                    self._lock.wait()
+                fn, args = self._tasks.popleft()
+            fn(*args)
+
+
+    def _start(self, future, estimator, train_args):
+        """Start the build, for which a slot has been reserved."""
+        try:
+            estimator._future = True
+            estimator.train(**train_args)
+            if estimator._job is None:
+                # The model has been taken from the training cache
+                with self._lock:
+                    del self._running[future]
+                if future.set_running_or_notify_cancel():
+                    future.set_result(estimator)
+                self._schedule()
+                return
+            job_future = estimator._job.future()
+        except Exception as e:
+            with self._lock:
+                del self._running[future]
+            if future.set_running_or_notify_cancel():
+                future.set_exception(e)
+            self._schedule()
+            return
+        with self._lock:
+            self._running[future] = job_future
+        if future.cancelled():
+            job_future.cancel()
+        job_future.add_done_callback(lambda _: self._post(self._complete, future, estimator))
+
+
+    def _complete(self, future, estimator):
+        """Resolve the future of the build whose job has finished, and start the next build."""
+        try:
+            job_future = self._running[future]
+            if not job_future.cancelled() and future.set_running_or_notify_cancel():
+                try:
+                    job_future.result()
+                    estimator._future = False
+                    estimator._resolve_job()
+                    future.set_result(estimator)
+                except Exception as e:
+                    future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._running[future]
+            self._schedule()
+
+
+    def _on_done(self, future):
+        """Forget the future once it is resolved; if it was cancelled while its job is running, cancel the job."""
+        with self._lock:
+            self._futures.discard(future)
+            job_future = self._running.get(future)
+        if future.cancelled() and job_future is not None:
+            job_future.cancel()
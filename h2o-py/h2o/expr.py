@@ -9,15 +9,15 @@ from __future__ import division, print_function, absolute_import, unicode_litera
 
 import collections
 import copy
-import gc
 import math
-import sys
 import time
+import weakref
 
 import tabulate
 
 import h2o
 from h2o.backend.connection import H2OConnectionError
+from h2o.exceptions import H2OResponseError
 from h2o.utils.compatibility import *  # NOQA
 from h2o.utils.compatibility import repr2, viewitems, viewvalues
 from h2o.utils.shared_utils import _is_fr, _py_tmp_key
@@ -39,8 +39,8 @@ class ExprNode(object):
       ----------------------
         An expression is declared top-level if it
           A) Computes and returns an H2OFrame to some on-demand call from somewhere
-          B) An H2OFrame instance has more referrers than the 4 needed for the usual flow
-             of python execution (see MAGIC_REF_COUNT below for more details).
+          B) It is referenced from more than one place: by several parent expressions, or by
+             a parent expression and a live H2OFrame (see _refcnt below for more details).
 
       Sane Amount of State
       --------------------
@@ -70,22 +70,69 @@ class ExprNode(object):
         There are more details available under the H2OCache class declaration.
     """
 
-    # Magical count-of-5:   (get 2 more when looking at it in debug mode)
-    #  2 for _get_ast_str frame, 2 for _get_ast_str local dictionary list, 1 for parent
-    MAGIC_REF_COUNT = 5 if sys.gettrace() is None else 7  # M = debug ? 7 : 5
-
     def __init__(self, op="", *args):
         # assert isinstance(op, str), op
         self._op = op  # Base opcode string
+        # Number of references to this node held by parent nodes (one per occurrence among their children) and by
+        # H2OFrames (whose `_ex` is this node). A node referenced more than once becomes a temp when serialized.
+        self._refcnt = 0
         self._children = tuple(
             a._ex if _is_fr(a) else a for a in args)  # ast children; if not None and _cache._id is not None then tmp
         self._cache = H2OCache()  # ncols, nrows, names, types
+        self._scopes = tuple(Scope._active)  # scopes within which the node was created (see h2o.scope)
+
+    @property
+    def _children(self):
+        return self._children_tuple
+
+    @_children.setter
+    def _children(self, children):
+        # Keep the reference counts of the child nodes up-to-date whenever the children change
+        if children is not None:
+            for child in children:
+                if isinstance(child, ExprNode): child._refcnt += 1
+        old_children = self.__dict__.get("_children_tuple")
+        if old_children is not None:
+            for child in old_children:
+                if isinstance(child, ExprNode): child._refcnt -= 1
+        self._children_tuple = children
 
     def _eager_frame(self):
         if not self._cache.is_empty(): return
         if self._cache._id is not None: return  # Data already computed under ID, but not cached locally
         self._eval_driver(True)
 
+    @staticmethod
+    def _eval_batch(nodes):
+        """
+        Evaluate several lazy frame expressions in a single Rapids request.
+
+        All the DAGs are merged into one Rapids program of the form ``(, (tmp= id1 ...) (tmp= id2 ...) ...)``, so that
+        sub-expressions shared between the DAGs are computed only once.
+        """
+        roots = []
+        for node in nodes:
+            if node._is_lazy() and node._children is not None and all(node is not r for r in roots):
+                roots.append(node)
+        if not roots: return
+        if len(roots) == 1:
+            roots[0]._eval_driver(True)
+            return
+        ExprNode._optimize(roots)
+        # The response describes only the last frame of the program, so the frames whose shape is not known on the
+        # client (see _infer_schema) go last; the shapes of the other such frames are requested when needed.
+        roots.sort(key=lambda r: r._cache.nrows_valid() and r._cache.ncols_valid(), reverse=True)
+        statements = []
+        last = None
+        for root in roots:
+            if root._is_lazy():  # may have been already materialized as a temp within one of the previous roots
+                statements.append(root._get_ast_str(True))
+                last = root
+        res = ExprNode.rapids("(, %s)" % " ".join(statements))
+        if 'key' in res:
+            last._cache.nrows = res['num_rows']
+            last._cache.ncols = res['num_cols']
+
     def _eager_scalar(self):  # returns a scalar (or a list of scalars)
         if not self._cache.is_empty():
             assert self._cache.is_scalar()
@@ -97,6 +144,7 @@ class ExprNode(object):
         return self._cache._data
 
     def _eval_driver(self, top):
+        ExprNode._optimize([self])
         exec_str = self._get_ast_str(top)
         res = ExprNode.rapids(exec_str)
         if 'scalar' in res:
@@ -111,26 +159,294 @@ class ExprNode(object):
             self._cache.ncols = res['num_cols']
         return self
 
-    # Recursively build a rapids execution string.  Any object with more than
-    # MAGIC_REF_COUNT referrers will be cached as a temp until the next client GC
-    # cycle - consuming memory.  Do Not Call This except when you need to do some
+    # Rapids operations which may produce a different result each time they are executed (or have side effects), and
+    # therefore must never be merged with a structurally identical expression.
+    NONDETERMINISTIC_OPS = {"h2o.runif", "h2o.random_stratified_split", "kfold_column", "stratified_kfold_column",
+                            "assign", "rm", "tmp=", "setTimeZone"}
+
+    @staticmethod
+    def _eliminate_common_subexpressions(roots):
+        """
+        Merge structurally identical lazy sub-expressions within the DAGs rooted at ``roots``.
+
+        Two unevaluated nodes are identical if they have the same op and their children are either the same
+        (already merged) nodes, or serialize to the same Rapids strings. Every parent of a duplicate node is
+        re-pointed to a single canonical node; since the canonical node is then referenced more than once, it
+        gets serialized as a ``tmp=`` temporary and is computed only once by the cluster.
+        """
+        canonical = {}  # structural key => canonical node
+        canon_of = {}   # id(node) => canonical node for that node (also serves as the "visited" set)
+        stack = [(root, False) for root in roots if isinstance(root, ExprNode) and root._is_lazy()]
+        while stack:
+            node, expanded = stack.pop()
+            if id(node) in canon_of: continue
+            children = node._children or ()
+            if not expanded:
+                stack.append((node, True))
+                stack.extend((child, False) for child in children
+                             if isinstance(child, ExprNode) and child._is_lazy() and id(child) not in canon_of)
+                continue
+            new_children = tuple(canon_of.get(id(child), child) if isinstance(child, ExprNode) else child
+                                 for child in children)
+            if any(a is not b for a, b in zip(children, new_children)):
+                node._children = new_children
+            if node._children is None or node._op in ExprNode.NONDETERMINISTIC_OPS:
+                key = ("!", id(node))
+            else:
+                key = (node._op,) + tuple(
+                    ("@", id(child)) if isinstance(child, ExprNode) and child._is_lazy() else
+                    ExprNode._arg_to_expr(child) for child in new_children)
+            canon_of[id(node)] = canonical.setdefault(key, node)
+
+    @staticmethod
+    def _optimize(roots):
+        """Rewrite the lazy DAGs rooted at ``roots`` into cheaper equivalent forms before they are serialized."""
+        ExprNode._simplify(roots)
+        ExprNode._eliminate_common_subexpressions(roots)
+
+    # Ops whose result is always numeric / always boolean (0 or 1)
+    ARITHMETIC_OPS = {"+", "-", "*", "/", "^", "%", "intDiv"}
+    BOOLEAN_OPS = {"==", "!=", "<", "<=", ">", ">=", "&", "|", "!!", "not", "is.na"}
+    NUMERIC_OPS = ARITHMETIC_OPS | BOOLEAN_OPS | {
+        "abs", "acos", "acosh", "asin", "asinh", "atan", "atanh", "ceiling", "cos", "cosh", "cospi", "digamma", "exp",
+        "expm1", "floor", "gamma", "lgamma", "log", "log10", "log1p", "log2", "sign", "sin", "sinh", "sinpi", "sqrt",
+        "tan", "tanh", "tanpi", "trigamma", "trunc"}
+    # Scalar functions used for constant folding; they are applied to floats, as Rapids computes in doubles
+    FOLDABLE_OPS = {"+": lambda a, b: a + b, "-": lambda a, b: a - b, "*": lambda a, b: a * b,
+                    "/": lambda a, b: a / b, "^": math.pow,
+                    "==": lambda a, b: float(a == b), "!=": lambda a, b: float(a != b),
+                    "<": lambda a, b: float(a < b), "<=": lambda a, b: float(a <= b),
+                    ">": lambda a, b: float(a > b), ">=": lambda a, b: float(a >= b)}
+    # (op, position of the identity constant, identity constant): `X op c` or `c op X` is the same as X
+    IDENTITY_OPS = {("*", 1, 1), ("*", 0, 1), ("+", 1, 0), ("+", 0, 0), ("-", 1, 0), ("/", 1, 1), ("^", 1, 1)}
+    # Arguments that are used only as boolean masks (so their column names do not matter): op => position
+    MASK_ARGS = {"rows": 1, "ifelse": 0}
+
+    @staticmethod
+    def _simplify(roots):
+        """
+        Apply algebraic simplifications to the lazy DAGs rooted at ``roots`` (in-place).
+
+        The following rewrites are performed:
+          - nested column / row selectors are merged: ``(cols_py (cols_py X c1) c2)`` => ``(cols_py X c1[c2])``, and
+            similarly for ``rows``; a column selection over a row selection is pushed down below it, so that rows are
+            filtered on the narrower frame;
+          - arithmetic on scalar constants is folded: ``(* 2 3)`` => ``6``;
+          - identity operations on numeric frames (by their op, or by their known column types) are dropped:
+            ``(* X 1)``, ``(+ X 0)`` => ``X``, at the roots too; a double negation of a boolean frame used as a mask
+            (of ``rows`` or ``ifelse``) is dropped too: ``(!! (!! X))`` => ``X`` (elsewhere it has to stay, since each
+            negation renames the columns);
+          - chains of single-column ``:=`` assignments to different columns are collapsed into one assignment of
+            a ``cbind``-ed frame to multiple columns.
+        Only nodes that are referenced from a single place are rewritten, so that the rewrites never change values
+        seen through other H2OFrames.
+        """
+        root_ids = {id(root) for root in roots}
+        visited = set()
+        stack = [(root, False) for root in roots if isinstance(root, ExprNode) and root._is_lazy()]
+        while stack:
+            node, expanded = stack.pop()
+            if id(node) in visited: continue
+            if not expanded:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node._children or ()
+                             if isinstance(child, ExprNode) and child._is_lazy() and id(child) not in visited)
+                continue
+            visited.add(id(node))
+            if node._children is None: continue
+            new_children = [ExprNode._simplify_arg(child) for child in node._children]
+            mask_pos = ExprNode.MASK_ARGS.get(node._op)
+            if mask_pos is not None and mask_pos < len(new_children):
+                new_children[mask_pos] = ExprNode._strip_double_negation(new_children[mask_pos])
+            if any(a is not b for a, b in zip(node._children, new_children)):
+                for old, new in zip(node._children, new_children):
+                    if old is not new: ExprNode._unlink(old, new)
+                node._children = tuple(new_children)
+            ExprNode._simplify_node(node)
+            if id(node) in root_ids: ExprNode._simplify_root(node)
+
+    @staticmethod
+    def _simplify_arg(arg):
+        """Return a simpler replacement for ``arg`` in its parent's children list (or ``arg`` itself)."""
+        if not (isinstance(arg, ExprNode) and arg._is_lazy() and arg._children is not None): return arg
+        op = arg._op
+        children = arg._children
+        if len(children) == 2 and op in ExprNode.FOLDABLE_OPS and all(_is_num(c) for c in children):
+            try:
+                value = ExprNode.FOLDABLE_OPS[op](*[float(_num_value(c)) for c in children])
+            except (ArithmeticError, ValueError):
+                return arg
+            # Leave NaNs and infinities (e.g. of a negative number to a fractional power) for the server to produce
+            if math.isnan(value) or math.isinf(value): return arg
+            return int(value) if value.is_integer() and abs(value) < 2 ** 53 else value
+        if len(children) == 2:
+            for pos, const in ((0, children[0]), (1, children[1])):
+                operand = children[1 - pos]
+                if _is_num(const) and (op, pos, const) in ExprNode.IDENTITY_OPS and ExprNode._is_numeric(operand):
+                    return operand
+        return arg
+
+    @staticmethod
+    def _is_numeric(arg):
+        """True if ``arg`` is a frame known to have numeric columns only: by its op, or by its column types."""
+        if not isinstance(arg, ExprNode) or (not arg._cache.is_empty() and arg._cache.is_scalar()): return False
+        if arg._op in ExprNode.NUMERIC_OPS: return True
+        types = arg._cache.types
+        return bool(types) and all(t in {"int", "real"} for t in types.values())
+
+    @staticmethod
+    def _simplify_root(node):
+        """
+        Rewrite the root ``node`` in-place into its simpler replacement (see :meth:`_simplify_arg`), if that is a lazy
+        node referenced from this root only: a root cannot be replaced, since it is the node of an H2OFrame.
+        """
+        new = ExprNode._simplify_arg(node)
+        if not (isinstance(new, ExprNode) and new is not node and new._is_lazy() and new._refcnt == 1 and
+                new._children is not None): return
+        node._op = new._op
+        node._children = new._children
+        new._children = None  # the replacement is no longer part of the DAG
+
+    @staticmethod
+    def _unlink(old, new):
+        """
+        Drop the children of the node ``old`` that its parent replaces with ``new`` (one of its descendants), and of
+        the nodes in between, unless they are referenced from elsewhere too: otherwise ``new`` would still count their
+        references, and be made a temp as if it was shared.
+        """
+        refs = 1  # the reference of the parent, which is dropped once the replacement is done
+        while isinstance(old, ExprNode) and old is not new and old._is_lazy() and old._refcnt == refs and \
+                old._children is not None:
+            children = old._children
+            old._children = None
+            old = next((c for c in children if isinstance(c, ExprNode) and (c is new or c._refcnt == 0)), None)
+            refs = 0
+
+    @staticmethod
+    def _strip_double_negation(arg):
+        """Return ``X`` for a mask argument ``(!! (!! X))`` where ``X`` is boolean (or ``arg`` itself)."""
+        while isinstance(arg, ExprNode) and arg._is_lazy() and arg._op in {"!!", "not"} and len(arg._children) == 1:
+            inner = arg._children[0]
+            if not (isinstance(inner, ExprNode) and inner._is_lazy() and inner._op in {"!!", "not"} and
+                    len(inner._children) == 1): break
+            if not (isinstance(inner._children[0], ExprNode) and inner._children[0]._op in ExprNode.BOOLEAN_OPS): break
+            arg = inner._children[0]
+        return arg
+
+    @staticmethod
+    def _simplify_node(node):
+        """Rewrite ``node`` in-place into a cheaper equivalent form, if possible."""
+        while True:
+            op = node._op
+            children = node._children
+            inner = children[0] if children else None
+            if not (isinstance(inner, ExprNode) and inner._is_lazy() and inner._refcnt == 1 and inner._children):
+                return
+            if op in {"cols_py", "rows"} and inner._op == op:
+                merged = _compose_selectors(inner._children[1], children[1], allow_names=(op == "cols_py"))
+                if merged is None: return
+                node._children = (inner._children[0], merged)
+            elif op == "cols_py" and inner._op == "rows":
+                # Select columns first, and then filter rows of the (narrower) result
+                cols = ExprNode("cols_py", inner._children[0], children[1])
+                node._op = "rows"
+                node._children = (cols, inner._children[1])
+                inner._children = None
+                ExprNode._simplify_node(cols)
+                return
+            elif op == ":=" and inner._op == ":=":
+                merged = _merge_assignments(inner, node)
+                if merged is None: return
+                node._children = merged
+            else:
+                return
+            inner._children = None  # the inner node is no longer part of the DAG
+
+    def _references(self, target):
+        """True if ``target`` node occurs within the lazy DAG rooted at this node."""
+        visited = set()
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node is target: return True
+            if id(node) in visited or not node._is_lazy(): continue
+            visited.add(id(node))
+            stack.extend(child for child in node._children or () if isinstance(child, ExprNode))
+        return False
+
+    def _is_lazy(self):
+        """True if this node has been neither computed nor cached yet."""
+        return self._cache.is_empty() and self._cache._id is None
+
+    def _infer_schema(self):
+        """
+        Fill in the unknown shape, column names and column types of this lazy node from the schemas of its children,
+        as far as they can be determined on the client (see :func:`_infer_schema`). This allows inspecting the
+        structure of a lazy frame without evaluating it on the server.
+        """
+        if not self._is_lazy() or self._children is None: return
+        nrows, ncols, names, types = _infer_schema(self._op, self._children)
+        cache = self._cache
+        if not cache.nrows_valid(): cache.nrows = nrows
+        if not cache.ncols_valid(): cache.ncols = ncols
+        if not cache.names_valid() and names is not None: cache.names = list(names)
+        if not cache.types_valid() and types is not None: cache.types = dict(types)
+
+    # Build a rapids execution string.  Any object referenced more than once
+    # (see _refcnt) will be cached as a temp until the next client GC cycle -
+    # consuming memory.  Do Not Call This except when you need to do some
     # other cluster operation on the evaluated object.  Examples might be: lazy
     # dataset time parse vs changing the global timezone.  Global timezone change
     # is eager, so the time parse as to occur in the correct order relative to
     # the timezone change, so cannot be lazy.
     #
+    # The DAG is walked with an explicit stack and all the pieces are written into
+    # a single buffer which is joined once at the end, so the cost is linear in the
+    # size of the expression and arbitrarily deep DAGs do not hit the recursion
+    # limit.  A temp id is assigned once the node's subtree has been written, so
+    # the output is identical to a plain recursive pre-order traversal.
+    #
     def _get_ast_str(self, top):
         if not self._cache.is_empty():  # Data already computed and cached; could a "false-like" cached value
             return str(self._cache._data) if self._cache.is_scalar() else self._cache._id
         if self._cache._id is not None:
             return self._cache._id  # Data already computed under ID, but not cached
-        # assert isinstance(self._children,tuple)
-        exec_str = "({} {})".format(self._op, " ".join([ExprNode._arg_to_expr(ast) for ast in self._children]))
-        gc_ref_cnt = len(gc.get_referrers(self))
-        if top or gc_ref_cnt >= ExprNode.MAGIC_REF_COUNT:
-            self._cache._id = _py_tmp_key(append=h2o.connection().session_id)
-            exec_str = "(tmp= {} {})".format(self._cache._id, exec_str)
-        return exec_str
+        sb = []
+        # Each stack entry is [node, index of the next child, position of the temp id in sb (or None)]
+        stack = [self._open_ast(sb, top)]
+        while stack:
+            entry = stack[-1]
+            node, i = entry[0], entry[1]
+            children = node._children
+            if i < len(children):
+                entry[1] = i + 1
+                if i:
+                    sb.append(" ")
+                child = children[i]
+                if isinstance(child, ExprNode) and child._is_lazy():
+                    stack.append(child._open_ast(sb, False))
+                else:
+                    sb.append(ExprNode._arg_to_expr(child))
+                continue
+            sb.append(")")
+            if entry[2] is not None:
+                node._cache._id = _py_tmp_key(append=h2o.connection().session_id)
+                Scope._record(node._cache._id, node._scopes)
+                sb[entry[2]] = node._cache._id
+                sb.append(")")
+            stack.pop()
+        return "".join(sb)
+
+    def _open_ast(self, sb, top):
+        """Write the opening of this (lazy) node into ``sb`` and return its serialisation stack entry."""
+        id_pos = None
+        if top or self._refcnt > 1:
+            sb.append("(tmp= ")
+            id_pos = len(sb)
+            sb.append(None)  # placeholder for the temp id, filled in once the subtree is written
+            sb.append(" ")
+        sb.append("(%s " % self._op)
+        return [self, 0, id_pos]
 
     @staticmethod
     def _arg_to_expr(arg):
@@ -155,8 +471,10 @@ class ExprNode(object):
 
     def __del__(self):
         try:
-            if self._cache._id is not None and self._children is not None:
-                ExprNode.rapids("(rm {})".format(self._cache._id))
+            is_tmp = self._cache._id is not None and self._children is not None
+            self._children = None  # release references to the child nodes
+            if is_tmp:
+                h2o.connection().defer_removal(self._cache._id)  # removed in batches, never from the finalizer
         except (AttributeError, H2OConnectionError):
             pass
 
@@ -171,18 +489,27 @@ class ExprNode(object):
         return ' '.join(["(" + self._op] + [ExprNode._arg_to_expr(a) for a in self._children] + [")"])
 
     def _2_string(self, depth=0, sb=None):
-        sb += ['\n', " " * depth, "(" + self._op, " "]
-        if self._children is not None:
-            for child in self._children:
+        # Walk the DAG with an explicit stack: entries are (node, depth) pairs to open, or closing strings
+        stack = [(self, depth)]
+        while stack:
+            item = stack.pop()
+            if not isinstance(item, tuple):
+                sb += item
+                continue
+            node, d = item
+            sb += ['\n', " " * d, "(" + node._op, " "]
+            todo = []
+            for child in node._children or ():
                 if _is_fr(child) and child._ex._cache._id is None:
-                    child._ex._2_string(depth + 2, sb)
+                    todo.append((child._ex, d + 2))
                 elif _is_fr(child):
-                    sb += ['\n', ' ' * (depth + 2), child._ex._cache._id]
+                    todo.append(['\n', ' ' * (d + 2), child._ex._cache._id])
                 elif isinstance(child, ExprNode):
-                    child._2_string(depth + 2, sb)
+                    todo.append((child, d + 2))
                 else:
-                    sb += ['\n', ' ' * (depth + 2), str(child)]
-        sb += ['\n', ' ' * depth + ") "] + ['\n'] * (depth == 0)  # add a \n if depth == 0
+                    todo.append(['\n', ' ' * (d + 2), str(child)])
+            todo.append(['\n', ' ' * d + ") "] + ['\n'] * (d == 0))  # add a \n if depth == 0
+            stack.extend(reversed(todo))
         return sb
 
     def __repr__(self):
@@ -206,6 +533,458 @@ class ExprNode(object):
 
 
 
+def _is_num(x):
+    """True if ``x`` is a numeric constant: a python number, or an evaluated scalar expression."""
+    if isinstance(x, ExprNode):
+        return not x._cache.is_empty() and x._cache.is_scalar() and _is_num(x._cache._data)
+    return isinstance(x, (int, float)) and not isinstance(x, bool) and not math.isnan(x)
+
+
+def _num_value(x):
+    return x._cache._data if isinstance(x, ExprNode) else x
+
+
+# Selectors are merged into an explicit list of indices only up to this length; longer ones stay nested
+_MAX_MERGED_SELECTOR = 1000
+
+
+def _selector_as_list(sel, allow_names):
+    """Convert a (non-negative) row / column selector into a sequence of indices (or names), or return None."""
+    if isinstance(sel, slice):
+        if sel.start is None or sel.stop is None or sel.start < 0 or (sel.step or 1) < 1: return None
+        return range(sel.start, sel.stop, sel.step or 1)
+    if isinstance(sel, bool): return None
+    if isinstance(sel, int): return [sel] if sel >= 0 else None
+    if allow_names and isinstance(sel, str): return [sel]
+    if isinstance(sel, list) and sel:
+        if all(isinstance(x, int) and not isinstance(x, bool) and x >= 0 for x in sel): return sel
+        if allow_names and all(isinstance(x, str) for x in sel): return sel
+    return None
+
+
+def _compose_selectors(inner, outer, allow_names):
+    """Return a single selector equivalent to applying selector ``inner`` and then ``outer``, or None."""
+    inner_list = _selector_as_list(inner, allow_names)
+    outer_list = _selector_as_list(outer, allow_names)
+    if not inner_list or not outer_list: return None
+    if isinstance(outer_list[0], str):
+        # Selection by names is not affected by a previous selection, as long as it kept those names
+        if not (isinstance(inner_list[0], str) and set(outer_list) <= set(inner_list)): return None
+        return outer
+    if isinstance(outer_list, range):
+        if outer_list[-1] >= len(inner_list): return None
+    elif any(i >= len(inner_list) for i in outer_list):
+        return None
+    if isinstance(inner_list, range) and isinstance(outer_list, range):
+        # A slice of a slice is a slice
+        start = inner_list[outer_list[0]]
+        if len(outer_list) == 1: return slice(start, start + 1)
+        step = inner_list.step * outer_list.step
+        return slice(start, inner_list[outer_list[-1]] + 1, step if step > 1 else None)
+    if len(outer_list) > _MAX_MERGED_SELECTOR: return None
+    merged = [inner_list[i] for i in outer_list]
+    return merged[0] if isinstance(outer, int) else merged
+
+
+def _merge_assignments(first, second):
+    """
+    Merge ``second = (:= first v2 c2 [])`` with ``first = (:= X v1 c1 [])`` into the children of a single node
+    ``(:= X (cbind v1 v2) [c1 c2] [])``, or return None if this is not possible.
+    """
+    dst, value1, cols1, rows1 = first._children
+    _, value2, cols2, rows2 = second._children
+    if rows1 is not None or rows2 is not None: return None
+    cols1 = cols1 if isinstance(cols1, list) else [cols1]
+    if not (isinstance(cols2, int) and not isinstance(cols2, bool) and cols2 >= 0 and cols2 not in cols1): return None
+    if not all(isinstance(c, int) and not isinstance(c, bool) and c >= 0 for c in cols1): return None
+    if _is_num(value1) and _is_num(value2) and _num_value(value1) == _num_value(value2):
+        value = value1
+    elif isinstance(value1, ExprNode) and isinstance(value2, ExprNode) and value2._cache.ncols == 1 and \
+            (value1._cache.ncols == 1 or value1._op == "cbind" and value1._is_lazy() and value1._refcnt == 1 and
+             len(cols1) == len(value1._children)):
+        if value2._references(first): return None  # second value was computed from the result of first assignment
+        if value1._op == "cbind" and len(cols1) > 1:
+            value = ExprNode("cbind", *(value1._children + (value2,)))
+        else:
+            value = ExprNode("cbind", value1, value2)
+        value._cache.ncols = len(cols1) + 1
+    else:
+        return None
+    return dst, value, cols1 + [cols2], None
+
+
+
+
+# ---------------------------------------------------------------------------------------------------------------------
+# Client-side schema inference
+# ---------------------------------------------------------------------------------------------------------------------
+
+# Binary operators: the result has the shape and column names of the (wider) frame operand.  H2O reports a numeric
+# column as "int" or "real" depending on its values, so the result types are only known for comparisons (0/1 values)
+# and for operators that map integers to integers.
+_COMPARISON_OPS = {"==", "!=", "<", "<=", ">", ">=", "&", "|", "&&", "||"}
+_INTEGRAL_OPS = {"+", "-", "*", "%", "intDiv"}
+_BINARY_OPS = _COMPARISON_OPS | ExprNode.ARITHMETIC_OPS
+# Unary operators that rename each column `c` of the frame into `op(c)`; with the result types when they are known.
+_RENAMING_UNARY_OPS = {op: None for op in ExprNode.NUMERIC_OPS - _BINARY_OPS - {"!!", "is.na"}}
+_RENAMING_UNARY_OPS["not"] = "int"
+_UNKNOWN_SCHEMA = (-1, -1, None, None)
+
+
+def _schema_of(arg):
+    """
+    Return the ``(nrows, ncols, names, types)`` of a frame argument as currently known to the client (with -1 / None
+    for the unknown parts), or None if the argument is a scalar.
+    """
+    if not isinstance(arg, ExprNode): return None
+    cache = arg._cache
+    if not cache.is_empty() and cache.is_scalar(): return None
+    return cache.nrows, cache.ncols, cache.names, cache.types
+
+
+def _types_for(names, types):
+    """Types of the ``names`` columns, given the ``types`` dictionary of the source frame (if known)."""
+    if names is None or types is None or any(name not in types for name in names): return None
+    return {name: types[name] for name in names}
+
+
+def _select_columns(schema, sel):
+    """Schema of the frame ``schema`` after selecting the columns ``sel`` (a name, an index, a list or a slice)."""
+    nrows, ncols, names, types = schema
+    new_ncols, new_names = -1, None
+    if isinstance(sel, str):
+        new_ncols, new_names = 1, [sel]
+    elif isinstance(sel, int):
+        new_ncols = 1
+        if names is not None and -len(names) <= sel < len(names):
+            new_names = [names[sel]]
+    elif isinstance(sel, list):
+        new_ncols = len(sel)
+        if all(isinstance(x, str) for x in sel):
+            new_names = sel
+        elif names is not None and all(isinstance(x, int) and -len(names) <= x < len(names) for x in sel):
+            new_names = [names[x] for x in sel]
+    elif isinstance(sel, slice):
+        if names is not None:
+            new_names = names[sel]
+            new_ncols = len(new_names)
+        elif sel.start is not None and sel.stop is not None and sel.start >= 0:
+            new_ncols = len(range(sel.start, sel.stop, sel.step or 1))
+    if new_names is not None and len(set(new_names)) != len(new_names):
+        new_names = None
+    if new_names is not None and names is not None and any(name not in names for name in new_names):
+        new_ncols, new_names = -1, None  # selecting a non-existent column is an error on the server
+    return nrows, new_ncols, new_names, _types_for(new_names, types)
+
+
+def _select_rows(schema, sel):
+    """Schema of the frame ``schema`` after selecting the rows ``sel`` (an index, a list, a slice or a frame)."""
+    nrows, ncols, names, types = schema
+    if isinstance(sel, list):
+        nrows = len(sel)
+    elif isinstance(sel, slice):
+        nrows = -1 if sel.start is None or sel.stop is None else len(range(sel.start, sel.stop, sel.step or 1))
+    elif isinstance(sel, int):
+        nrows = 1
+    else:
+        nrows = -1
+    return nrows, ncols, names, types
+
+
+def _binop_schema(op, args):
+    lhs, rhs = _schema_of(args[0]), _schema_of(args[1])
+    if lhs is None and rhs is None: return _UNKNOWN_SCHEMA
+    if lhs is None or rhs is None:
+        frame = rhs if lhs is None else lhs
+        nrows = frame[0]
+    else:
+        if lhs[1] < 0 or rhs[1] < 0: return _UNKNOWN_SCHEMA
+        frame = rhs if lhs[1] == 1 and rhs[1] > 1 else lhs
+        # Frames with different numbers of rows are broadcast by the server: leave the result's rows to the server
+        nrows = lhs[0] if lhs[0] == rhs[0] else -1
+    names = frame[2]
+    types = None
+    if names is not None:
+        if op in _COMPARISON_OPS:
+            types = {name: "int" for name in names}
+        elif op in _INTEGRAL_OPS and all(_is_integral(arg) for arg in args):
+            types = {name: "int" for name in names}
+    return nrows, frame[1], names, types
+
+
+def _is_integral(arg):
+    """True if the operand ``arg`` (a frame or a scalar) is known to hold only integers."""
+    schema = _schema_of(arg)
+    if schema is None:
+        value = arg._cache._data if isinstance(arg, ExprNode) else arg
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and float(value).is_integer()
+    return schema[3] is not None and all(t == "int" for t in viewvalues(schema[3]))
+
+
+def _cbind_schema(args):
+    nrows, ncols, names, types = -1, 0, [], {}
+    for arg in args:
+        schema = _schema_of(arg)
+        if schema is None:
+            ncols += 1
+            names = types = None  # the server names a constant column after its value
+            continue
+        if schema[1] < 0: return _UNKNOWN_SCHEMA
+        if nrows < 0: nrows = schema[0]
+        ncols += schema[1]
+        if names is not None and schema[2] is not None:
+            names += schema[2]
+            if types is not None and schema[3] is not None:
+                types.update(schema[3])
+            else:
+                types = None
+        else:
+            names = types = None
+    if names is not None and len(set(names)) != len(names):
+        names = types = None  # the server makes duplicate names unique
+    return nrows, ncols, names, types
+
+
+def _rbind_schema(args):
+    schemas = [_schema_of(arg) for arg in args]
+    if schemas[0] is None: return _UNKNOWN_SCHEMA
+    nrows = 0
+    for schema in schemas:
+        if schema is None:
+            nrows += 1
+        elif nrows >= 0 and schema[0] >= 0:
+            nrows += schema[0]
+        else:
+            nrows = -1
+    _, ncols, names, types = schemas[0]
+    if any(schema is not None and schema[3] != types for schema in schemas):
+        types = None  # e.g. an "int" column stacked on a "real" one becomes "real"
+    return nrows, ncols, names, types
+
+
+def _append_schema(dst, src, colname):
+    if dst is None: return _UNKNOWN_SCHEMA
+    nrows, ncols, names, types = dst
+    ncols = ncols + 1 if ncols >= 0 else -1
+    if names is None or colname in names:
+        return nrows, ncols, None, None
+    if types is not None:
+        if src is None:
+            types = None
+        elif src[3] is not None and len(src[3]) == 1:
+            types = dict(types)
+            types[colname] = list(viewvalues(src[3]))[0]
+        else:
+            types = None
+    return nrows, ncols, names + [colname], types
+
+
+def _assign_schema(dst, src, cols, rows):
+    """Schema of the frame ``dst`` after its ``cols`` columns (in the ``rows`` rows, if given) were set to ``src``."""
+    nrows, ncols, names, types = dst
+    if types is None: return dst
+    targets = names if cols is None else _select_columns(dst, cols)[2]
+    src_schema = _schema_of(src)
+    if src_schema is not None:
+        src_names, src_types = src_schema[2], src_schema[3]
+        if src_types is None or src_names is None or len(src_names) not in (1, len(targets or [])):
+            return nrows, ncols, names, None
+        new_types = [src_types[src_names[i if len(src_names) > 1 else 0]] for i in range(len(targets))]
+    elif _is_integral(src):
+        new_types = ["int"] * len(targets or [])
+    elif isinstance(src, (int, float)) and not isinstance(src, bool) and not math.isnan(src):
+        new_types = ["real"] * len(targets or [])
+    else:
+        return nrows, ncols, names, None
+    if targets is None: return nrows, ncols, names, None
+    types = dict(types)
+    for target, new_type in zip(targets, new_types):
+        # When only some rows are replaced the column holds a mix of old and new values; its type is then only
+        # known if both agree, and is not "real" (which turns into "int" if all the fractional values got replaced).
+        if rows is not None and (new_type != types.get(target) or new_type == "real"):
+            return nrows, ncols, names, None
+        types[target] = new_type
+    return nrows, ncols, names, types
+
+
+def _groupby_schema(args):
+    frame = _schema_of(args[0])
+    by, aggs = args[1], args[2:]
+    if frame is None or not isinstance(by, list) or len(aggs) % 3: return _UNKNOWN_SCHEMA
+    ncols = len(by) + len(aggs) // 3
+    names = frame[2]
+    if names is not None:
+        try:
+            names = [names[i] for i in by] + ["%s_%s" % (aggs[i], names[aggs[i + 1]]) for i in range(0, len(aggs), 3)]
+        except (IndexError, TypeError):
+            names = None
+    if names is not None and len(set(names)) != len(names):
+        names = None
+    return -1, ncols, names, None
+
+
+def _infer_schema(op, args):
+    """
+    Compute ``(nrows, ncols, names, types)`` of the result of applying Rapids ``op`` to ``args``, as far as it can
+    be determined on the client from the schemas of the arguments (the unknown parts are -1 / None).
+    """
+    if op in _BINARY_OPS and len(args) == 2:
+        return _binop_schema(op, args)
+    frame = _schema_of(args[0]) if args else None
+    if frame is None:
+        return _UNKNOWN_SCHEMA
+    nrows, ncols, names, types = frame
+    if op in _RENAMING_UNARY_OPS and len(args) == 1:
+        names = None if names is None else ["%s(%s)" % (op, name) for name in names]
+        rtype = _RENAMING_UNARY_OPS[op]
+        return nrows, ncols, names, (None if names is None or rtype is None else {name: rtype for name in names})
+    if op == "is.na":
+        names = None if names is None else ["isNA(%s)" % name for name in names]
+        return nrows, ncols, names, (None if names is None else {name: "int" for name in names})
+    if op == "cols_py" and len(args) == 2:
+        return _select_columns(frame, args[1])
+    if op == "rows" and len(args) == 2:
+        return _select_rows(frame, args[1])
+    if op == "cbind":
+        return _cbind_schema(args)
+    if op == "rbind":
+        return _rbind_schema(args)
+    if op == "append" and len(args) == 3:
+        return _append_schema(frame, _schema_of(args[1]), args[2])
+    if op == ":=" and len(args) == 4:
+        return _assign_schema(frame, args[1], args[2], args[3])
+    if op == "as.factor":
+        return nrows, ncols, names, (None if names is None else {name: "enum" for name in names})
+    if op == "ifelse":
+        return nrows, ncols, (None if ncols < 0 else ["C%d" % (i + 1) for i in range(ncols)]), None
+    if op == "GB":
+        return _groupby_schema(args)
+    return _UNKNOWN_SCHEMA
+
+
+
+class DeferredEvaluation(object):
+    """
+    Context manager that collects all lazy frames created within its block, and evaluates them at the end of the
+    block in a single Rapids request (see :func:`h2o.deferred_evaluation`).
+    """
+    _active = []  # stack of the currently open ``with`` blocks
+
+    def __init__(self):
+        self._frames = []  # weak references to the frames created within the block
+
+    def evaluate(self):
+        """Evaluate all frames collected so far (that are still alive)."""
+        frames = [fr for fr in (ref() for ref in self._frames) if fr is not None and fr._ex is not None]
+        self._frames = []
+        ExprNode._eval_batch([fr._ex for fr in frames])
+
+    def _register(self, frame):
+        self._frames.append(weakref.ref(frame))
+
+    def __enter__(self):
+        DeferredEvaluation._active.append(self)
+        return self
+
+    def __exit__(self, *args):
+        DeferredEvaluation._active.remove(self)
+        if args[0] is None:
+            self.evaluate()
+        return False  # ensure that any exception will be re-raised
+
+
+
+class Scope(object):
+    """
+    Context manager that records the keys of all frames and models created within its block, and removes them
+    from the cluster at the end of the block in a single request (see :func:`h2o.scope`).
+
+    After the block has finished, ``removed`` holds the list of removed keys and ``bytes_freed`` the total size
+    of the removed frames as reported by the server (columns shared with frames outside of the scope are counted,
+    even though the server keeps them).
+    """
+    _active = []  # stack of the currently open ``with`` blocks
+
+    def __init__(self, keep=None):
+        self._keys = []  # keys created within the block, in order of creation
+        self._keep = []  # frames, models or keys that should survive the block
+        self.removed = []
+        self.bytes_freed = 0
+        if keep is not None:
+            self.keep(keep)
+
+    def keep(self, *objs):
+        """
+        Exclude the given frames, models or keys (or lists of those) from removal at the end of the block.
+
+        :returns: this scope.
+        """
+        for obj in objs:
+            if isinstance(obj, (list, tuple)):
+                self._keep.extend(obj)
+            else:
+                self._keep.append(obj)
+        return self
+
+    @staticmethod
+    def _record(key, scopes=None):
+        """
+        Register a frame or model key that has just been created on the cluster with all the active scopes, or
+        only with those of the given ``scopes`` that are still active (e.g. the scopes in which a lazy expression
+        was created, which may be evaluated later).
+        """
+        for scope in Scope._active:
+            if key not in scope._keys and (scopes is None or scope in scopes):
+                scope._keys.append(key)
+
+    @staticmethod
+    def _rename(old_key, new_key):
+        for scope in Scope._active:
+            if old_key in scope._keys:
+                scope._keys[scope._keys.index(old_key)] = new_key
+
+    def _kept_keys(self):
+        keys = set()
+        for obj in self._keep:
+            if _is_fr(obj):
+                if obj._ex is None: continue
+                obj._ex._eager_frame()  # a lazy frame may depend on temporaries that are about to be removed
+                keys.add(obj.frame_id)
+            elif isinstance(obj, str):
+                keys.add(obj)
+            else:
+                keys.add(obj.model_id)
+        return keys
+
+    @staticmethod
+    def _byte_size(key):
+        """Size of the frame with the given key, or 0 if the key is not a frame."""
+        try:
+            # column_count=1 keeps the description of the columns short: only the frame's byte_size is needed
+            res = h2o.api("GET /3/Frames/%s" % key, data={"row_count": 0, "column_count": 1})
+        except H2OResponseError:
+            return 0
+        return max(res["frames"][0]["byte_size"], 0)
+
+    def __enter__(self):
+        Scope._active.append(self)
+        return self
+
+    def __exit__(self, *args):
+        kept = self._kept_keys()
+        Scope._active.remove(self)
+        doomed = [key for key in self._keys if key not in kept]
+        if doomed:
+            self.bytes_freed = sum(Scope._byte_size(key) for key in doomed)
+            h2o.connection()._remove_keys(doomed)
+            for scope in Scope._active:
+                scope._keys = [key for key in scope._keys if key not in doomed]
+        self.removed = doomed
+        return False  # ensure that any exception will be re-raised
+
+
+
+
 class ASTId:
     def __init__(self, name=None):
         if name is None:
@@ -303,6 +1082,10 @@ class H2OCache(object):
             if rows <= len(self):
                 return
         res = h2o.api("GET /3/Frames/%s" % self._id, data={"row_count": rows})["frames"][0]
+        self._fill_from_frame_json(res, rows)
+
+    def _fill_from_frame_json(self, res, rows):
+        """Populate the cache from the FrameV3 json returned by ``GET /3/Frames/{id}?row_count={rows}``."""
         self._l = rows
         self._nrows = res["rows"]
         self._ncols = res["total_column_count"]
@@ -9,29 +9,38 @@ from __future__ import absolute_import, division, print_function, unicode_litera
 
 import csv
 import datetime
+import fnmatch
 import functools
+import hashlib
+import io
+import json
 import os
+import struct
 import sys
-import tempfile
+import threading
 import traceback
 import warnings
+import zlib
 from io import StringIO
+from multiprocessing.pool import ThreadPool
 from types import FunctionType
 
 import requests
 
 import h2o
 from h2o.display import H2ODisplay
-from h2o.exceptions import H2OTypeError, H2OValueError
-from h2o.expr import ExprNode
+from h2o.exceptions import H2OResponseError, H2OServerError, H2OTypeError, H2OValueError
+from h2o.expr import DeferredEvaluation, ExprNode, Scope, _schema_of, _select_columns, _select_rows
 from h2o.group_by import GroupBy
 from h2o.job import H2OJob
 from h2o.utils.compatibility import *  # NOQA
-from h2o.utils.compatibility import viewitems, viewvalues
+from h2o.utils.compatibility import viewitems
 from h2o.utils.config import get_config_value
-from h2o.utils.shared_utils import (_handle_numpy_array, _handle_pandas_data_frame, _handle_python_dicts,
-                                    _handle_python_lists, _is_list, _is_str_list, _py_tmp_key, _quoted,
-                                    can_use_pandas, quote, normalize_slice, slice_is_normalized, check_frame_id)
+from h2o.utils.progressbar import ProgressBar
+from h2o.utils.shared_utils import (_column_types, _COMPRESSED_MAGICS, _encode_csv_columns, _encode_csv_rows,
+                                    _encode_svmlight, _handle_python_dicts, _handle_python_lists, _is_list,
+                                    _numpy_array_columns, _pandas_data_frame_columns, _py_tmp_key, _quoted,
+                                    can_use_pandas, quote, normalize_slice, check_frame_id)
 from h2o.utils.typechecks import (assert_is_type, assert_satisfies, Enum, I, is_type, numeric, numpy_ndarray,
                                   numpy_datetime, pandas_dataframe, pandas_timestamp, scipy_sparse, U)
 
@@ -49,6 +58,9 @@ class H2OFrame(object):
     ``H2OFrame`` represents a mere handle to that data.
     """
 
+    # Cache of the uploaded frames (an ``_UploadCache``), if enabled with ``h2o.enable_upload_cache()``
+    _upload_cache = None
+
     #-------------------------------------------------------------------------------------------------------------------
     # Construction
     #-------------------------------------------------------------------------------------------------------------------
@@ -103,6 +115,26 @@ class H2OFrame(object):
             self._upload_python_object(python_obj, destination_frame, header, separator,
                                        column_names, column_types, na_strings)
 
+    @property
+    def _ex(self):
+        return self._ex_node
+
+    @_ex.setter
+    def _ex(self, expr):
+        # The frame holds a reference to its expression node; keep the node's reference count up-to-date
+        if expr is not None: expr._refcnt += 1
+        old_expr = self.__dict__.get("_ex_node")
+        if old_expr is not None: old_expr._refcnt -= 1
+        self._ex_node = expr
+        if expr is not None and DeferredEvaluation._active and expr._is_lazy():
+            DeferredEvaluation._active[-1]._register(self)
+
+    def __del__(self):
+        try:
+            self._ex = None
+        except AttributeError:
+            pass
+
     @staticmethod
     def _expr(expr, cache=None):
         # TODO: merge this method with `__init__`
@@ -110,6 +142,8 @@ class H2OFrame(object):
         fr._ex = expr
         if cache is not None:
             fr._ex._cache.fill_from(cache)
+        else:
+            fr._ex._infer_schema()
         return fr
 
 
@@ -119,31 +153,30 @@ class H2OFrame(object):
         if is_type(python_obj, scipy_sparse):
             self._upload_sparse_matrix(python_obj, destination_frame=destination_frame)
             return
-        # TODO: all these _handlers should really belong to this class, not to shared_utils.
-        processor = (_handle_pandas_data_frame if is_type(python_obj, pandas_dataframe) else
-                     _handle_numpy_array if is_type(python_obj, numpy_ndarray) else
-                     _handle_python_dicts if is_type(python_obj, dict) else
-                     _handle_python_lists)
-        col_header, data_to_write = processor(python_obj, header)
-        if col_header is None or data_to_write is None:
-            raise H2OValueError("No data to write")
+        # The data is encoded as CSV in blocks, and streamed to the server as it is being encoded
+        if is_type(python_obj, pandas_dataframe, numpy_ndarray):
+            col_header, columns = (_pandas_data_frame_columns(python_obj) if is_type(python_obj, pandas_dataframe) else
+                                   _numpy_array_columns(python_obj, header))
+            blocks = _encode_csv_columns(column_names or col_header, columns)
+            # The types follow from the dtypes, unless given explicitly (parse_setup rejects the invalid ones)
+            types = _column_types(columns)
+            names = column_names or col_header
+            if is_type(column_types, dict) and set(column_types).issubset(names):
+                column_types = [column_types.get(name, t) for name, t in zip(names, types)]
+            elif column_types is None or len(column_types) == len(types):
+                column_types = [ct or t for ct, t in zip(column_types or types, types)]
+        else:
+            # TODO: all these _handlers should really belong to this class, not to shared_utils.
+            processor = _handle_python_dicts if is_type(python_obj, dict) else _handle_python_lists
+            col_header, data_to_write = processor(python_obj, header)
+            if col_header is None or data_to_write is None:
+                raise H2OValueError("No data to write")
+            keys = col_header if data_to_write and isinstance(data_to_write[0], dict) else None
+            blocks = _encode_csv_rows(column_names or col_header, data_to_write, keys)
         if not column_names:
             column_names = col_header
-
-        # create a temporary file that will be written to
-        tmp_handle, tmp_path = tempfile.mkstemp(suffix=".csv")
-        tmp_file = os.fdopen(tmp_handle, 'w')
-        # create a new csv writer object thingy
-        csv_writer = csv.writer(tmp_file, dialect="excel", quoting=csv.QUOTE_NONNUMERIC)
-        csv_writer.writerow(column_names)
-        if data_to_write and isinstance(data_to_write[0], dict):
-            for row in data_to_write:
-                csv_writer.writerow([row.get(k, None) for k in col_header])
-        else:
-            csv_writer.writerows(data_to_write)
-        tmp_file.close()  # close the streams
-        self._upload_parse(tmp_path, destination_frame, 1, separator, column_names, column_types, na_strings)
-        os.remove(tmp_path)  # delete the tmp file
+        self._upload_parse(blocks, destination_frame, 1, separator, column_names, column_types, na_strings,
+                           source=python_obj)
 
 
     def _upload_sparse_matrix(self, matrix, destination_frame=None):
@@ -151,40 +184,17 @@ class H2OFrame(object):
         if not sp.issparse(matrix):
             raise H2OValueError("A sparse matrix expected, got %s" % type(matrix))
 
-        tmp_handle, tmp_path = tempfile.mkstemp(suffix=".svmlight")
-        out = os.fdopen(tmp_handle, "wt")
         if destination_frame is None:
             destination_frame = _py_tmp_key(h2o.connection().session_id)
 
-        # sp.find(matrix) returns (row indices, column indices, values) of the non-zero elements of A. Unfortunately
-        # there is no guarantee that those elements are returned in the correct order, so need to sort
-        data = zip(*sp.find(matrix))
-        if not isinstance(data, list): data = list(data)  # possibly convert from iterator to a list
-        data.sort()
-        idata = 0  # index of the next element to be consumed from `data`
-        for irow in range(matrix.shape[0]):
-            if idata < len(data) and data[idata][0] == irow and data[idata][1] == 0:
-                y = data[idata][2]
-                idata += 1
-            else:
-                y = 0
-            out.write(str(y))
-            while idata < len(data) and data[idata][0] == irow:
-                out.write(" ")
-                out.write(str(data[idata][1]))
-                out.write(":")
-                out.write(str(data[idata][2]))
-                idata += 1
-            out.write("\n")
-        out.close()
-
-        ret = h2o.api("POST /3/PostFile", filename=tmp_path)
-        os.remove(tmp_path)
+        # The SVMLight text is streamed to the server as it is being generated from the matrix
+        ret = h2o.api("POST /3/PostFile", filename=_encode_svmlight(matrix))
         rawkey = ret["destination_frame"]
 
         p = {"source_frames": [rawkey], "destination_frame": destination_frame}
         H2OJob(h2o.api("POST /3/ParseSVMLight", data=p), "Parse").poll()
         self._ex._cache._id = destination_frame
+        Scope._record(destination_frame)
         self._ex._cache.fill()
 
 
@@ -276,6 +286,7 @@ class H2OFrame(object):
             oldname = self.frame_id
             self._ex._cache._id = newid
             h2o.rapids("(rename \"{}\" \"{}\")".format(oldname, newid))
+            Scope._rename(oldname, newid)
 
 
     def type(self, col):
@@ -301,23 +312,49 @@ class H2OFrame(object):
         raise H2OValueError("Column '%r' does not exist in the frame" % col)
 
 
-    def _import_parse(self, path, pattern, destination_frame, header, separator, column_names, column_types, na_strings):
+    def _import_parse(self, path, pattern, destination_frame, header, separator, column_names, column_types, na_strings,
+                      templates=None):
         if is_type(path, str) and "://" not in path:
             path = os.path.abspath(path)
         rawkey = h2o.lazy_import(path, pattern)
-        self._parse(rawkey, destination_frame, header, separator, column_names, column_types, na_strings)
+        self._parse(rawkey, destination_frame, header, separator, column_names, column_types, na_strings,
+                    templates, rawkey)
         return self
 
 
-    def _upload_parse(self, path, destination_frame, header, sep, column_names, column_types, na_strings):
-        ret = h2o.api("POST /3/PostFile", filename=path)
-        rawkey = ret["destination_frame"]
-        self._parse(rawkey, destination_frame, header, sep, column_names, column_types, na_strings)
+    def _upload_parse(self, path, destination_frame, header, sep, column_names, column_types, na_strings,
+                      threads=1, source=None, templates=None):
+        # The fingerprint is computed before the upload, in case the source changes meanwhile
+        cache = H2OFrame._upload_cache
+        options = [destination_frame, header, sep, column_names, column_types, na_strings, templates]
+        fingerprint = cache.fingerprint(path if source is None else source, options) if cache else None
+        if fingerprint and cache.load(self, fingerprint):
+            return self
+        if is_type(path, list):
+            rawkey = _upload_files(path, threads)
+        else:
+            rawkey = h2o.api("POST /3/PostFile", filename=path)["destination_frame"]
+        self._parse(rawkey, destination_frame, header, sep, column_names, column_types, na_strings,
+                    templates, path, uploaded=True)
+        if fingerprint:
+            cache.store(self, fingerprint)
         return self
 
 
     def _parse(self, rawkey, destination_frame="", header=None, separator=None, column_names=None, column_types=None,
-               na_strings=None):
+               na_strings=None, templates=None, sources=None, uploaded=False):
+        template = _find_parse_template(templates, sources) if templates else None
+        if template is not None:
+            if uploaded:
+                # The server does not guess the chunk size of the uploaded files either
+                template = dict(template, chunk_size=_UPLOAD_CHUNK_SIZE)
+            setup = h2o.parse_setup(rawkey, destination_frame, header, separator, column_names, column_types,
+                                    na_strings, template)
+            try:
+                return self._parse_raw(setup)
+            except (H2OResponseError, H2OServerError):
+                # The server rejected the template: parse the files with its guess instead
+                pass
         setup = h2o.parse_setup(rawkey, destination_frame, header, separator, column_names, column_types, na_strings)
         return self._parse_raw(setup)
 
@@ -348,6 +385,7 @@ class H2OFrame(object):
         # Need to return a Frame here for nearly all callers
         # ... but job stats returns only a dest_key, requiring another REST call to get nrow/ncol
         self._ex._cache._id = p["destination_frame"]
+        Scope._record(self._ex._cache._id)
         self._ex._cache.fill()
 
 
@@ -516,17 +554,20 @@ class H2OFrame(object):
         """
         Returns new H2OFrame equal to elementwise Logical NOT applied to the current frame.
         """
-        return H2OFrame._expr(expr=ExprNode("not", self), cache=self._ex._cache)
+        return H2OFrame._expr(expr=ExprNode("not", self))
 
 
     def _unop(self, op, rtype="real"):
-        if self._is_frame:
-            for cname, ctype in self.types.items():
+        if self._is_frame and self._ex._cache.types_valid():  # otherwise leave the check to the server
+            for cname, ctype in self._ex._cache.types.items():
                 if ctype not in {"int", "real", "bool"}:
                     raise H2OValueError("Function %s cannot be applied to %s column '%s'" % (op, ctype, cname))
         ret = H2OFrame._expr(expr=ExprNode(op, self), cache=self._ex._cache)
-        ret._ex._cache._names = ["%s(%s)" % (op, name) for name in self._ex._cache._names]
-        ret._ex._cache._types = {name: rtype for name in ret._ex._cache._names}
+        if self._ex._cache.names_valid():
+            ret._ex._cache._names = ["%s(%s)" % (op, name) for name in self._ex._cache._names]
+            ret._ex._cache._types = {name: rtype for name in ret._ex._cache._names}
+        else:
+            ret._ex._cache._types = None
         return ret
 
 
@@ -1220,7 +1261,7 @@ class H2OFrame(object):
                 print("num {}".format(" ".join(it[0] if it else "nan" for it in h2o.as_list(self[:10, i], False)[1:])))
 
 
-    def as_data_frame(self, use_pandas=True, header=True):
+    def as_data_frame(self, use_pandas=True, header=True, columnar=False):
         """
         Obtain the dataset as a python-local object.
 
@@ -1228,12 +1269,20 @@ class H2OFrame(object):
             ``pandas`` library was installed). If False, then return the contents of the H2OFrame as plain nested
             list, in a row-wise order.
         :param bool header: If True (default), then column names will be appended as the first row in list
+        :param bool columnar: If True, download the frame in a binary columnar format instead of CSV text (only
+            with ``use_pandas``). This is much faster and uses less memory for large frames, and the columns of the
+            pandas DataFrame follow the H2O column types: categorical columns are represented as
+            ``pandas.Categorical``, and time columns as ``datetime64`` values (with CSV they are parsed by
+            ``pandas.read_csv``, as strings and milliseconds since the epoch respectively).
 
         :returns: A python object (a list of lists of strings, each list is a row, if use_pandas=False, otherwise
             a pandas DataFrame) containing this H2OFrame instance's data.
         """
+        assert_is_type(columnar, bool)
         if can_use_pandas() and use_pandas:
             import pandas
+            if columnar:
+                return self._as_data_frame_columnar()
             return pandas.read_csv(StringIO(self.get_frame_data()), low_memory=False)
         frame = [row for row in csv.reader(StringIO(self.get_frame_data()))]
         if not header:
@@ -1241,6 +1290,112 @@ class H2OFrame(object):
         return frame
 
 
+    def _as_data_frame_columnar(self):
+        """
+        Download the frame in the binary columnar format, and load it into a pandas DataFrame.
+
+        Each column is read from the response stream directly into a numpy array of the appropriate type, so the
+        data is neither formatted as text on the server nor parsed on the client. Servers that do not support the
+        columnar format respond with CSV, which is then parsed with ``pandas.read_csv`` as before.
+
+        The pandas types of the columns follow the column types sent by the server, except for the columns made
+        categorical or time columns in the frame's cache, whose data is encoded as such.
+        """
+        import pandas
+        cache = self._ex._cache
+        with _ColumnarDownload(self.frame_id) as download:
+            if download.columns is None:
+                return pandas.read_csv(StringIO(download.read_csv()), low_memory=False)
+            df = download.read_pandas(cache.types if cache.types_valid() else {})
+        download.update_cache(cache)
+        return df
+
+
+    def as_numpy(self, cols=None, dtype=None, enum_as="codes"):
+        """
+        Obtain the frame's data as numpy arrays.
+
+        The data is downloaded in a binary columnar format and read directly into the arrays, one column at a time,
+        without converting the values to text and back.
+
+        :param cols: names or indices of the columns to retrieve (all columns by default).
+        :param dtype: if given, return a single 2-D array of this type, whose columns are the frame's columns. If
+            None (default), return a dict of 1-D arrays keyed by the column names, each in the type natural for its
+            column: float64 for real columns and for integer columns with missing values, int64 for the other
+            integer columns, datetime64[ms] for time columns, and object arrays of str for string and uuid columns.
+        :param enum_as: how to represent the values of the categorical columns: either as int32 ``"codes"`` into the
+            column's domain (-1 for missing values, or NaN in a 2-D array of floats), or as their ``"levels"`` (str
+            objects, None for missing values).
+
+        :returns: a tuple ``(data, domains)``, where ``data`` is the 2-D array or the dict of 1-D arrays, and
+            ``domains`` is a dict from the names of the categorical columns to the lists of their levels.
+
+        :examples:
+            >>> X, domains = fr.as_numpy(cols=["AGE", "RACE", "PSA"], dtype="float64")
+        """
+        import numpy
+        assert_is_type(cols, None, str, int, [str, int])
+        assert_is_type(enum_as, Enum("codes", "levels"))
+        if dtype is not None:
+            dtype = numpy.dtype(dtype)
+        fr = self if cols is None else self[cols]
+        with _ColumnarDownload(fr.frame_id) as download:
+            if download.columns is None:
+                raise H2OServerError("The server does not support downloading frames in the columnar format")
+            data, domains = download.read_numpy(dtype, enum_as)
+        download.update_cache(fr._ex._cache)
+        return data, domains
+
+
+    def iter_chunks(self, rows=100000, as_="pandas"):
+        """
+        Iterate over the frame's data in blocks of consecutive rows.
+
+        Each block is downloaded in the binary columnar format directly from the frame, without creating a new frame
+        on the server for it. The next block is downloaded on a background thread while the caller processes the
+        current one, so that only about two blocks are held in memory at any time.
+
+        :param int rows: number of rows in each block (the last block may be shorter).
+        :param as_: type of the blocks: either ``"pandas"`` DataFrames (as returned by
+            ``as_data_frame(columnar=True)``, and indexed by the row numbers within the frame), or ``"numpy"`` tuples
+            ``(data, domains)`` of a dict of 1-D arrays and the domains of the categorical columns (as returned by
+            ``as_numpy()``).
+
+        :returns: a generator of the blocks.
+
+        :examples:
+            >>> for df in predictions.iter_chunks(rows=10**6):
+            ...     df.to_csv(out, header=False)
+        """
+        assert_is_type(rows, int)
+        assert_is_type(as_, Enum("pandas", "numpy"))
+        assert_satisfies(rows, rows > 0)
+        frame_id = self.frame_id
+        nrows = self.nrows
+        cache = self._ex._cache
+        types = cache.types if cache.types_valid() else {}
+
+        def fetch(offset):
+            with _ColumnarDownload(frame_id, row_offset=offset, row_count=rows) as download:
+                if download.columns is None:
+                    raise H2OServerError("The server does not support downloading frames in the columnar format")
+                if as_ == "numpy":
+                    return download.read_numpy(None, "codes")
+                df = download.read_pandas(types)
+                df.index += offset
+                return df
+
+        pool = ThreadPool(1)
+        try:
+            pending = pool.apply_async(fetch, (0, )) if nrows > 0 else None
+            for offset in range(rows, nrows + rows, rows):
+                block = pending.get()
+                pending = pool.apply_async(fetch, (offset, )) if offset < nrows else None
+                yield block
+        finally:
+            pool.terminate()
+
+
     def get_frame_data(self):
         """
         Get frame data as a string in csv format.
@@ -1294,12 +1449,12 @@ class H2OFrame(object):
             item = normalize_slice(item, self.ncols)
         if is_type(item, str, int, list, slice):
             new_ncols, new_names, new_types, item = self._compute_ncol_update(item)
-            new_nrows = self.nrow
+            new_nrows = self._ex._cache.nrows
             fr = H2OFrame._expr(expr=ExprNode("cols_py", self, item))
         elif isinstance(item, (ExprNode, H2OFrame)):
-            new_ncols = self.ncol
-            new_names = self.names
-            new_types = self.types
+            new_ncols = self._ex._cache.ncols
+            new_names = self._ex._cache.names
+            new_types = self._ex._cache.types
             new_nrows = -1  # have a "big" predicate column -- update cache later on...
             fr = H2OFrame._expr(expr=ExprNode("rows", self, item))
         elif isinstance(item, tuple):
@@ -1309,18 +1464,21 @@ class H2OFrame(object):
                 cols = normalize_slice(cols, self.ncols)
                 allcols = cols == slice(0, self.ncols, 1)
             if isinstance(rows, slice):
-                rows = normalize_slice(rows, self.nrows)
-                allrows = rows == slice(0, self.nrows, 1)
+                # Avoid evaluating the frame just to learn the number of rows when all rows are selected
+                allrows = rows == slice(None)
+                if not allrows:
+                    rows = normalize_slice(rows, self.nrows)
+                    allrows = rows == slice(0, self.nrows, 1)
 
             if allrows and allcols: return self  # fr[:,:]    -> all rows and columns.. return self
             if allrows:
                 new_ncols, new_names, new_types, cols = self._compute_ncol_update(cols)
-                new_nrows = self.nrow
+                new_nrows = self._ex._cache.nrows
                 fr = H2OFrame._expr(expr=ExprNode("cols_py", self, cols))  # fr[:,cols] -> really just a column slice
             if allcols:
-                new_ncols = self.ncols
-                new_names = self.names
-                new_types = self.types
+                new_ncols = self._ex._cache.ncols
+                new_names = self._ex._cache.names
+                new_types = self._ex._cache.types
                 new_nrows, rows = self._compute_nrow_update(rows)
                 fr = H2OFrame._expr(expr=ExprNode("rows", self, rows))  # fr[rows,:] -> really just a row slices
 
@@ -1348,49 +1506,12 @@ class H2OFrame(object):
         return fr
 
     def _compute_ncol_update(self, item):  # computes new ncol, names, and types
-        try:
-            new_ncols = -1
-            if isinstance(item, list):
-                new_ncols = len(item)
-                if _is_str_list(item):
-                    new_types = {k: self.types[k] for k in item}
-                    new_names = item
-                else:
-                    new_names = [self.names[i] for i in item]
-                    new_types = {name: self.types[name] for name in new_names}
-            elif isinstance(item, slice):
-                assert slice_is_normalized(item)
-                new_names = self.names[item]
-                new_types = {name: self.types[name] for name in new_names}
-            elif is_type(item, str, int):
-                new_ncols = 1
-                if is_type(item, str):
-                    new_names = [item]
-                    new_types = None if item not in self.types else {item: self.types[item]}
-                else:
-                    new_names = [self.names[item]]
-                    new_types = {new_names[0]: self.types[new_names[0]]}
-            else:
-                raise ValueError("Unexpected type: " + str(type(item)))
-            return (new_ncols, new_names, new_types, item)
-        except:
-            return (-1, None, None, item)
+        _, new_ncols, new_names, new_types = _select_columns(_schema_of(self._ex), item)
+        return new_ncols, new_names, new_types, item
 
     def _compute_nrow_update(self, item):
-        try:
-            new_nrows = -1
-            if isinstance(item, list):
-                new_nrows = len(item)
-            elif isinstance(item, slice):
-                assert slice_is_normalized(item)
-                new_nrows = (item.stop - item.start + item.step - 1) // item.step
-            elif isinstance(item, H2OFrame):
-                new_nrows = -1
-            else:
-                new_nrows = 1
-            return [new_nrows, item]
-        except:
-            return [-1, item]
+        new_nrows = _select_rows(_schema_of(self._ex), item)[0]
+        return [new_nrows, item]
 
 
     def __setitem__(self, item, value):
@@ -1455,39 +1576,29 @@ class H2OFrame(object):
 
         if value is None: value = float("nan")
         value_is_own_subframe = isinstance(value, H2OFrame) and self._is_frame_in_self(value)
-        old_cache = self._ex._cache
         if colname is None:
             self._ex = ExprNode(":=", self, value, col_expr, row_expr)
-            self._ex._cache.fill_from(old_cache)
-            if isinstance(value, H2OFrame) and \
-                    value._ex._cache.types_valid() and \
-                    self._ex._cache.types_valid():
-                self._ex._cache._types.update(value._ex._cache.types)
-            else:
-                self._ex._cache.types = None
         else:
             self._ex = ExprNode("append", self, value, colname)
-            self._ex._cache.fill_from(old_cache)
-            self._ex._cache.names = self.names + [colname]
-            self._ex._cache._ncols += 1
-            if self._ex._cache.types_valid() and isinstance(value, H2OFrame) and value._ex._cache.types_valid():
-                self._ex._cache._types[colname] = list(viewvalues(value._ex._cache.types))[0]
-            else:
-                self._ex._cache.types = None
+        self._ex._infer_schema()
         if value_is_own_subframe:
             value._ex = None  # wipe out to keep ref counts correct
 
 
     def _is_frame_in_self(self, frame):
-        if self._ex is frame._ex: return True
-        if frame._ex._children is None: return False
-        return any(self._is_expr_in_self(ch) for ch in frame._ex._children)
+        return self._is_expr_in_self(frame._ex)
 
     def _is_expr_in_self(self, expr):
-        if not isinstance(expr, ExprNode): return False
-        if self._ex is expr: return True
-        if expr._children is None: return False
-        return any(self._is_expr_in_self(ch) for ch in expr._children)
+        # Iterative walk (with a visited set) so that very deep or heavily shared DAGs stay cheap
+        visited = set()
+        stack = [expr]
+        while stack:
+            node = stack.pop()
+            if not isinstance(node, ExprNode) or id(node) in visited: continue
+            if self._ex is node: return True
+            visited.add(id(node))
+            stack.extend(node._children or ())
+        return False
 
 
     def drop(self, index, axis=1):
@@ -1646,28 +1757,16 @@ class H2OFrame(object):
         """
         assert_is_type(data, H2OFrame, numeric, [H2OFrame, numeric])
         frames = [data] if not isinstance(data, list) else data
-        new_cols = list(self.columns)
-        new_types = dict(self.types)
+        # Only validate the shapes known without evaluation; the server checks the rest.
+        nrows = self._ex._cache.nrows
         for frame in frames:
-            if isinstance(frame, H2OFrame):
-                if frame.nrow != self.nrow:
+            if isinstance(frame, H2OFrame) and frame._ex._cache.nrows_valid():
+                if nrows >= 0 and frame._ex._cache.nrows != nrows:
                     raise H2OValueError("Cannot bind a dataframe with %d rows to a data frame with %d rows: "
-                                        "the number of rows should match" % (frame.nrow, self.nrow))
-                new_cols += frame.columns
-                new_types.update(frame.types)
-            else:
-                new_cols += [None]
-        unique_cols = set(new_cols)
-        fr = H2OFrame._expr(expr=ExprNode("cbind", self, *frames), cache=self._ex._cache)
-        fr._ex._cache.ncols = len(new_cols)
-        if len(new_cols) == len(unique_cols) and None not in unique_cols:
-            fr._ex._cache.names = new_cols
-            fr._ex._cache.types = new_types
-        else:
-            # Invalidate names and types since they contain duplicate / unknown names, and the server will choose those.
-            fr._ex._cache.names = None
-            fr._ex._cache.types = None
-        return fr
+                                        "the number of rows should match" % (frame._ex._cache.nrows, nrows))
+                nrows = frame._ex._cache.nrows
+        # Names and types that would be duplicate or unknown are left for the server to choose.
+        return H2OFrame._expr(expr=ExprNode("cbind", self, *frames))
 
 
     def rbind(self, data):
@@ -1679,15 +1778,17 @@ class H2OFrame(object):
         """
         assert_is_type(data, H2OFrame, [H2OFrame])
         frames = [data] if not isinstance(data, list) else data
+        # Only validate the schemas known without evaluation; the server checks the rest.
+        cache = self._ex._cache
         for frame in frames:
-            if frame.ncol != self.ncol:
+            other = frame._ex._cache
+            if cache.ncols_valid() and other.ncols_valid() and other.ncols != cache.ncols:
                 raise H2OValueError("Cannot row-bind a dataframe with %d columns to a data frame with %d columns: "
-                                    "the columns must match" % (frame.ncol, self.ncol))
-            if frame.columns != self.columns or frame.types != self.types:
+                                    "the columns must match" % (other.ncols, cache.ncols))
+            if (cache.names_valid() and other.names_valid() and other.names != cache.names) or \
+                    (cache.types_valid() and other.types_valid() and other.types != cache.types):
                 raise H2OValueError("Column names and types must match for rbind() to work")
-        fr = H2OFrame._expr(expr=ExprNode("rbind", self, *frames), cache=self._ex._cache)
-        fr._ex._cache.nrows = self.nrow + sum(frame.nrow for frame in frames)
-        return fr
+        return H2OFrame._expr(expr=ExprNode("rbind", self, *frames))
 
 
     def split_frame(self, ratios=None, destination_frames=None, seed=None):
@@ -2871,7 +2972,10 @@ class H2OFrame(object):
 def _binop(lhs, op, rhs):
     assert_is_type(lhs, str, numeric, datetime.date, pandas_timestamp, numpy_datetime, H2OFrame)
     assert_is_type(rhs, str, numeric, datetime.date, pandas_timestamp, numpy_datetime, H2OFrame)
-    if isinstance(lhs, H2OFrame) and isinstance(rhs, H2OFrame) and lhs._is_frame and rhs._is_frame:
+    if isinstance(lhs, H2OFrame) and isinstance(rhs, H2OFrame) and lhs._is_frame and rhs._is_frame and \
+            _shape_known(lhs) and _shape_known(rhs):
+        # Only check the shapes when they are already known: evaluating the operands just for this check would
+        # defeat lazy evaluation, and the server validates them anyway.
         lrows, lcols = lhs.shape
         rrows, rcols = rhs.shape
         compatible = ((lcols == rcols and lrows == rrows) or
@@ -2891,5 +2995,391 @@ def _binop(lhs, op, rhs):
     if is_type(rhs, pandas_timestamp, numpy_datetime, datetime.date):
         rhs = H2OFrame.moment(date=rhs)
 
-    cache = lhs._ex._cache if isinstance(lhs, H2OFrame) else rhs._ex._cache
-    return H2OFrame._expr(expr=ExprNode(op, lhs, rhs), cache=cache)
+    return H2OFrame._expr(expr=ExprNode(op, lhs, rhs))
+
+
+def _shape_known(fr):
+    return fr._ex._cache.nrows_valid() and fr._ex._cache.ncols_valid()
+
+
+# Leading bytes of the columnar download format (the last two being the format version), and numpy dtypes of its
+# fixed-width encodings
+_COLUMNAR_MAGIC = b"H2OCOL01"
+_COLUMNAR_DTYPES = {"float64": "<f8", "int64": "<i8", "int32": "<i4"}
+
+
+class _ColumnarDownload(object):
+    """
+    Stream of a frame's data in the columnar download format (see ``DatasetServlet.writeColumnar`` on the server).
+
+    Once open, ``nrows`` and ``columns`` hold the number of rows and the description of each column from the header
+    of the stream, and the values of the columns are then read one column after another with ``read_column()``.
+    Servers that do not support the columnar format respond with CSV instead: ``columns`` is then None, and the text
+    is returned by ``read_csv()``.
+
+    If ``row_offset`` is given, only the block of (at most) ``row_count`` rows starting at that row is downloaded.
+    """
+
+    def __init__(self, frame_id, row_offset=None, row_count=None):
+        self.nrows = -1
+        self.columns = None
+        self._next = 0
+        params = {"frame_id": frame_id, "format": "columnar"}
+        if row_offset is not None:
+            params.update(row_offset=row_offset, row_count=row_count)
+        self._stream = h2o.api("GET /3/DownloadDataset.bin", data=params, stream=True)
+        try:
+            self._reader = io.BufferedReader(self._stream, 1 << 20)
+            self._magic = self._reader.read(len(_COLUMNAR_MAGIC))
+            if self._magic == _COLUMNAR_MAGIC:
+                size = struct.unpack(">i", _read_exactly(self._reader, 4))[0]
+                header = json.loads(_read_exactly(self._reader, size).decode("utf-8"))
+                self.nrows = header["rows"]
+                self.columns = header["columns"]
+        except:
+            self.close()
+            raise
+
+    def read_column(self):
+        """
+        Read the values of the next column into a new numpy array.
+
+        The array holds float64, int64 or int32 values for the respective encodings (category codes of the enum
+        columns being int32, and times int64 milliseconds since the epoch), or str objects (None for missing values)
+        for the "utf8" encoding.
+        """
+        import numpy
+        col = self.columns[self._next]
+        self._next += 1
+        if col["encoding"] == "utf8":
+            values = numpy.empty(self.nrows, dtype=object)
+            for i in range(self.nrows):
+                size = struct.unpack("<i", _read_exactly(self._reader, 4))[0]
+                if size >= 0:
+                    values[i] = _read_exactly(self._reader, size).decode("utf-8")
+        else:
+            values = numpy.empty(self.nrows, dtype=_COLUMNAR_DTYPES[col["encoding"]])
+            _read_into(self._reader, values)
+        return values
+
+    def read_numpy(self, dtype, enum_as):
+        """Read all columns into numpy arrays, as described in ``H2OFrame.as_numpy()``."""
+        import numpy
+        domains = {col["name"]: col["domain"] for col in self.columns if col["type"] == "enum"}
+        if dtype is None:
+            data = {}
+        else:
+            for col in self.columns:
+                as_text = col["encoding"] == "utf8" or (col["type"] == "enum" and enum_as == "levels")
+                if as_text and dtype.kind != "O":
+                    raise H2OValueError("Column %s of type %s cannot be stored in an array of %s"
+                                        % (col["name"], col["type"], dtype))
+            data = numpy.empty((self.nrows, len(self.columns)), dtype=dtype)
+        for j, col in enumerate(self.columns):
+            values = self.read_column()
+            if col["type"] == "enum" and enum_as == "levels":
+                # Code -1 of the missing values picks the None appended to the levels
+                values = numpy.array(col["domain"] + [None], dtype=object)[values]
+            elif col["type"] == "time" and (dtype is None or dtype.kind == "M"):
+                values = values.view("datetime64[ms]")
+            elif dtype is not None and dtype.kind == "f" and col["encoding"] != "float64":
+                na = -1 if col["type"] == "enum" else numpy.iinfo(numpy.int64).min
+                values = numpy.where(values == na, numpy.nan, values)
+            elif dtype is not None and dtype.kind in "iu" and col["encoding"] == "float64" and \
+                    numpy.isnan(values).any():
+                raise H2OValueError("Column %s has missing values, which cannot be stored in an array of %s"
+                                    % (col["name"], dtype))
+            if dtype is None:
+                data[col["name"]] = values
+            else:
+                data[:, j] = values
+        return data, domains
+
+    def read_pandas(self, types):
+        """
+        Read all columns into a pandas DataFrame.
+
+        The columns are typed after the header, unless the given types make them categorical or time columns and
+        their encoding allows it: int codes into the column's domain, or int64 milliseconds respectively.
+        """
+        import pandas
+        data = []
+        for col in self.columns:
+            ctype = types.get(col["name"], col["type"])
+            if not (ctype == "enum" and col["encoding"] in ("int32", "int64") and col.get("domain") is not None or
+                    ctype == "time" and col["encoding"] == "int64"):
+                ctype = col["type"]
+            values = self.read_column()
+            if ctype == "enum":
+                values = pandas.Categorical.from_codes(values, categories=col["domain"])
+            elif ctype == "time":
+                values = values.view("datetime64[ms]").astype("datetime64[ns]")
+            data.append(values)
+        names = [col["name"] for col in self.columns]
+        return pandas.DataFrame(dict(zip(names, data)), columns=names)
+
+    def read_csv(self):
+        """Read the whole CSV response of a server without support for the columnar format."""
+        return (self._magic + self._reader.read()).decode("utf-8")
+
+    def update_cache(self, cache):
+        """The header describes the frame completely, so fill in whatever is not known yet in the local cache."""
+        if self.columns is None: return
+        if not cache.nrows_valid(): cache.nrows = self.nrows
+        if not cache.ncols_valid(): cache.ncols = len(self.columns)
+        if not cache.names_valid(): cache.names = [col["name"] for col in self.columns]
+        if not cache.types_valid(): cache.types = {col["name"]: col["type"] for col in self.columns}
+
+    def close(self):
+        self._stream.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _read_exactly(stream, size):
+    data = stream.read(size)
+    if len(data) != size:
+        raise H2OServerError("Unexpected end of the frame data stream")
+    return data
+
+
+def _read_into(stream, array):
+    buf = array.view("uint8")
+    pos = 0
+    while pos < len(buf):
+        n = stream.readinto(buf[pos:])
+        if not n:
+            raise H2OServerError("Unexpected end of the frame data stream")
+        pos += n
+
+
+# Local files larger than this are uploaded in several parts (split on line boundaries), and the size of the blocks in
+# which the parts are read and sent
+_UPLOAD_PART_SIZE = 64 << 20
+_UPLOAD_READ_SIZE = 1 << 20
+
+
+def _split_file(path, part_size):
+    """Split the file into byte ranges ``(path, start, end)`` of about ``part_size`` bytes that end on a new line."""
+    size = os.path.getsize(path)
+    parts = []
+    start = 0
+    with open(path, "rb") as f:
+        if not f.read(4).startswith(_COMPRESSED_MAGICS):
+            while size - start > part_size:
+                f.seek(start + part_size - 1)
+                f.readline()
+                end = f.tell()
+                if end >= size: break
+                parts.append((path, start, end))
+                start = end
+    parts.append((path, start, size))
+    return parts
+
+
+def _upload_files(paths, threads):
+    """
+    Upload the local files to the server, ``threads`` parts at a time, and return the keys of the raw frames.
+
+    The keys are in the order of the files and of the parts within each file, ready to be parsed together into a
+    single frame (the parser checks the first line of each of them for the header).
+    """
+    parts = [part for path in paths for part in _split_file(path, _UPLOAD_PART_SIZE)]
+    total = sum(end - start for _, start, end in parts)
+    sent = [0] * len(parts)
+    stopped = threading.Event()
+
+    def read_part(i):
+        path, start, end = parts[i]
+        with open(path, "rb") as f:
+            f.seek(start)
+            while start < end:
+                if stopped.is_set():
+                    raise H2OValueError("Upload of %s interrupted" % path)
+                block = f.read(min(_UPLOAD_READ_SIZE, end - start))
+                if not block: break
+                start += len(block)
+                sent[i] += len(block)
+                yield block
+
+    def upload_part(i):
+        if stopped.is_set(): return None
+        return h2o.api("POST /3/PostFile", filename=read_part(i))["destination_frame"]
+
+    def progress():
+        if any(r.ready() and not r.successful() for r in results):
+            raise StopIteration("failed")
+        if all(r.ready() for r in results):
+            return total
+        return sum(sent), 0.2
+
+    pool = ThreadPool(max(1, min(threads, len(parts))))
+    results = [pool.apply_async(upload_part, (i,)) for i in range(len(parts))]
+    try:
+        ProgressBar(title="Upload progress", maxval=max(total, 1), hidden=not H2OJob.__PROGRESS_BAR__) \
+            .execute(progress)
+        return [r.get() for r in results]
+    except BaseException:
+        # Let the parts that are being sent fail, and remove those that have been uploaded already
+        stopped.set()
+        pool.close()
+        pool.join()
+        for r in results:
+            if r.successful() and r.get():
+                h2o.api("DELETE /3/DKV/%s" % r.get())
+        raise
+    finally:
+        pool.close()
+
+
+class _UploadCache(object):
+    """
+    Frames uploaded from local files and from pandas / numpy objects, keyed by the fingerprint of their source.
+
+    The fingerprint covers the content of the source (the size, modification time and SHA-1 digest of each file, or
+    the digest of the data frame's columns) as well as the parse options. A frame is taken from the cache only if the
+    cluster still holds it with the checksum it had right after the upload; otherwise the source is uploaded again.
+
+    If ``index`` is given, the cache is kept in that JSON file, so that it survives restarts of the python session.
+    The digests of the files are remembered there too, so that unchanged files are not read again.
+    """
+
+    def __init__(self, index=None):
+        self.index = index
+        self.frames = {}  # fingerprint => [frame_id, checksum]
+        self.files = {}  # "path:size:mtime" => SHA-1 digest of the file
+        if index is not None and os.path.exists(index):
+            with open(index) as f:
+                data = json.load(f)
+            self.frames = data["frames"]
+            self.files = data["files"]
+
+    def fingerprint(self, source, options):
+        """Fingerprint of a list of files or of a pandas / numpy object, or None if other objects are given."""
+        if is_type(source, [str]):
+            digest = [self._file_digest(path) for path in source]
+        elif is_type(source, pandas_dataframe, numpy_ndarray):
+            digest = _object_digest(source)
+        else:
+            return None
+        return hashlib.sha1(json.dumps([digest, options], sort_keys=True).encode("utf-8")).hexdigest()
+
+    def load(self, frame, fingerprint):
+        """Point ``frame`` to the frame uploaded with this fingerprint, returning False if there is no such frame."""
+        entry = self.frames.get(fingerprint)
+        if entry is None: return False
+        try:
+            res = h2o.api("GET /3/Frames/%s" % entry[0], data={"row_count": 10})["frames"][0]
+        except EnvironmentError:
+            res = None
+        if res is None or res["checksum"] != entry[1]:
+            del self.frames[fingerprint]
+            self._save()
+            return False
+        frame._ex._cache._id = entry[0]
+        frame._ex._cache._fill_from_frame_json(res, 10)
+        return True
+
+    def store(self, frame, fingerprint):
+        res = h2o.api("GET /3/Frames/%s" % frame.frame_id,
+                      data={"_exclude_fields": "frames/columns,frames/chunk_summary,frames/distribution_summary"})
+        self.frames[fingerprint] = [frame.frame_id, res["frames"][0]["checksum"]]
+        self._save()
+
+    def _file_digest(self, path):
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        key = "%s:%d:%r" % (path, stat.st_size, stat.st_mtime)
+        if key not in self.files:
+            sha = hashlib.sha1()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(_UPLOAD_READ_SIZE), b""):
+                    sha.update(block)
+            self.files[key] = sha.hexdigest()
+        return [key, self.files[key]]
+
+    def _save(self):
+        if self.index is None: return
+        with open(self.index, "w") as f:
+            json.dump({"frames": self.frames, "files": self.files}, f)
+
+
+def _object_digest(python_obj):
+    """SHA-1 digest of the names, types and values of the columns of a pandas data frame, or of a numpy array."""
+    import numpy
+    sha = hashlib.sha1()
+    if is_type(python_obj, pandas_dataframe):
+        import pandas
+        for j, name in enumerate(python_obj.columns):
+            col = python_obj.iloc[:, j]
+            sha.update(("%s\0%s\0" % (name, col.dtype)).encode("utf-8"))
+            if isinstance(col.values, numpy.ndarray) and col.dtype.kind != "O":
+                sha.update(numpy.ascontiguousarray(col.values).reshape(-1).view("uint8"))
+            else:
+                sha.update(pandas.util.hash_pandas_object(col, index=False).values)
+    else:
+        sha.update(("%s\0%s\0" % (python_obj.shape, python_obj.dtype)).encode("utf-8"))
+        if python_obj.dtype.kind != "O":
+            sha.update(numpy.ascontiguousarray(python_obj).reshape(-1).view("uint8"))
+        else:
+            sha.update(repr(python_obj.tolist()).encode("utf-8"))
+    return sha.hexdigest()
+
+
+# Fields of the parse setup kept in the parse templates, and the number of leading bytes of the files checked against
+# the templates
+_PARSE_TEMPLATE_FIELDS = ("parse_type", "separator", "single_quotes", "check_header", "number_columns", "column_names",
+                          "column_types", "na_strings")
+_PARSE_TEMPLATE_HEAD_SIZE = 1 << 16
+
+# Size of the chunks of the files uploaded to the cluster, whatever their size
+_UPLOAD_CHUNK_SIZE = 1 << 22
+
+
+def _load_parse_templates(path):
+    """The list of ``{"pattern": pattern, "setup": setup}`` templates of the JSON file, which may not exist yet."""
+    if not os.path.exists(path): return []
+    with open(path) as f:
+        return json.load(f)
+
+
+def _find_parse_template(path, sources):
+    """
+    The setup of the first template of the JSON file whose pattern matches all the sources, or None.
+
+    The sources are paths, or keys of files imported to the cluster, and the pattern may match either the whole path
+    or its base name. The first line of every source which is a local file is checked against the template, and if
+    any of them does not fit (or cannot be read, being compressed), the setup is left for the server to guess.
+    """
+    names = [src[len("nfs:/"):] if src.startswith("nfs://") else src for src in sources]
+    for template in _load_parse_templates(path):
+        pattern = template["pattern"]
+        if all(fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(os.path.basename(name), pattern) for name in names):
+            setup = {k: template["setup"][k] for k in _PARSE_TEMPLATE_FIELDS}
+            for name in names:
+                if os.path.isfile(name):
+                    with open(name, "rb") as f:
+                        if not _fits_parse_template(setup, f.read(_PARSE_TEMPLATE_HEAD_SIZE)):
+                            return None
+            return setup
+    return None
+
+
+def _fits_parse_template(setup, head):
+    """Whether the first bytes of a file agree with the separator, number of columns and header of the setup."""
+    if setup["parse_type"] != "CSV": return True
+    if head.startswith(b"\x1f\x8b"):
+        head = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(head)
+    elif head.startswith(_COMPRESSED_MAGICS):
+        return False
+    lines = head.decode("utf-8", "replace").splitlines()
+    if not lines: return False
+    quotechar = "'" if setup["single_quotes"] else '"'
+    fields = next(csv.reader([lines[0]], delimiter=str(chr(setup["separator"])), quotechar=str(quotechar)))
+    if len(fields) != setup["number_columns"]: return False
+    is_header = fields == setup["column_names"]
+    return is_header if setup["check_header"] == 1 else not is_header
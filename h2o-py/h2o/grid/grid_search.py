@@ -2,6 +2,12 @@
 from __future__ import division, print_function, absolute_import, unicode_literals
 
 import itertools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+try:
+    from collections.abc import Sequence
+except ImportError:  # Python 2
+    from collections import Sequence
 
 import h2o
 from h2o.job import H2OJob
@@ -10,6 +16,7 @@ from h2o.estimators.estimator_base import H2OEstimator
 from h2o.two_dim_table import H2OTwoDimTable
 from h2o.display import H2ODisplay
 from h2o.grid.metrics import *  # NOQA
+from h2o.model.model_base import _fetch_model_json
 from h2o.utils.backward_compatibility import backwards_compatible
 from h2o.utils.shared_utils import deprecated, quoted
 from h2o.utils.compatibility import *  # NOQA
@@ -65,13 +72,31 @@ class H2OGridSearch(backwards_compatible()):
         self.hyper_params = dict(hyper_params)
         self.search_criteria = None if search_criteria is None else dict(search_criteria)
         self._grid_json = None
-        self.models = None  # list of H2O Estimator instances
+        self._model_class = None  # class mixed into the grid, after the category of its models
+        self._models = None  # the models, fetched from the server on demand (_GridModels), or a list of them
         self._parms = {}  # internal, for object recycle #
         self.parms = {}  # external#
         self._future = False  # used by __repr__/show to query job state#
         self._job = None  # used when _future is True#
 
 
+    @property
+    def models(self):
+        """
+        List of the models of the grid.
+
+        The models are all fetched from the server (concurrently) when the list is first read, while accessing them
+        through the grid (``grid[i]``, or iterating over the grid) fetches only the models accessed.
+        """
+        if isinstance(self._models, _GridModels):
+            self._models = list(self._models)
+        return self._models
+
+    @models.setter
+    def models(self, models):
+        self._models = models
+
+
     @property
     def grid_id(self):
         """A key that identifies this grid search object in H2O."""
@@ -250,14 +275,12 @@ class H2OGridSearch(backwards_compatible()):
         else:
             grid_json = h2o.api("GET /99/Grids/%s" % grid.dest_key)
 
-        self.models = [h2o.get_model(key['name']) for key in grid_json['model_ids']]
+        self.models = _GridModels([key['name'] for key in grid_json['model_ids']])
 
         # get first model returned in list of models from grid search to get model class (binomial, multinomial, etc)
         # sometimes no model is returned due to bad parameter values provided by the user.
         if len(grid_json['model_ids']) > 0:
-            first_model_json = h2o.api("GET /%d/Models/%s" %
-                                       (rest_ver or 3, grid_json['model_ids'][0]['name']))['models'][0]
-            self._resolve_grid(grid.dest_key, grid_json, first_model_json)
+            self._resolve_grid(grid.dest_key, grid_json, self._models[0]._model_json)
         else:
             raise ValueError("Gridsearch returns no model due to bad parameter values or other reasons....")
 
@@ -267,23 +290,22 @@ class H2OGridSearch(backwards_compatible()):
         m = model_class()
         m._id = grid_id
         m._grid_json = grid_json
-        # m._metrics_class = metrics_class
+        m._model_class = model_class
         m._parms = self._parms
         H2OEstimator.mixin(self, model_class)
         self.__dict__.update(m.__dict__.copy())
 
 
     def __getitem__(self, item):
-        return self.models[item]
+        return self._models[item]
 
 
     def __iter__(self):
-        nmodels = len(self.models)
-        return (self[i] for i in range(nmodels))
+        return iter(self._models)
 
 
     def __len__(self):
-        return len(self.models)
+        return len(self._models)
 
 
     def __repr__(self):
@@ -432,7 +454,7 @@ class H2OGridSearch(backwards_compatible()):
     def show(self):
         """Print models sorted by metric."""
         hyper_combos = itertools.product(*list(self.hyper_params.values()))
-        if not self.models:
+        if not self._models:
             c_values = [[idx + 1, list(val)] for idx, val in enumerate(hyper_combos)]
             print(H2OTwoDimTable(
                 col_header=['Model', 'Hyperparameters: [' + ', '.join(list(self.hyper_params.keys())) + ']'],
@@ -747,19 +769,20 @@ class H2OGridSearch(backwards_compatible()):
         :param bool decreasing: Sort the models in decreasing order of metric if true, otherwise sort in increasing
             order (default).
 
-        :returns: A new H2OGridSearch instance optionally sorted on the specified metric.
+        :returns: A new H2OGridSearch instance optionally sorted on the specified metric. The models are sorted by
+            the server, and shared with this instance: those already fetched from the server are not fetched again.
         """
         if sort_by is None and decreasing is None: return self
 
         grid_json = h2o.api("GET /99/Grids/%s" % self._id, data={"sort_by": sort_by, "decreasing": decreasing})
         grid = H2OGridSearch(self.model, self.hyper_params, self._id)
-        grid.models = [h2o.get_model(key['name']) for key in grid_json['model_ids']]  # reordered
-        first_model_json = h2o.api("GET /99/Models/%s" % grid_json['model_ids'][0]['name'])['models'][0]
-        model_class = H2OGridSearch._metrics_class(first_model_json)
+        model_ids = [key['name'] for key in grid_json['model_ids']]
+        grid.models = _GridModels.reordered(self._models, model_ids)
+        model_class = self._model_class or H2OGridSearch._metrics_class(grid._models[0]._model_json)
         m = model_class()
         m._id = self._id
         m._grid_json = grid_json
-        # m._metrics_class = metrics_class
+        m._model_class = model_class
         m._parms = grid._parms
         H2OEstimator.mixin(grid, model_class)
         grid.__dict__.update(m.__dict__.copy())
@@ -786,3 +809,73 @@ class H2OGridSearch(backwards_compatible()):
             col_header=['Model Id', 'Hyperparameters: [' + ', '.join(list(self.hyper_params.keys())) + ']', metric],
             table_header='Grid Search Results for ' + self.model.__class__.__name__,
             cell_values=[list(x) for x in zip(*c_values)])
+
+
+
+class _GridModels(Sequence):
+    """
+    Models of a grid, in the order of their ids.
+
+    Each model is fetched from the server when it is first accessed, and kept in a cache shared by the sorted copies
+    of the grid (see :meth:`H2OGridSearch.get_grid`). Iterating over the models fetches them concurrently, with at
+    most ``max_workers`` requests at the same time (by default, as many as the connections kept open to the server:
+    see ``pool_maxsize`` of :meth:`h2o.connect`), on threads that end once these models are fetched. All the models
+    of a grid have the same algo and model category, so once the first model is fetched, each of the others is fetched
+    in a single request.
+    """
+
+    max_workers = None
+
+    _lock = threading.Lock()
+
+    def __init__(self, model_ids, cache=None, kind=None):
+        self.model_ids = list(model_ids)
+        self._cache = {} if cache is None else cache  # model id => future of the model
+        self._kind = [None, None] if kind is None else kind  # algo and model category of the models, once known
+
+    @staticmethod
+    def reordered(models, model_ids):
+        """The models with the given ids, sharing the cache of ``models`` (a _GridModels, a list of models, or None)."""
+        if isinstance(models, _GridModels):
+            return _GridModels(model_ids, models._cache, models._kind)
+        cache = {}
+        for model in models or []:
+            cache[model.model_id] = Future()
+            cache[model.model_id].set_result(model)
+        return _GridModels(model_ids, cache)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return [f.result() for f in self._futures(self.model_ids[item])]
+        return self._futures([self.model_ids[item]])[0].result()
+
+    def __iter__(self):
+        return (f.result() for f in self._futures(self.model_ids))
+
+    def __len__(self):
+        return len(self.model_ids)
+
+    def __repr__(self):
+        return "<%d models of the grid>" % len(self)
+
+    def _futures(self, model_ids):
+        """Futures of the models with these ids, submitting the fetches of those not fetched yet."""
+        with _GridModels._lock:
+            missing = []
+            for model_id in model_ids:
+                future = self._cache.get(model_id)
+                if future is None or (future.done() and future.exception() is not None):
+                    missing.append(model_id)
+            if missing:
+                workers = _GridModels.max_workers or h2o.connection().pool_maxsize or 1
+                pool = ThreadPoolExecutor(max_workers=min(len(missing), workers))
+                for model_id in missing:
+                    self._cache[model_id] = pool.submit(self._fetch, model_id)
+                pool.shutdown(wait=False)  # its threads end once these models are fetched
+            return [self._cache[model_id] for model_id in model_ids]
+
+    def _fetch(self, model_id):
+        algo, category = self._kind
+        model_json = _fetch_model_json(model_id, algo=algo, category=category)
+        self._kind[:] = [model_json["algo"], model_json["output"]["model_category"]]
+        return h2o.h2o._model_from_json(model_id, model_json)
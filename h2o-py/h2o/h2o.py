@@ -7,6 +7,8 @@ h2o -- module for using H2O services.
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import glob
+import json
 import logging
 import os
 import warnings
@@ -21,7 +23,7 @@ from h2o.utils.typechecks import assert_is_type, assert_satisfies, BoundInt, Bou
 from .estimators.deeplearning import H2OAutoEncoderEstimator
 from .estimators.deeplearning import H2ODeepLearningEstimator
 from .estimators.deepwater import H2ODeepWaterEstimator
-from .estimators.estimator_base import H2OEstimator
+from .estimators.estimator_base import H2OEstimator, _TrainingCache
 from .estimators.gbm import H2OGradientBoostingEstimator
 from .estimators.glm import H2OGeneralizedLinearEstimator
 from .estimators.glrm import H2OGeneralizedLowRankEstimator
@@ -29,11 +31,11 @@ from .estimators.kmeans import H2OKMeansEstimator
 from .estimators.naive_bayes import H2ONaiveBayesEstimator
 from .estimators.random_forest import H2ORandomForestEstimator
 from .estimators.stackedensemble import H2OStackedEnsembleEstimator
-from .expr import ExprNode
-from .frame import H2OFrame
-from .grid.grid_search import H2OGridSearch
+from .expr import DeferredEvaluation, ExprNode, Scope
+from .frame import H2OFrame, _load_parse_templates, _PARSE_TEMPLATE_FIELDS, _UploadCache
+from .grid.grid_search import H2OGridSearch, _GridModels
 from .job import H2OJob
-from .model.model_base import ModelBase
+from .model.model_base import ModelBase, _fetch_model_json
 from .transforms.decomposition import H2OPCA
 from .transforms.decomposition import H2OSVD
 from .utils.debugging import *  # NOQA
@@ -49,7 +51,8 @@ warnings.filterwarnings('ignore', category=DeprecationWarning, module='.*/IPytho
 h2oconn = None  # type: H2OConnection
 
 def connect(server=None, url=None, ip=None, port=None, https=None, verify_ssl_certificates=None, auth=None,
-            proxy=None,cookies=None, verbose=True, config=None):
+            proxy=None,cookies=None, verbose=True, config=None, pool_connections=None, pool_maxsize=None,
+            keep_alive=True):
     """
     Connect to an existing H2O server, remote or local.
 
@@ -68,6 +71,9 @@ def connect(server=None, url=None, ip=None, port=None, https=None, verify_ssl_ce
     :param cookies: Cookie (or list of) to add to request
     :param verbose: Set to False to disable printing connection status messages.
     :param connection_conf: Connection configuration object encapsulating connection parameters.
+    :param pool_connections: Number of per-host connection pools kept by the underlying HTTP session.
+    :param pool_maxsize: Maximum number of keep-alive connections to the server (per host).
+    :param keep_alive: Set to False to open a new TCP connection for every request.
     :returns: the new :class:`H2OConnection` object.
     """
     global h2oconn
@@ -80,14 +86,15 @@ def connect(server=None, url=None, ip=None, port=None, https=None, verify_ssl_ce
         h2oconn = H2OConnection.open(server=server, url=url, ip=ip, port=port, https=https,
                                      auth=auth, verify_ssl_certificates=verify_ssl_certificates,
                                      proxy=proxy,cookies=cookies,
-                                     verbose=verbose)
+                                     verbose=verbose, pool_connections=pool_connections,
+                                     pool_maxsize=pool_maxsize, keep_alive=keep_alive)
         h2oconn.cluster.timezone = "UTC"
         if verbose:
             h2oconn.cluster.show_status()
     return h2oconn
 
 
-def api(endpoint, data=None, json=None, filename=None, save_to=None):
+def api(endpoint, data=None, json=None, filename=None, save_to=None, stream=False):
     """
     Perform a REST API request to a previously connected server.
 
@@ -96,7 +103,7 @@ def api(endpoint, data=None, json=None, filename=None, save_to=None):
     """
     # type checks are performed in H2OConnection class
     _check_connection()
-    return h2oconn.request(endpoint, data=data, json=json, filename=filename, save_to=save_to)
+    return h2oconn.request(endpoint, data=data, json=json, filename=filename, save_to=save_to, stream=stream)
 
 
 
@@ -284,13 +291,17 @@ def _import(path, pattern):
 
 
 def upload_file(path, destination_frame=None, header=0, sep=None, col_names=None, col_types=None,
-                na_strings=None):
+                na_strings=None, threads=4, parse_templates=None):
     """
     Upload a dataset from the provided local path to the H2O cluster.
 
-    Does a single-threaded push to H2O. Also see :meth:`import_file`.
+    The path may also be a directory, a glob pattern, or a list of those, in which case all the files are uploaded
+    and parsed into a single frame. Large files are uploaded in several parts, split on line boundaries. The files
+    and the parts are pushed to H2O concurrently, and parsed together once all of them have been uploaded. They are
+    gzipped on the way when the connection's ``compression`` is turned on (it is off by default). Also see
+    :meth:`import_file`.
 
-    :param path: A path specifying the location of the data to upload.
+    :param path: A path specifying the location of the data to upload, or a list of such paths.
     :param destination_frame:  The unique hex key assigned to the imported file. If none is given, a key will
         be automatically generated.
     :param header: -1 means the first line is data, 0 means guess, 1 means first line is header.
@@ -313,30 +324,54 @@ def upload_file(path, destination_frame=None, header=0, sep=None, col_names=None
           Times can also contain "AM" or "PM".
     :param na_strings: A list of strings, or a list of lists of strings (one list per column), or a dictionary
         of column names to strings which are to be interpreted as missing values.
+    :param threads: The number of files or parts of files uploaded at the same time.
+    :param parse_templates: A local JSON file of parse templates (see :meth:`save_parse_template`). If one of them
+        matches the files, it is used instead of guessing the parse setup.
 
     :returns: a new :class:`H2OFrame` instance.
 
     :examples:
         >>> frame = h2o.upload_file("/path/to/local/data")
+        >>> frame = h2o.upload_file(["/path/to/part-0.csv", "/path/to/more/parts/*.csv"])
     """
     coltype = U(None, "unknown", "uuid", "string", "float", "real", "double", "int", "numeric",
                 "categorical", "factor", "enum", "time")
     natype = U(str, [str])
-    assert_is_type(path, str)
+    assert_is_type(path, str, [str])
     assert_is_type(destination_frame, str, None)
     assert_is_type(header, -1, 0, 1)
     assert_is_type(sep, None, I(str, lambda s: len(s) == 1))
     assert_is_type(col_names, [str], None)
     assert_is_type(col_types, [coltype], {str: coltype}, None)
     assert_is_type(na_strings, [natype], {str: natype}, None)
+    assert_is_type(threads, BoundInt(1))
+    assert_is_type(parse_templates, str, None)
     check_frame_id(destination_frame)
-    if path.startswith("~"):
+    paths = _local_files(path)
+    if parse_templates: parse_templates = os.path.expanduser(parse_templates)
+    return H2OFrame()._upload_parse(paths, destination_frame, header, sep, col_names, col_types, na_strings,
+                                    threads, templates=parse_templates)
+
+
+def _local_files(paths):
+    """Expand the path (or the list of paths) of files, directories and glob patterns into a sorted list of files."""
+    files = []
+    for path in [paths] if is_type(paths, str) else paths:
         path = os.path.expanduser(path)
-    return H2OFrame()._upload_parse(path, destination_frame, header, sep, col_names, col_types, na_strings)
+        if os.path.isdir(path):
+            found = [os.path.join(dirpath, name) for dirpath, _, names in os.walk(path) for name in names]
+        elif os.path.isfile(path):
+            found = [path]
+        else:
+            found = [name for name in glob.glob(path) if os.path.isfile(name)]
+        if not found:
+            raise H2OValueError("File %s does not exist" % path)
+        files += sorted(found)
+    return files
 
 
 def import_file(path=None, destination_frame=None, parse=True, header=0, sep=None, col_names=None, col_types=None,
-                na_strings=None, pattern=None):
+                na_strings=None, pattern=None, parse_templates=None):
     """
     Import a dataset that is already on the cluster.
 
@@ -372,6 +407,8 @@ def import_file(path=None, destination_frame=None, parse=True, header=0, sep=Non
         of column names to strings which are to be interpreted as missing values.
     :param pattern: Character string containing a regular expression to match file(s) in the folder if `path` is a
         directory.
+    :param parse_templates: A local JSON file of parse templates (see :meth:`save_parse_template`). If one of them
+        matches the files, it is used instead of guessing the parse setup.
 
     :returns: a new :class:`H2OFrame` instance.
 
@@ -394,6 +431,7 @@ def import_file(path=None, destination_frame=None, parse=True, header=0, sep=Non
     assert_is_type(col_names, [str], None)
     assert_is_type(col_types, [coltype], {str: coltype}, None)
     assert_is_type(na_strings, [natype], {str: natype}, None)
+    assert_is_type(parse_templates, str, None)
     check_frame_id(destination_frame)
     patharr = path if isinstance(path, list) else [path]
     if any(os.path.split(p)[0] == "~" for p in patharr):
@@ -402,7 +440,9 @@ def import_file(path=None, destination_frame=None, parse=True, header=0, sep=Non
     if not parse:
         return lazy_import(path, pattern)
     else:
-        return H2OFrame()._import_parse(path, pattern, destination_frame, header, sep, col_names, col_types, na_strings)
+        if parse_templates: parse_templates = os.path.expanduser(parse_templates)
+        return H2OFrame()._import_parse(path, pattern, destination_frame, header, sep, col_names, col_types, na_strings,
+                                        parse_templates)
 
 
 def import_sql_table(connection_url, table, username, password, columns=None, optimize=True):
@@ -491,14 +531,15 @@ def import_sql_select(connection_url, select_query, username, password, optimize
 
 
 def parse_setup(raw_frames, destination_frame=None, header=0, separator=None, column_names=None,
-                column_types=None, na_strings=None):
+                column_types=None, na_strings=None, template=None):
     """
     Retrieve H2O's best guess as to what the structure of the data file is.
 
     During parse setup, the H2O cluster will make several guesses about the attributes of
     the data. This method allows a user to perform corrective measures by updating the
     returning dictionary from this method. This dictionary is then fed into `parse_raw` to
-    produce the H2OFrame instance.
+    produce the H2OFrame instance. The result can also be saved with :meth:`save_parse_template`,
+    to be reused for other files with the same layout.
 
     :param raw_frames: a collection of imported file frames
     :param destination_frame: The unique hex key assigned to the imported file. If none is given, a key will
@@ -524,6 +565,10 @@ def parse_setup(raw_frames, destination_frame=None, header=0, separator=None, co
 
     :param na_strings: A list of strings, or a list of lists of strings (one list per column), or a dictionary
         of column names to strings which are to be interpreted as missing values.
+    :param template: A parse setup saved with :meth:`save_parse_template`, to be used instead of the guess of the
+        H2O backend. The backend still guesses the setup, to check that the files fit the template (if not, its guess
+        is used) and to size the chunks of the parse; unless the template has a ``chunk_size``, as the templates of
+        the uploaded files do.
 
     :returns: a dictionary containing parse parameters guessed by the H2O backend.
     """
@@ -537,20 +582,31 @@ def parse_setup(raw_frames, destination_frame=None, header=0, separator=None, co
     assert_is_type(column_names, [str], None)
     assert_is_type(column_types, [coltype], {str: coltype}, None)
     assert_is_type(na_strings, [natype], {str: natype}, None)
+    assert_is_type(template, dict, None)
     check_frame_id(destination_frame)
 
     # The H2O backend only accepts things that are quoted
     if is_type(raw_frames, str): raw_frames = [raw_frames]
 
-    # temporary dictionary just to pass the following information to the parser: header, separator
-    kwargs = {"check_header": header, "source_frames": [quoted(frame_id) for frame_id in raw_frames]}
-    if separator:
-        kwargs["separator"] = ord(separator)
-
-    j = api("POST /3/ParseSetup", data=kwargs)
-    if "warnings" in j and j["warnings"]:
-        for w in j["warnings"]:
-            warnings.warn(w)
+    if template is not None and "chunk_size" in template:
+        j = dict(template, source_frames=[{"name": frame_id} for frame_id in raw_frames],
+                 destination_frame=py_tmp_key(append=h2oconn.session_id))
+        if header != 0: j["check_header"] = header
+        if separator: j["separator"] = ord(separator)
+    elif template is not None:
+        # The chunk size depends on the size of the files, and the files are checked against the template: both come
+        # from the guess of the backend, made with the separator and the header of the template
+        j = _guess_setup(raw_frames, header or template["check_header"], separator or chr(template["separator"]))
+        if j["number_columns"] == template["number_columns"] and \
+                (j["check_header"] != 1 or j["column_names"] == template["column_names"]):
+            j = dict(template, source_frames=j["source_frames"], destination_frame=j["destination_frame"],
+                     check_header=j["check_header"], separator=j["separator"], chunk_size=j["chunk_size"])
+        elif header == 0 or not separator:
+            j = _guess_setup(raw_frames, header, separator)
+    else:
+        j = _guess_setup(raw_frames, header, separator)
+    if template is not None:
+        j["column_names"] = list(j["column_names"]) if j["column_names"] else None
     # TODO: really should be url encoding...
     # TODO: clean up all this
     if destination_frame:
@@ -614,6 +670,56 @@ def parse_setup(raw_frames, destination_frame=None, header=0, separator=None, co
     return j
 
 
+def _guess_setup(raw_frames, header, separator):
+    """The parse setup of the raw frames guessed by the H2O backend."""
+    # temporary dictionary just to pass the following information to the parser: header, separator
+    kwargs = {"check_header": header, "source_frames": [quoted(frame_id) for frame_id in raw_frames]}
+    if separator:
+        kwargs["separator"] = ord(separator)
+
+    j = api("POST /3/ParseSetup", data=kwargs)
+    if "warnings" in j and j["warnings"]:
+        for w in j["warnings"]:
+            warnings.warn(w)
+    return j
+
+
+def save_parse_template(setup, pattern, path):
+    """
+    Save the parse setup as the template for the files whose names match the pattern.
+
+    The templates are kept in a local JSON file. When that file is given to :meth:`import_file` or :meth:`upload_file`
+    (as ``parse_templates``), the template matching the files is used instead of asking the H2O backend to guess the
+    parse setup again, so that files with the same layout are always parsed the same way. The first line of each
+    local file is checked first against the template's separator, number of columns and header, and the files on the
+    cluster are checked against the backend's guess made with the template's separator and header; if they do not
+    fit, or if the backend rejects the template, the setup is guessed as usual.
+
+    :param setup: Result of ``h2o.parse_setup()``, possibly corrected.
+    :param pattern: A glob pattern (e.g. ``"sales_*.csv"``) matched against the path of the files or their base name.
+    :param path: The local JSON file of the templates, which is created if necessary. A template with the same
+        pattern is replaced, otherwise the new template is appended (the first matching template is used).
+
+    :examples:
+        >>> setup = h2o.parse_setup(h2o.lazy_import("/data/sales_2017-01-01.csv"), column_types={"store": "enum"})
+        >>> h2o.save_parse_template(setup, "sales_*.csv", "~/templates.json")
+        >>> sales = h2o.import_file("/data/sales_2017-01-02.csv", parse_templates="~/templates.json")
+    """
+    assert_is_type(setup, dict)
+    assert_is_type(pattern, str)
+    assert_is_type(path, str)
+    path = os.path.expanduser(path)
+    unquote = lambda s: s[1:-1] if len(s) >= 2 and s[0] == s[-1] == '"' else s
+    template = {k: setup[k] for k in _PARSE_TEMPLATE_FIELDS}
+    if template["column_names"]:
+        template["column_names"] = [unquote(name) for name in template["column_names"]]
+    template["column_types"] = [unquote(ctype) for ctype in template["column_types"]]
+    templates = [t for t in _load_parse_templates(path) if t["pattern"] != pattern]
+    templates.append({"pattern": pattern, "setup": template})
+    with open(path, "w") as f:
+        json.dump(templates, f, indent=2)
+
+
 def parse_raw(setup, id=None, first_line_is_header=0):
     """
     Parse dataset using the parse setup structure.
@@ -653,6 +759,7 @@ def assign(data, xid):
     data._ex = ExprNode("assign", xid, data)._eval_driver(False)
     data._ex._cache._id = xid
     data._ex._children = None
+    Scope._record(xid)
     return data
 
 
@@ -672,6 +779,7 @@ def deep_copy(data, xid):
     duplicate._ex = ExprNode("assign", xid, duplicate)._eval_driver(False)
     duplicate._ex._cache._id = xid
     duplicate._ex._children = None
+    Scope._record(xid)
     return duplicate
 
 
@@ -679,12 +787,20 @@ def get_model(model_id):
     """
     Load a model from the server.
 
+    The heavy sections of the model, such as its scoring history or the thresholds tables of its metrics, are only
+    fetched when they are first accessed (see :meth:`ModelBase.memory_report`).
+
     :param model_id: The model identification in H2O
 
     :returns: Model object, a subclass of H2OEstimator
     """
     assert_is_type(model_id, str)
-    model_json = api("GET /3/Models/%s" % model_id)["models"][0]
+    model_json = _fetch_model_json(model_id)
+    return _model_from_json(model_id, model_json)
+
+
+def _model_from_json(model_id, model_json):
+    """Create a model object of the appropriate class from the ``GET /3/Models/{model_id}`` json."""
     algo = model_json["algo"]
     if algo == "svd":            m = H2OSVD()
     elif algo == "pca":          m = H2OPCA()
@@ -717,11 +833,10 @@ def get_grid(grid_id):
     """
     assert_is_type(grid_id, str)
     grid_json = api("GET /99/Grids/%s" % grid_id)
-    models = [get_model(key["name"]) for key in grid_json["model_ids"]]
+    models = _GridModels([key["name"] for key in grid_json["model_ids"]])
     # get first model returned in list of models from grid search to get model class (binomial, multinomial, etc)
-    first_model_json = api("GET /3/Models/%s" % grid_json["model_ids"][0]["name"])["models"][0]
     gs = H2OGridSearch(None, {}, grid_id)
-    gs._resolve_grid(grid_id, grid_json, first_model_json)
+    gs._resolve_grid(grid_id, grid_json, models[0]._model_json)
     gs.models = models
     hyper_params = {param: set() for param in gs.hyper_names}
     for param in gs.hyper_names:
@@ -748,6 +863,64 @@ def get_frame(frame_id):
     return H2OFrame.get_frame(frame_id)
 
 
+def evaluate(frames):
+    """
+    Evaluate several lazy frames at once, using a single request to the server.
+
+    Normally each frame is computed separately the first time its data is needed. This function merges all the
+    pending computations into one Rapids program instead, so that the sub-expressions shared between the frames
+    are computed only once and the number of round trips to the server is minimized.
+
+    The server's response describes only one of the computed frames. For the others, the number of rows and columns
+    is known right away only if it could be derived on the client from the expression (for example for arithmetic
+    on columns); otherwise it is requested from the server the first time it is needed.
+
+    :param frames: an :class:`H2OFrame`, or a list of frames to evaluate.
+    :returns: the passed frame(s).
+    """
+    assert_is_type(frames, H2OFrame, [H2OFrame])
+    ExprNode._eval_batch([fr._ex for fr in (frames if isinstance(frames, list) else [frames])])
+    return frames
+
+
+def deferred_evaluation():
+    """
+    Create a context manager that evaluates all frames created within its block in a single request on exit.
+
+    :examples:
+      >>> with h2o.deferred_evaluation():
+      ...     scaled = fr["a"] * 0.01
+      ...     logged = scaled.log()
+      ...     flag = scaled > 1
+      >>> # all three frames have been computed here, with `scaled` evaluated only once
+    """
+    return DeferredEvaluation()
+
+
+def scope(keep=None):
+    """
+    Create a context manager that removes from the cluster all frames and models created within its block.
+
+    Keys of frames (including temporary frames produced by lazy expressions) and models created inside the block
+    are recorded, and at the end of the block all of them, except for those in ``keep``, are removed from the
+    cluster in a single request. More objects can be kept by calling ``.keep()`` on the scope within the block.
+    Frames and models created before the block, or by other users of the cluster, are never touched.
+
+    :param keep: a frame, model or key (or a list of those) that should not be removed.
+    :returns: the scope object; after the block its ``removed`` attribute lists the removed keys, and
+        ``bytes_freed`` holds the total size of the removed frames.
+
+    :examples:
+      >>> with h2o.scope() as s:
+      ...     train, test = fr.split_frame([0.8])
+      ...     model = H2OGradientBoostingEstimator()
+      ...     model.train(y="label", training_frame=train)
+      ...     s.keep(model)
+      >>> print("%d bytes freed" % s.bytes_freed)
+    """
+    return Scope(keep)
+
+
 def no_progress():
     """
     Disable the progress bar from flushing to stdout.
@@ -762,6 +935,52 @@ def show_progress():
     H2OJob.__PROGRESS_BAR__ = True
 
 
+def enable_upload_cache(index=None):
+    """
+    Reuse the frames uploaded earlier from the same files or pandas / numpy objects.
+
+    Once enabled, :meth:`upload_file` and ``H2OFrame(python_obj)`` fingerprint their source: the size, modification
+    time and content digest of the files, or the digest of the object's columns, together with the parse options.
+    If the cluster still holds the frame uploaded before with the same fingerprint, unmodified, that frame is
+    returned instead of uploading and parsing the data again. Note that such frames are then shared.
+
+    :param index: path of a local JSON file where the cache is kept, so that it can be reused by later python sessions.
+        If not given, the cache lasts until :meth:`disable_upload_cache` is called or the session ends.
+    """
+    assert_is_type(index, str, None)
+    H2OFrame._upload_cache = _UploadCache(os.path.expanduser(index) if index else None)
+
+
+def disable_upload_cache():
+    """Upload the data every time (the upload cache is disabled by default)."""
+    H2OFrame._upload_cache = None
+
+
+def enable_training_cache(index=None, max_models=1000):
+    """
+    Reuse the models built earlier from the same data with the same parameters.
+
+    Once enabled, :meth:`H2OEstimator.train` fingerprints each model build: the algorithm, the parameters, and the
+    checksums of the training, validation and other frames involved. If the cluster still holds the model built
+    before with the same fingerprint, that model is attached to the estimator instead of training it again; use
+    ``train(..., force=True)`` to train it anyway. Note that such models are then shared.
+
+    :param index: path of a local JSON file where the cache is kept, so that it can be reused by later python sessions.
+        If not given, the cache lasts until :meth:`disable_training_cache` is called or the session ends.
+    :param max_models: maximum number of models in the cache; the least recently used ones are evicted first. Evicted
+        models are not removed from the cluster.
+    """
+    assert_is_type(index, str, None)
+    assert_is_type(max_models, int)
+    assert_satisfies(max_models, max_models > 0)
+    H2OEstimator._training_cache = _TrainingCache(os.path.expanduser(index) if index else None, max_models)
+
+
+def disable_training_cache():
+    """Train the models every time (the training cache is disabled by default)."""
+    H2OEstimator._training_cache = None
+
+
 def log_and_echo(message=""):
     """
     Log a message on the server-side logs.
@@ -884,9 +1103,7 @@ def download_csv(data, filename):
     """
     assert_is_type(data, H2OFrame)
     assert_is_type(filename, str)
-    url = h2oconn.make_url("DownloadDataset", 3) + "?frame_id={}&hex_string=false".format(data.frame_id)
-    with open(filename, "wb") as f:
-        f.write(urlopen()(url).read())
+    api("GET /3/DownloadDataset", data={"frame_id": data.frame_id, "hex_string": False}, save_to=filename)
 
 
 def download_all_logs(dirname=".", filename=None):
@@ -1250,7 +1467,9 @@ def _connect_with_conf(conn_conf):
     assert_is_type(conf, H2OConnectionConf)
 
     return connect(url = conf.url, verify_ssl_certificates = conf.verify_ssl_certificates,
-                   auth = conf.auth, proxy = conf.proxy,cookies = conf.cookies, verbose = conf.verbose)
+                   auth = conf.auth, proxy = conf.proxy,cookies = conf.cookies, verbose = conf.verbose,
+                   pool_connections = conf.pool_connections, pool_maxsize = conf.pool_maxsize,
+                   keep_alive = conf.keep_alive)
 
 #-----------------------------------------------------------------------------------------------------------------------
 #  ALL DEPRECATED METHODS BELOW
@@ -7,12 +7,16 @@ A job can be polled for completion and reports the current progress as long as i
 """
 from __future__ import division, print_function, absolute_import, unicode_literals
 
+import threading
+import time
 import warnings
+from concurrent.futures import Future
 
 import h2o
 from h2o.exceptions import H2OJobCancelled
 from h2o.utils.progressbar import ProgressBar
 from h2o.utils.shared_utils import clamp
+from h2o.utils.typechecks import assert_is_type, assert_satisfies
 
 
 class H2OJob(object):
@@ -60,6 +64,11 @@ class H2OJob(object):
 
         assert self.status in {"DONE", "CANCELLED", "FAILED"} or self._poll_count <= 0, \
             "Polling finished while the job has status %s" % self.status
+        self._check_completion()
+        return self
+
+    def _check_completion(self):
+        """Emit the job's warnings, and raise an exception if the job was cancelled or has failed."""
         if self.warnings:
             for w in self.warnings:
                 warnings.warn(w)
@@ -74,7 +83,16 @@ class H2OJob(object):
             else:
                 raise EnvironmentError("Job with key %s failed with an exception: %s" % (self.job_key, self.exception))
 
-        return self
+    def future(self, callback=None):
+        """
+        Return a future for the completion of the job, without blocking.
+
+        The job is monitored by the shared :class:`H2OJobPoller` (see :meth:`H2OJobPoller.submit`).
+
+        :param callback: function to be called with the job once it completes, fails or gets cancelled.
+        :returns: a ``concurrent.futures.Future`` resolved with this job.
+        """
+        return H2OJobPoller.shared().submit(self, callback)
 
     # TODO: this is not multi-client safe:
     def poll_once(self):
@@ -86,22 +104,25 @@ class H2OJob(object):
 
     def _refresh_job_status(self):
         if self._poll_count <= 0: raise StopIteration("")
-        jobs = h2o.api("GET /3/Jobs/%s" % self.job_key)
+        self._update_from_json(h2o.api("GET /3/Jobs/%s" % self.job_key))
+        self._poll_count -= 1
+        if self.status == "FAILED": raise StopIteration("failed")
+        if self.status == "CANCELLED": raise StopIteration("cancelled by the server")
+        return self.progress
+
+    def _update_from_json(self, jobs):
+        """Update the job's state from the JobsV3 response returned by ``GET /3/Jobs/{key}``."""
         self.job = jobs["jobs"][0] if "jobs" in jobs else jobs["job"][0]
         self.status = self.job["status"]
         self.progress = self.job["progress"]
         self.exception = self.job["exception"]
         self.warnings = self.job["warnings"] if "warnings" in self.job else None
-        self._poll_count -= 1
         # Sometimes the server may report the job at 100% but still having status "RUNNING" -- we work around this
         # by showing progress at 99% instead. Sometimes the server may report the job at 0% but having status "DONE",
         # in this case we set the progress to 100% manually.
         if self.status == "CREATED": self.progress = 0
         if self.status == "RUNNING": self.progress = clamp(self.progress, 0, 0.99)
         if self.status == "DONE": self.progress = 1
-        if self.status == "FAILED": raise StopIteration("failed")
-        if self.status == "CANCELLED": raise StopIteration("cancelled by the server")
-        return self.progress
 
     def __repr__(self):
         if self.status in {"CREATED", "RUNNING"}:
@@ -109,3 +130,164 @@ class H2OJob(object):
         else:
             desc = self.status.lower()
         return "<H2OJob id=%s %s>" % (self.job_key, desc)
+
+
+
+class H2OJobPoller(object):
+    """
+    Monitor of many jobs running on the server at the same time.
+
+    Instead of polling each job on its own, the poller refreshes all the outstanding jobs from a single
+    ``GET /3/Jobs`` listing per tick, on a background thread. Each job's progress is fed into the model of the
+    :class:`ProgressBar <h2o.utils.progressbar.ProgressBar>`, which decides when that job should be queried next; the
+    next tick happens at the earliest of those moments. Thus the jobs that progress quickly or are about to finish
+    are checked often, while the long running jobs are only checked every few seconds::
+
+        models = [H2OGradientBoostingEstimator(max_depth=d) for d in range(2, 12)]
+        for m in models:
+            m.start(x, y, training_frame=train)
+        concurrent.futures.wait([m._job.future() for m in models])
+
+    When a job cannot be queried (for example on a transient connection error), it is queried again later, waiting
+    twice as long after each consecutive error, up to ``MAX_RETRY_DELAY`` seconds. Its future fails only after
+    ``MAX_ERRORS`` consecutive errors.
+    """
+
+    MAX_ERRORS = 8
+    MAX_RETRY_DELAY = 10
+
+    _shared = None
+
+    def __init__(self):
+        """Create a new poller; usually the one returned by :meth:`shared` should be used instead."""
+        self._lock = threading.Condition()
+        self._jobs = {}  # job_key => [job, future, progress model, next poll time, number of consecutive errors]
+        self._thread = None
+        self._last_tick = 0
+
+
+    @staticmethod
+    def shared():
+        """Return the poller shared by all the jobs."""
+        if H2OJobPoller._shared is None:
+            H2OJobPoller._shared = H2OJobPoller()
+        return H2OJobPoller._shared
+
+
+    def submit(self, job, callback=None):
+        """
+        Start monitoring the job.
+
+        The returned future is resolved with the job once it is done, or with the exception that :meth:`H2OJob.poll`
+        would have raised if the job fails or gets cancelled. Cancelling the future before that cancels the job on the
+        server.
+
+        :param H2OJob job: the job to monitor.
+        :param callback: function to be called with the job once it completes, fails or gets cancelled.
+        :returns: a ``concurrent.futures.Future`` resolved with the ``job``.
+        """
+        assert_is_type(job, H2OJob)
+        assert_satisfies(callback, callback is None or callable(callback))
+        with self._lock:
+            if job.job_key in self._jobs:
+                future = self._jobs[job.job_key][1]
+            else:
+                future = Future()
+                pb = ProgressBar(hidden=True)
+                self._jobs[job.job_key] = [job, future, pb, pb.record(job.progress), 0]
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="H2OJobPoller")
+                    self._thread.daemon = True
+                    self._thread.start()
+                self._lock.notify()
+                future.add_done_callback(lambda _: self._cancel(job) if future.cancelled() else None)
+        if callback is not None:
+            future.add_done_callback(lambda _: callback(job))
+        return future
+
+
+    @property
+    def jobs(self):
+        """List of the jobs being monitored."""
+        with self._lock:
+            return [entry[0] for entry in self._jobs.values()]
+
+
+    #-------------------------------------------------------------------------------------------------------------------
+    # PRIVATE
+    #-------------------------------------------------------------------------------------------------------------------
+
+    def _run(self):
+        """Tick until there are no more jobs to monitor."""
+        while True:
+            with self._lock:
+                while True:
+                    if not self._jobs:
+                        self._thread = None
+                        return
+                    now = time.time()
+                    next_tick = max(min(entry[3] for entry in self._jobs.values()),
+                                    self._last_tick + ProgressBar.MIN_PROGRESS_CHECK_INTERVAL)
+                    if next_tick <= now: break
+                    self._lock.wait(next_tick - now)
+                self._last_tick = now
+                entries = list(self._jobs.values())
+            try:
+                self._tick(entries)
+            except Exception as e:
+                # Never leave the waiters of the jobs hanging, should the thread be about to die
+                self._failed(entries, e)
+
+
+    def _tick(self, entries):
+        """Refresh the given jobs, and resolve the futures of those which are no longer running."""
+        try:
+            listing = {j["key"]["name"]: j for j in h2o.api("GET /3/Jobs")["jobs"]}
+        except Exception as e:
+            self._failed(entries, e)
+            return
+        for entry in entries:
+            job, future, pb = entry[:3]
+            if future.cancelled(): continue
+            try:
+                if job.job_key in listing:
+                    job._update_from_json({"jobs": [listing[job.job_key]]})
+                else:
+                    job._update_from_json(h2o.api("GET /3/Jobs/%s" % job.job_key))
+            except Exception as e:
+                self._failed([entry], e)
+                continue
+            entry[4] = 0
+            if job.status not in {"DONE", "FAILED", "CANCELLED"}:
+                entry[3] = pb.record(job.progress)
+            elif self._release(job) and future.set_running_or_notify_cancel():
+                try:
+                    job._check_completion()
+                    future.set_result(job)
+                except Exception as e:
+                    future.set_exception(e)
+
+
+    def _failed(self, entries, e):
+        """Query the jobs which could not be queried again later, or fail them after too many consecutive errors."""
+        now = time.time()
+        for entry in entries:
+            job, future = entry[:2]
+            entry[4] += 1
+            if entry[4] < self.MAX_ERRORS:
+                entry[3] = now + min(ProgressBar.MIN_PROGRESS_CHECK_INTERVAL * 2 ** entry[4], self.MAX_RETRY_DELAY)
+            elif self._release(job) and future.set_running_or_notify_cancel():
+                future.set_exception(e)
+
+
+    def _cancel(self, job):
+        """Cancel the job on the server, as its future has been cancelled."""
+        if self._release(job):
+            h2o.api("POST /3/Jobs/%s/cancel" % job.job_key)
+            job.status = "CANCELLED"
+
+
+    def _release(self, job):
+        """Stop monitoring the job; return False if it was not monitored."""
+        with self._lock:
+            return self._jobs.pop(job.job_key, None) is not None
@@ -2,17 +2,24 @@
 from __future__ import absolute_import, division, print_function, unicode_literals
 
 import os
+import sys
 import traceback
 import warnings
+try:
+    from collections.abc import MutableMapping
+except ImportError:  # Python 2
+    from collections import MutableMapping
 
 import h2o
-from h2o.exceptions import H2OValueError
+from h2o.exceptions import H2OResponseError, H2OValueError
+from h2o.expr import Scope
 from h2o.job import H2OJob
+from h2o.model.metrics_base import MetricsBase
 from h2o.utils.backward_compatibility import backwards_compatible
 from h2o.utils.compatibility import *  # NOQA
 from h2o.utils.compatibility import viewitems
 from h2o.utils.shared_utils import can_use_pandas
-from h2o.utils.typechecks import I, assert_is_type
+from h2o.utils.typechecks import I, assert_is_type, is_type, numeric
 
 
 class ModelBase(backwards_compatible()):
@@ -130,6 +137,7 @@ class ModelBase(backwards_compatible()):
         j = H2OJob(h2o.api("POST /4/Predictions/models/%s/frames/%s" % (self.model_id, test_data.frame_id)),
                    self._model_json["algo"] + " prediction")
         j.poll()
+        Scope._record(j.dest_key)
         return h2o.get_frame(j.dest_key)
 
 
@@ -292,6 +300,32 @@ class ModelBase(backwards_compatible()):
         print("No cross-validation metrics summary for this model")
 
 
+    def memory_report(self):
+        """
+        Report the memory taken by the model's JSON on the client.
+
+        The heavy sections of the JSON (such as the scoring history, the variable importances and coefficients
+        tables, or the thresholds tables of the metrics) are fetched from the server when they are first accessed.
+
+        :returns: a dictionary of the approximate sizes in bytes of the ``"summary"`` (everything but the heavy
+            sections) and of each heavy section, such as ``"scoring_history"`` or
+            ``"training_metrics/thresholds_and_metric_scores"``; the sections not loaded yet have size None.
+        """
+        if self._model_json is None: return {}
+        report = {}
+        seen = set()
+        output = self._model_json["output"]
+        if not isinstance(output, _LazyJson): return {"summary": _sizeof(self._model_json)}
+        for part in [output] + [output._data.get(m) for m in _METRICS_SECTIONS]:
+            part = getattr(part, "_metric_json", part)
+            if not isinstance(part, _LazyJson): continue
+            prefix = "/".join(part._path[1:] + ("", ))
+            for key in part._sections:
+                report[prefix + key] = None if key in part._pending else _sizeof(part._data[key], seen)
+        report["summary"] = _sizeof(self._model_json, seen)
+        return report
+
+
     def summary(self):
         """Print a detailed summary of the model."""
         model = self._model_json["output"]
@@ -1197,6 +1231,154 @@ class ModelBase(backwards_compatible()):
 
 
 
+# The metrics of the models, and the sections of the models' JSON fetched only when they are accessed: those of the
+# output of all models, of the output of some algos, and of the metrics of some model categories
+_METRICS_SECTIONS = ("training_metrics", "validation_metrics", "cross_validation_metrics")
+_LAZY_OUTPUT_SECTIONS = ("scoring_history", "cross_validation_metrics_summary")
+_LAZY_ALGO_SECTIONS = {
+    "deeplearning": ("variable_importances", ),
+    "drf": ("variable_importances", ),
+    "gbm": ("variable_importances", ),
+    "glm": ("coefficients_table", "standardized_coefficient_magnitudes"),
+}
+_LAZY_METRICS_SECTIONS = {
+    "Binomial": ("thresholds_and_metric_scores", "max_criteria_and_metric_scores", "gains_lift_table"),
+    "Multinomial": ("cm", "hit_ratio_table"),
+}
+
+
+def _fetch_model_json(model_id, rest_version=3, algo=None, category=None):
+    """
+    Fetch the JSON of the model, leaving out its heavy sections, which are fetched one at a time when first accessed.
+
+    The heavy sections depend on the algo and on the model category, and the server rejects the exclusion of the
+    fields that the model does not have. So when both are given (as for the models of a grid), the model is fetched
+    in a single request; otherwise it is fetched without its metrics, then its metrics are fetched once its model
+    category is known. The sections specific to the algo are then left out only if the algo is given.
+    """
+    endpoint = "GET /%d/Models/%s" % (rest_version, model_id)
+    lazy = _LAZY_OUTPUT_SECTIONS + _LAZY_ALGO_SECTIONS.get(algo, ())
+    lazy_metrics = _LAZY_METRICS_SECTIONS.get(category, ())
+    excluded = list(lazy)
+    if category is None:
+        excluded += _METRICS_SECTIONS
+    else:
+        excluded += ["%s/%s" % (m, s) for m in _METRICS_SECTIONS for s in lazy_metrics]
+    try:
+        model_json = h2o.api(endpoint, data={"_exclude_fields": _excluded_fields([], excluded, "output")})
+    except H2OResponseError:
+        # The model is not of the given algo or category after all
+        if algo is None and category is None: raise
+        return _fetch_model_json(model_id, rest_version)
+    model_json = model_json["models"][0]
+    output = model_json["output"]
+    levels = [_excludable(model_json), _excludable(output)]
+    if category is None:
+        lazy_metrics = _LAZY_METRICS_SECTIONS.get(output["model_category"], ())
+        excluded = [k for k in levels[1] if k not in _METRICS_SECTIONS]
+        excluded += ["%s/%s" % (m, s) for m in _METRICS_SECTIONS for s in lazy_metrics]
+        metrics = h2o.api(endpoint, data={"_exclude_fields": _excluded_fields(levels[:1], excluded, "output")})
+        for m in _METRICS_SECTIONS:
+            output[m] = metrics["models"][0]["output"][m]
+    for m in _METRICS_SECTIONS:
+        if isinstance(output[m], MetricsBase):
+            output[m]._metric_json = _LazyJson(output[m]._metric_json, endpoint, ("output", m), levels, lazy_metrics)
+        elif output[m] is not None:
+            # Some metrics (such as those of GLM) are not made into MetricsBase objects by the connection
+            output[m] = _LazyJson(output[m], endpoint, ("output", m), levels, lazy_metrics)
+    model_json["output"] = _LazyJson(output, endpoint, ("output", ), levels[:1], lazy)
+    return model_json
+
+
+def _excluded_fields(levels, sections, *path):
+    """
+    Value of the ``_exclude_fields`` parameter which leaves out the given sections under the path in the model's
+    JSON, as well as all the fields along the path but the path itself. ``levels`` are the lists of the keys at each
+    level of the path, as returned by :func:`_excludable`.
+    """
+    excluded = ["models/%s" % "/".join(path[:i] + (k, )) for i, keys in enumerate(levels) for k in keys if k != path[i]]
+    excluded += ["models/%s" % "/".join(path + (s, )) for s in sections]
+    return ",".join(excluded)
+
+
+def _excludable(part):
+    """
+    Keys of the fields of this part of the model's JSON that the server can leave out: it fails to do so for the
+    numeric and boolean fields, and for the parameters of the model.
+    """
+    return [k for k, v in viewitems(part) if k not in {"__meta", "parameters"} and not is_type(v, bool, numeric)]
+
+
+class _LazyJson(MutableMapping):
+    """
+    Part of a model's JSON, whose heavy sections are fetched from the server when they are first accessed.
+
+    Iterating over its items fetches the pending sections as they come, and it can be pickled with them still pending;
+    but it is not a ``dict``, so ``json.dumps`` rejects it rather than writing the pending sections as missing.
+    """
+
+    def __init__(self, data, endpoint, path, levels, sections):
+        """
+        :param data: the part of the JSON, where the heavy sections are null.
+        :param endpoint: the endpoint of the model, "GET /3/Models/{model_id}".
+        :param path: the path to this part of the JSON, for example ``("output", "training_metrics")``.
+        :param levels: the lists of the keys at each level of the path.
+        :param sections: the names of the heavy sections.
+        """
+        self._data = dict(data)
+        self._endpoint = endpoint
+        self._path = path
+        self._levels = levels
+        self._sections = [s for s in sections if s in data]
+        self._pending = set(self._sections)
+
+    def __getitem__(self, key):
+        if key in self._pending:
+            excluded = _excluded_fields(self._levels, [k for k in _excludable(self._data) if k != key], *self._path)
+            res = h2o.api(self._endpoint, data={"_exclude_fields": excluded})["models"][0]
+            for k in self._path + (key, ):
+                res = getattr(res, "_metric_json", res)[k]
+            self[key] = res
+        return self._data[key]
+
+    def __setitem__(self, key, value):
+        self._pending.discard(key)
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        self._pending.discard(key)
+        del self._data[key]
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __repr__(self):
+        return "<%s of %s, pending: %s>" % ("/".join(self._path), self._endpoint[4:], sorted(self._pending))
+
+
+def _sizeof(obj, seen=None):
+    """Approximate number of bytes taken by the JSON-like object, without loading any pending sections."""
+    if seen is None: seen = set()
+    if id(obj) in seen: return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, _LazyJson):
+        size += _sizeof(obj._data, seen)
+    elif isinstance(obj, dict):
+        size += sum(_sizeof(k, seen) + _sizeof(v, seen) for k, v in dict.items(obj))
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_sizeof(v, seen) for v in obj)
+    elif hasattr(obj, "__dict__"):
+        size += _sizeof(obj.__dict__, seen)
+    return size
+
+
 def _get_matplotlib_pyplot(server):
     try:
         # noinspection PyUnresolvedReferences
@@ -54,7 +54,7 @@ class BackwardsCompatibleMeta(type):
             # print("Warning: Symbol %s in class %s is deprecated." % (name, cls.__name__))
             bc["sv"][name] = value
         else:
-            cls.__dict__[name] = value
+            type.__setattr__(cls, name, value)
 
 
 
@@ -67,9 +67,11 @@ class BackwardsCompatibleBase(object):
         }
 
     def __getattr__(self, item):
-        if item in self._bcin:
+        # The objects being unpickled have no _bcin yet
+        bcin = self.__dict__.get("_bcin", {})
+        if item in bcin:
             # print("Warning: Method %s in class %s is deprecated." % (item, self.__class__.__name__))
-            return self._bcin[item]
+            return bcin[item]
         # Make sure that we look up any names not found on the instance also in the class
         return getattr(self.__class__, item)
 
@@ -140,11 +140,7 @@ class ProgressBar(object):
             progress_fn = (lambda g: lambda: next(g))(progress_fn)
 
         # Initialize the execution context
-        self._next_poll_time = 0
-        self._t0 = time.time()
-        self._x0 = 0
-        self._v0 = 0.01  # corresponds to 100s completion time
-        self._ve = 0.01
+        self._initialize_model()
 
         progress = 0
         status = None  # Status message in case the job gets interrupted.
@@ -199,10 +195,38 @@ class ProgressBar(object):
             raise StopIteration(status)
 
 
+    def record(self, progress):
+        """
+        Feed the progress level queried outside of :meth:`execute` into the progress model.
+
+        This allows the model to drive the polling of processes whose progress is not displayed, for example when the
+        progress of many processes is queried all at once.
+
+        :param progress: the current progress level, from 0 to ``maxval``.
+        :returns: the time when the progress should be queried next.
+        """
+        assert_is_type(progress, numeric)
+        if self._t0 is None:
+            self._initialize_model()
+        now = time.time()
+        self._store_model_progress((progress, -1), now)
+        self._recalculate_model_parameters(now)
+        return self._next_poll_time
+
+
     #-------------------------------------------------------------------------------------------------------------------
     #  Private
     #-------------------------------------------------------------------------------------------------------------------
 
+    def _initialize_model(self):
+        """Reset the progress model to its initial state."""
+        self._next_poll_time = 0
+        self._t0 = time.time()
+        self._x0 = 0
+        self._v0 = 0.01  # corresponds to 100s completion time
+        self._ve = 0.01
+        self._progress_data = []
+
     def _get_real_progress(self):
         return self._progress_data[-1][1] / self._maxval
 
@@ -9,11 +9,13 @@ This file INTENTIONALLY has NO module dependencies!
 """
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import csv
 import imp
 import itertools
 import os
 import re
 import sys
+from io import BytesIO, StringIO
 
 from h2o.exceptions import H2OValueError
 from h2o.utils.compatibility import *  # NOQA
@@ -184,6 +186,180 @@ def _handle_python_dicts(python_obj, check_header):
     return header, data_to_write
 
 
+def _numpy_array_columns(python_obj, header):
+    """Split a numpy array into its columns; its first row holds the column names if ``header`` is 1."""
+    if python_obj.ndim > 2:
+        raise ValueError("`python_obj` must be a 1- or 2-dimensional array, got %d dimensions" % python_obj.ndim)
+    array = python_obj.reshape(-1, 1) if python_obj.ndim < 2 else python_obj
+    if header == 1:
+        names = [str(name) for name in array[0]]
+        array = array[1:]
+    else:
+        names = _gen_header(array.shape[1])
+    return names, [array[:, j] for j in range(array.shape[1])]
+
+
+def _pandas_data_frame_columns(python_obj):
+    """Split a pandas DataFrame into its columns: numpy arrays, or pandas Categoricals for categorical columns."""
+    columns = [python_obj.iloc[:, j].values for j in range(python_obj.shape[1])]
+    return [str(name) for name in python_obj.columns], columns
+
+
+def _column_types(columns):
+    """
+    H2O column types of the given columns (as returned by the two functions above), derived from their dtypes.
+
+    Text columns (and object columns holding strings) are of type "string" if almost all their values are distinct, as
+    identifiers would be, and "enum" otherwise -- the same rule as the server uses on its sample of the data, but here
+    applied to all values. The type is None for the columns whose type is best left for the server to guess.
+    """
+    types = []
+    for values in columns:
+        if hasattr(values, "categories") and hasattr(values, "codes"):
+            types.append("enum")
+            continue
+        kind = getattr(values.dtype, "kind", "O")
+        if kind == "O" and can_use_pandas():
+            import pandas
+            kind = {"string": "U", "unicode": "U", "bytes": "U", "integer": "i", "floating": "f", "decimal": "f",
+                    "mixed-integer-float": "f", "boolean": "b"}.get(pandas.api.types.infer_dtype(values, skipna=True),
+                                                                    "O")
+        if kind in "US":
+            present = [value for value, missing in zip(values.tolist(), _missing(values)) if not missing]
+            if not present:
+                types.append(None)
+            else:
+                types.append("string" if len(set(present)) >= 0.95 * len(present) else "enum")
+        else:
+            types.append({"f": "real", "i": "int", "u": "int", "b": "enum", "M": "time"}.get(kind))
+    return types
+
+
+# Number of rows encoded at a time when uploading python objects
+_UPLOAD_BLOCK_ROWS = 20000
+
+# Leading bytes of the compressed formats the server can parse (gzip, zip, bzip2 and xls), which cannot be split into
+# parts nor compressed again
+_COMPRESSED_MAGICS = (b"\x1f\x8b", b"PK\x03\x04", b"BZh", b"\xd0\xcf\x11\xe0")
+
+
+def _csv_quote(value):
+    return '"' + value.replace('"', '""') + '"'
+
+
+def _csv_field(value):
+    return str(value) if is_type(value, numeric) else _csv_quote(str(value))
+
+
+def _missing(values):
+    """
+    Which of the ``values`` are missing: None and NaN, and when pandas is available, anything it considers missing
+    (such as NaT, and the NA of its nullable dtypes).
+    """
+    if can_use_pandas():
+        import pandas
+        return pandas.isna(values).tolist()
+    return [value is None or (is_type(value, numeric) and value != value) for value in values.tolist()]
+
+
+def _csv_fields(values):
+    """
+    Format the column ``values`` as a list of CSV fields, in a way chosen once for the whole column by its dtype.
+
+    Numbers are written as they are and strings are quoted, while missing values (None, NaN, NaT, and the NA of the
+    pandas nullable dtypes) are left empty. Pandas Categoricals are formatted by taking the formatted categories at
+    their codes.
+    """
+    import numpy
+    if hasattr(values, "categories") and hasattr(values, "codes"):
+        levels = numpy.array(_csv_fields(numpy.asarray(values.categories)) + [""], dtype=object)
+        return levels[values.codes].tolist()  # code -1 of the missing values picks the ""
+    if not isinstance(values, numpy.ndarray):
+        values = numpy.asarray(values, dtype=object)
+    kind = values.dtype.kind
+    if kind == "f":
+        fields = list(map(repr, values.tolist()))
+        for i in numpy.flatnonzero(numpy.isnan(values)).tolist():
+            fields[i] = ""
+    elif kind in "iub":
+        fields = list(map(str, values.tolist()))
+    elif kind == "M":
+        text = numpy.char.replace(numpy.datetime_as_string(values, unit="ms"), "T", " ")
+        fields = numpy.where(numpy.isnat(values), "", text).tolist()
+    elif kind in "US":
+        fields = [_csv_quote(value) for value in values.astype(str).tolist()]
+    else:
+        fields = ["" if missing else _csv_field(value) for value, missing in zip(values.tolist(), _missing(values))]
+    return fields
+
+
+def _encode_csv_columns(names, columns):
+    """Generate the CSV text of the given columns (with the names in the header) in blocks of utf-8 bytes."""
+    yield (",".join(_csv_quote(name) for name in names) + "\n").encode("utf-8")
+    nrows = len(columns[0]) if columns else 0
+    for start in range(0, nrows, _UPLOAD_BLOCK_ROWS):
+        fields = [_csv_fields(column[start:start + _UPLOAD_BLOCK_ROWS]) for column in columns]
+        yield ("\n".join(map(",".join, zip(*fields))) + "\n").encode("utf-8")
+
+
+def _encode_csv_rows(names, rows, keys=None):
+    """
+    Generate the CSV text of the given rows (with the names in the header) in blocks of utf-8 bytes.
+
+    The rows are lists of values, or dicts whose values are taken at the given ``keys``.
+    """
+    def encode(block):
+        out = StringIO() if PY3 else BytesIO()
+        csv.writer(out, dialect="excel", quoting=csv.QUOTE_NONNUMERIC).writerows(block)
+        text = out.getvalue()
+        return text.encode("utf-8") if PY3 else text
+
+    yield encode([names])
+    for start in range(0, len(rows), _UPLOAD_BLOCK_ROWS):
+        block = rows[start:start + _UPLOAD_BLOCK_ROWS]
+        yield encode([[row.get(k, None) for k in keys] for row in block] if keys is not None else block)
+
+
+# Approximate number of non-zero elements encoded at a time when uploading sparse matrices
+_UPLOAD_BLOCK_NONZEROS = 1000000
+
+
+def _encode_svmlight(matrix):
+    """
+    Generate the SVMLight text of a scipy sparse matrix in blocks of utf-8 bytes.
+
+    Each row of the matrix becomes a line, with its element in column 0 as the target, and each of its other
+    non-zero elements as a feature ``j:value`` at the element's column index ``j``. The text is produced from the
+    CSR arrays of the matrix, in blocks of rows holding about ``_UPLOAD_BLOCK_NONZEROS`` non-zero elements.
+    """
+    import numpy
+    csr = matrix.tocsr()
+    if not csr.has_canonical_format or not csr.data.all():
+        # Duplicate entries are summed and explicit zeros dropped -- on a copy, if the matrix was already in CSR
+        csr = csr.copy() if csr is matrix else csr
+        csr.sum_duplicates()
+        csr.eliminate_zeros()
+    indptr = csr.indptr
+    start = 0
+    while start < csr.shape[0]:
+        end = int(numpy.searchsorted(indptr, indptr[start] + _UPLOAD_BLOCK_NONZEROS, side="right")) - 1
+        end = min(max(end, start + 1), csr.shape[0])
+        lo, hi = indptr[start], indptr[end]
+        values = list(map(str, csr.data[lo:hi].tolist()))
+        tokens = list(map(":".join, zip(map(str, csr.indices[lo:hi].tolist()), values)))
+        row_starts = (indptr[start:end] - lo).tolist()
+        row_ends = (indptr[start + 1:end + 1] - lo).tolist()
+        lines = []
+        for s, e in zip(row_starts, row_ends):
+            # Column indices within a row are sorted, so a target can only be the row's first element
+            if s < e and csr.indices[lo + s] == 0:
+                lines.append(" ".join([values[s]] + tokens[s + 1:e]))
+            else:
+                lines.append(" ".join(["0"] + tokens[s:e]))
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+        start = end
+
+
 def _is_fr(o):
     return o.__class__.__name__ == "H2OFrame"  # hack to avoid circular imports
 
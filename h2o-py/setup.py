@@ -1,8 +1,10 @@
 # -*- encoding: utf-8 -*-
 from setuptools import setup, find_packages
+from setuptools.command.build_py import build_py
 from codecs import open
 import os
 import shutil
+import sys
 import h2o
 
 here = os.path.abspath(os.path.dirname(__file__))
@@ -15,6 +17,18 @@ packages = find_packages(exclude=["tests*"])
 print("Found packages: %r" % packages)
 
 
+# Modules written with Python 3.5+ syntax (async/await): they cannot even be byte-compiled by older Pythons, so
+# they are left out when installing with (or building a wheel for) such Python.
+py3_only_modules = [("h2o", "aio")]
+
+class BuildPy(build_py):
+    def find_package_modules(self, package, package_dir):
+        modules = build_py.find_package_modules(self, package, package_dir)
+        if sys.version_info < (3, 5):
+            modules = [m for m in modules if (m[0], m[1]) not in py3_only_modules]
+        return modules
+
+
 # Copy h2o.jar to the h2o/backend/bin directory
 h2o_jar_src = os.path.join(here, "..", "build", "h2o.jar")
 h2o_jar_dst = os.path.join(here, "h2o", "backend", "bin", "h2o.jar")
@@ -85,11 +99,12 @@ setup(
     keywords='machine learning, data mining, statistical analysis, modeling, big data, distributed, parallel',
 
     packages=packages,
+    cmdclass={"build_py": BuildPy},
     package_data={"h2o": [
         "h2o_data/*.*",     # several small datasets used in demos/examples
         "backend/bin/*.*",  # h2o.jar core Java library
     ]},
 
     # run-time dependencies
-    install_requires=["requests", "tabulate", "future", "colorama"],
+    install_requires=["requests", "tabulate", "future", "colorama", "futures; python_version < '3'"],
 )
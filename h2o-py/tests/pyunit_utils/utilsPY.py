@@ -4,6 +4,7 @@ standard_library.install_aliases()
 from builtins import range
 from past.builtins import basestring
 import sys, os
+import contextlib
 
 try:        # works with python 2.7 not 3
     from StringIO import StringIO
@@ -13,6 +14,7 @@ except:     # works with python 3
 sys.path.insert(1, "../../")
 import h2o
 import imp
+from h2o.expr import ExprNode
 import random
 import re
 import subprocess
@@ -2972,3 +2974,22 @@ def model_seed_sorted_by_time(model_list):
                 break
 
     return model_seed_list
+
+
+@contextlib.contextmanager
+def recording_rapids():
+    """
+    Context manager that records the Rapids expressions sent to the server (through ExprNode.rapids) within its block.
+
+    :return: the list of the recorded Rapids expressions, which is filled in as they are sent.
+    """
+    sent = []
+    rapids = ExprNode.rapids
+    def recording(expr):
+        sent.append(expr)
+        return rapids(expr)
+    ExprNode.rapids = staticmethod(recording)
+    try:
+        yield sent
+    finally:
+        ExprNode.rapids = staticmethod(rapids)
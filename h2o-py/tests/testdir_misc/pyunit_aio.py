@@ -0,0 +1,56 @@
+import sys
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+from h2o.estimators.gbm import H2OGradientBoostingEstimator
+
+
+def aio_test():
+    if sys.version_info < (3, 5):
+        print("h2o.aio requires Python 3.5 or newer: skipping the test")
+        return
+    # Imported here, and driven without the async syntax, so that this file still runs on Python 2
+    import asyncio
+    import h2o.aio
+
+    prostate = h2o.import_file(path=pyunit_utils.locate("smalldata/logreg/prostate.csv"))
+    models = [H2OGradientBoostingEstimator(ntrees=n) for n in (5, 10, 15)]
+    for m in models:
+        m.start(x=[2, 3, 4, 5, 6, 7, 8], y=1, training_frame=prostate)
+
+    conn = h2o.connection()
+    request = conn.request
+    blocking = []
+    def recording_request(endpoint, *args, **kwargs):
+        blocking.append(endpoint)
+        return request(endpoint, *args, **kwargs)
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    conn.request = recording_request
+    try:
+        jobs = loop.run_until_complete(asyncio.gather(*[h2o.aio.poll_job(m._job) for m in models]))
+        fetched = loop.run_until_complete(asyncio.gather(*[h2o.aio.get_model(j.dest_key) for j in jobs]))
+        frames = loop.run_until_complete(asyncio.gather(h2o.aio.get_frame(prostate.frame_id),
+                                                        h2o.aio.get_frame("no-such-frame")))
+        cloud = loop.run_until_complete(h2o.aio.api("GET /3/Cloud"))
+        loop.run_until_complete(h2o.aio.close())
+        # The models have no sections left to fetch with blocking requests
+        assert all(m.scoring_history() is not None and m.varimp() for m in fetched)
+        assert blocking == [], blocking
+    finally:
+        conn.request = request
+        loop.close()
+
+    assert all(j.status == "DONE" for j in jobs)
+    assert [m._model_json["output"]["model_category"] for m in fetched] == ["Regression"] * 3
+    assert [m.model_id for m in fetched] == [j.dest_key for j in jobs]
+    assert frames[0].nrow == prostate.nrow and frames[0].names == prostate.names
+    assert frames[1] is None
+    assert cloud.cloud_size == h2o.cluster().cloud_size
+    assert h2o.aio.connection().session_id == h2o.connection().session_id
+
+
+if __name__ == "__main__":
+    pyunit_utils.standalone_test(aio_test)
+else:
+    aio_test()
@@ -0,0 +1,62 @@
+from __future__ import print_function
+import sys
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+from h2o.exceptions import H2OValueError
+import numpy as np
+
+
+def as_numpy():
+    iris = h2o.import_file(path=pyunit_utils.locate("smalldata/iris/iris_wheader.csv"))
+    expected = h2o.as_list(iris, use_pandas=False)[1:]
+    levels = iris.levels()[4]
+
+    # A dict of 1-D arrays in the natural types, with the domains of the categorical columns apart
+    data, domains = iris.as_numpy()
+    assert sorted(data) == sorted(iris.names)
+    assert domains == {"class": levels}
+    assert data["sepal_len"].dtype == np.float64
+    assert data["class"].dtype == np.int32
+    assert np.allclose(data["petal_wid"], [float(row[3]) for row in expected])
+    assert [levels[c] for c in data["class"]] == [row[4] for row in expected]
+
+    # A 2-D array of the selected columns
+    X, domains = iris.as_numpy(cols=["sepal_len", "class"], dtype="float32")
+    assert X.shape == (150, 2) and X.dtype == np.float32
+    assert X.flags["C_CONTIGUOUS"]
+    assert np.allclose(X[:, 0], [float(row[0]) for row in expected])
+    assert X[:, 1].tolist() == [levels.index(row[4]) for row in expected]
+
+    X, _ = iris.as_numpy(cols=[4], dtype=object, enum_as="levels")
+    assert X[:, 0].tolist() == [row[4] for row in expected]
+    try:
+        iris.as_numpy(cols="class", dtype="float64", enum_as="levels")
+        assert False, "levels cannot be stored as floats"
+    except H2OValueError:
+        pass
+
+    # Missing values
+    fr = h2o.H2OFrame({"num": [1.5, 2, 3], "int": [1, 2, 3], "cat": ["a", "c", "b"], "str": ["x", "y", "z"]},
+                      column_types={"num": "real", "int": "int", "cat": "enum", "str": "string"})
+    fr[1, :] = None
+    data, domains = fr.as_numpy(enum_as="levels")
+    print(data)
+    assert np.isnan(data["num"][1]) and np.isnan(data["int"][1])
+    assert data["cat"].tolist() == ["a", None, "b"]
+    assert data["str"].tolist() == ["x", None, "z"]
+    X, _ = fr.as_numpy(cols=["int", "cat"], dtype="float64")
+    assert np.isnan(X[1]).all() and not np.isnan(X[[0, 2]]).any()
+    data, _ = fr.as_numpy(cols="cat")
+    assert data["cat"][1] == -1
+    try:
+        fr.as_numpy(cols="int", dtype="int64")
+        assert False, "missing values cannot be stored as ints"
+    except H2OValueError:
+        pass
+
+
+if __name__ == "__main__":
+    pyunit_utils.standalone_test(as_numpy)
+else:
+    as_numpy()
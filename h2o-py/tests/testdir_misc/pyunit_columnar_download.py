@@ -0,0 +1,65 @@
+from __future__ import print_function
+import sys
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+from io import StringIO
+import numpy as np
+import pandas as pd
+
+
+def columnar_download():
+    """as_data_frame(columnar=True) downloads frames in a binary columnar format; it must agree with the CSV download."""
+    for path in ["smalldata/iris/iris_wheader.csv", "smalldata/jira/citibike_head.csv"]:
+        fr = h2o.import_file(pyunit_utils.locate(path))
+        df = fr.as_data_frame(columnar=True)
+        expected = pd.read_csv(StringIO(fr.get_frame_data()), low_memory=False)
+        # By default the frame is still downloaded as CSV, with the column types chosen by pandas
+        assert fr.as_data_frame().equals(expected)
+        print(df.dtypes)
+        assert list(df.columns) == fr.names
+        assert df.shape == (fr.nrow, fr.ncol)
+        for name, ftype in fr.types.items():
+            if ftype == "enum":
+                assert df[name].dtype.name == "category"
+                assert list(df[name].cat.categories) == fr.levels()[fr.names.index(name)]
+                assert df[name].astype(object).where(df[name].notnull(), None).tolist() == \
+                    expected[name].astype(str).where(expected[name].notnull(), None).tolist()
+            elif ftype == "time":
+                assert df[name].dtype.kind == "M"
+                assert (df[name].astype("int64") // 10**6 == expected[name]).all()
+            elif ftype in ("int", "real"):
+                assert np.allclose(df[name].values.astype(float), expected[name].values.astype(float), equal_nan=True)
+
+    # Missing values in each kind of column
+    fr = h2o.H2OFrame({"num": [1.5, 2, 3], "int": [1, 2, 3], "cat": ["a", "c", "b"], "str": ["x", "y", "z"]},
+                      column_types={"num": "real", "int": "int", "cat": "enum", "str": "string"})
+    fr[1, :] = None
+    df = fr.as_data_frame(columnar=True)
+    print(df)
+    assert df["num"].isnull().tolist() == [False, True, False]
+    assert df["int"].isnull().tolist() == [False, True, False]
+    assert df["cat"].isnull().tolist() == [False, True, False]
+    assert df["str"].tolist()[0] == "x" and df["str"].isnull().tolist()[1]
+
+    # The column types come with the data, so they are now known to the frame without a further request
+    lazy = fr[["num", "cat"]]
+    df = lazy.as_data_frame(columnar=True)
+    assert lazy._ex._cache.types_valid()
+    assert lazy.types == {"num": "real", "cat": "enum"}
+
+    # Stale column types held locally do not apply to data encoded otherwise
+    lazy._ex._cache.types = {"num": "time", "cat": "enum"}
+    fr._ex._cache.types = {"num": "enum", "int": "time", "cat": "time", "str": "enum"}
+    df = fr.as_data_frame(columnar=True)
+    assert df["num"].dtype.kind == "f" and df["num"][0] == 1.5
+    assert df["int"].dtype.kind == "f" and df["int"][2] == 3
+    assert df["cat"].dtype.name == "category" and df["str"][0] == "x"
+    df = lazy.as_data_frame(columnar=True)
+    assert df["num"].dtype.kind == "f" and df["num"][2] == 3
+
+
+if __name__ == "__main__":
+    pyunit_utils.standalone_test(columnar_download)
+else:
+    columnar_download()
@@ -0,0 +1,76 @@
+from __future__ import print_function
+import sys
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+import gzip
+import os
+import shutil
+import tempfile
+import numpy as np
+import pandas as pd
+
+
+def compressed_transfers():
+    """With compression on, uploads are gzipped on the fly and the frames are downloaded gzipped."""
+    conn = h2o.connection()
+    request = conn._session.request
+    sent = []
+    def recording_request(method, url, **kwargs):
+        body = kwargs.get("data")
+        if hasattr(body, "__next__") or hasattr(body, "next"):
+            blocks = list(body)
+            sent.append(b"".join(blocks))
+            kwargs["data"] = iter(blocks)
+        resp = request(method, url, **kwargs)
+        sent.append(resp.headers.get("Content-Encoding"))
+        return resp
+    conn._session.request = recording_request
+    path = pyunit_utils.locate("smalldata/iris/iris_wheader.csv")
+    tmpdir = tempfile.mkdtemp()
+    try:
+        expected = h2o.upload_file(path).as_data_frame()
+        assert conn.compression is False  # off unless asked for
+        assert "gzip" not in sent and not any(b"\x1f\x8b" in body for body in sent if isinstance(body, bytes))
+
+        conn.compression = True
+        del sent[:]
+        fr = h2o.upload_file(path)
+        gzipped = [body for body in sent if isinstance(body, bytes)]
+        assert len(gzipped) == 1 and b"\r\n\r\n\x1f\x8b" in gzipped[0], gzipped
+        assert fr.as_data_frame().equals(expected)
+        assert "gzip" in sent
+
+        # Files compressed already are sent as they are
+        gz = os.path.join(tmpdir, "iris.csv.gz")
+        with open(path, "rb") as f, gzip.open(gz, "wb") as out:
+            out.write(f.read())
+        del sent[:]
+        fr = h2o.upload_file(gz)
+        with open(gz, "rb") as f:
+            assert f.read() in [body for body in sent if isinstance(body, bytes)][0]
+        assert fr.as_data_frame().equals(expected)
+
+        df = pd.DataFrame({"x": np.arange(1000) / 8.0, "s": ["v%d" % (i % 7) for i in range(1000)]})
+        fr = h2o.H2OFrame(df)
+        assert fr.as_data_frame(columnar=True).equals(df[["x", "s"]].astype({"s": "category"}))
+        saved = os.path.join(tmpdir, "saved.csv")
+        h2o.download_csv(fr, saved)
+        assert pd.read_csv(saved).equals(fr.as_data_frame())
+        assert [len(block) for block in fr.iter_chunks(rows=300)] == [300, 300, 300, 100]
+
+        conn.compression = False
+        del sent[:]
+        fr = h2o.H2OFrame(df)
+        assert fr.as_data_frame().shape == (1000, 2)
+        assert "gzip" not in sent and not any(b"\x1f\x8b" in body for body in sent if isinstance(body, bytes))
+    finally:
+        conn.compression = False
+        conn._session.request = request
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    pyunit_utils.standalone_test(compressed_transfers)
+else:
+    compressed_transfers()
@@ -0,0 +1,42 @@
+from __future__ import print_function
+import sys
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+
+
+def deferred_removal():
+    conn = h2o.connection()
+    iris = h2o.import_file(path=pyunit_utils.locate("smalldata/iris/iris_wheader.csv"))
+    conn.flush_removals()
+    flushes = conn.removal_flushes_count
+
+    # Evaluated temporaries are queued when collected, not removed one request at a time
+    temps = [iris["sepal_len"] + i for i in range(20)]
+    h2o.evaluate(temps)
+    ids = [fr.frame_id for fr in temps]
+    requests = conn.requests_count
+    del temps
+    assert conn.requests_count == requests
+    # The 20 frames, and the iris["sepal_len"] column they share (a temporary as well, see h2o.evaluate)
+    assert conn.removal_queue_depth == 21, conn.removal_queue_depth
+    assert conn.removal_flushes_count == flushes
+
+    # A full queue is removed with one request, just before the next regular request
+    old_batch_size = conn.removal_batch_size
+    conn.removal_batch_size = 20
+    try:
+        assert iris.nrow == 150
+        h2o.api("GET /3/Cloud")
+    finally:
+        conn.removal_batch_size = old_batch_size
+    assert conn.removal_queue_depth == 0
+    assert conn.removal_flushes_count == flushes + 1
+    frames = {fr["frame_id"]["name"] for fr in h2o.api("GET /3/Frames")["frames"]}
+    assert not frames.intersection(ids), frames.intersection(ids)
+
+
+if __name__ == "__main__":
+    pyunit_utils.standalone_test(deferred_removal)
+else:
+    deferred_removal()
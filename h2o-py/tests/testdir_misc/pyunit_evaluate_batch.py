@@ -0,0 +1,48 @@
+from __future__ import print_function
+import sys
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+
+
+def evaluate_batch():
+    iris = h2o.import_file(path=pyunit_utils.locate("smalldata/iris/iris_wheader.csv"))
+
+    with pyunit_utils.recording_rapids() as sent:
+        # h2o.evaluate(): several frames, one request, shared parent computed once
+        scaled = iris["sepal_len"] * 10
+        derived = [scaled + i for i in range(5)] + [scaled.log()]
+        h2o.evaluate(derived)
+        assert len(sent) == 1, sent
+        print(sent[0])
+        assert sent[0].startswith("(, ")
+        assert sent[0].count("(* ") == 1, sent[0]
+        assert all(fr.frame_id is not None for fr in derived)
+        for i in range(5):
+            assert abs(derived[i].max() - (iris["sepal_len"].max() * 10 + i)) < 1e-10
+
+        # Shapes are known for all frames without further requests: the frame whose number of rows cannot be
+        # derived on the client is the one described by the response
+        del sent[:]
+        filtered = iris[iris["sepal_len"] > 5, :]
+        shifted = [iris["sepal_len"] + i for i in range(3)]
+        h2o.evaluate([filtered] + shifted)
+        requests = h2o.connection().requests_count
+        assert filtered.shape == (118, 5), filtered.shape
+        assert all(fr.shape == (150, 1) for fr in shifted)
+        assert h2o.connection().requests_count == requests
+
+        # h2o.deferred_evaluation(): frames created within the block are computed on exit
+        del sent[:]
+        with h2o.deferred_evaluation():
+            ratio = iris["petal_len"] / 2
+            big = ratio > 1
+            small = ratio <= 1
+        assert len(sent) == 1, sent
+        assert big.sum() + small.sum() == iris.nrow
+
+
+if __name__ == "__main__":
+    pyunit_utils.standalone_test(evaluate_batch)
+else:
+    evaluate_batch()
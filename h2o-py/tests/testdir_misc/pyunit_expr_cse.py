@@ -0,0 +1,44 @@
+from __future__ import print_function
+import sys
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+
+
+def expr_cse():
+    iris = h2o.import_file(path=pyunit_utils.locate("smalldata/iris/iris_wheader.csv"))
+
+    with pyunit_utils.recording_rapids() as sent:
+        # The same mask computed three times should be sent over to the cluster only once
+        mask = (iris["sepal_len"] > 5) & (iris["sepal_len"] > 5) | (iris["sepal_len"] > 5)
+        assert mask.sum() == (iris["sepal_len"] > 5).sum()
+        rapids_str = [s for s in sent if "sepal_len" in s][0]
+        print(rapids_str)
+        assert rapids_str.count("(> ") == 1, rapids_str
+        assert rapids_str.count("tmp=") >= 1, rapids_str
+
+        # Standardization: both uses of (x - x.mean()) share one temporary
+        del sent[:]
+        x = iris["petal_len"]
+        mu = x.mean()[0]
+        z = (x - mu) * (x - mu)
+        z.refresh()
+        rapids_str = sent[-1]
+        print(rapids_str)
+        assert rapids_str.count("(- ") == 1, rapids_str
+        assert z.nrow == iris.nrow
+
+        # Random number generators must never be merged
+        del sent[:]
+        r = iris[0].runif(seed=-1) - iris[0].runif(seed=-1)
+        r.refresh()
+        rapids_str = sent[-1]
+        print(rapids_str)
+        assert rapids_str.count("h2o.runif") == 2, rapids_str
+        assert r.max() != 0
+
+
+if __name__ == "__main__":
+    pyunit_utils.standalone_test(expr_cse)
+else:
+    expr_cse()
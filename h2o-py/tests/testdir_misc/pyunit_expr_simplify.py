@@ -0,0 +1,104 @@
+from __future__ import print_function
+import sys
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+from h2o.expr import ExprNode
+from h2o.frame import H2OFrame
+
+
+def expr_simplify():
+    iris = h2o.import_file(path=pyunit_utils.locate("smalldata/iris/iris_wheader.csv"))
+    other = h2o.import_file(path=pyunit_utils.locate("smalldata/iris/iris_wheader.csv"))
+    mask = iris["sepal_len"] > 5
+    mask.refresh()
+
+    def assigned():
+        fr = h2o.deep_copy(iris, "iris_copy")
+        fr[0] = other["sepal_len"] * 2
+        fr[1] = other["sepal_wid"] + 1
+        fr[2] = 5
+        fr[3] = 5
+        return fr
+
+    # (expression, Rapids before optimisation, Rapids after optimisation); "IRIS", "OTHER", "MASK" and "COPY" stand
+    # for the ids of the corresponding frames
+    corpus = [
+        (lambda: iris[:, [1, 2, 3, 4]][mask, :][:, 0:2],
+         "(cols_py (rows (cols_py IRIS [1 2 3 4]) MASK) [0:2])",
+         "(rows (cols_py IRIS [1 2]) MASK)"),
+        (lambda: iris[["sepal_len", "sepal_wid", "petal_len"]][["petal_len", "sepal_len"]],
+         "(cols_py (cols_py IRIS ['sepal_len' 'sepal_wid' 'petal_len']) ['petal_len' 'sepal_len'])",
+         "(cols_py IRIS ['petal_len' 'sepal_len'])"),
+        (lambda: iris[1:4][[0, 2]][1],
+         "(cols_py (cols_py (cols_py IRIS [1:3]) [0 2]) 1)",
+         "(cols_py IRIS 3)"),
+        (lambda: iris[0:100, :][10:50, :],  # a slice of a slice stays a slice
+         "(rows (rows IRIS [0:100]) [10:40])",
+         "(rows IRIS [10:40])"),
+        (lambda: ((iris["sepal_len"] > 5) * 1 + 0).log(),
+         "(log (+ (* (> (cols_py IRIS 'sepal_len') 5) 1) 0))",
+         "(log (> (cols_py IRIS 'sepal_len') 5))"),
+        (lambda: iris["sepal_len"] * 1 + 0,  # a numeric column by its type, at the root
+         "(+ (* (cols_py IRIS 'sepal_len') 1) 0)",
+         "(cols_py IRIS 'sepal_len')"),
+        (lambda: (~~(iris["sepal_len"] > 5)).log(),  # negation renames the column: double negation must stay
+         "(log (!! (!! (> (cols_py IRIS 'sepal_len') 5))))",
+         "(log (!! (!! (> (cols_py IRIS 'sepal_len') 5))))"),
+        (lambda: iris[~~(iris["sepal_len"] > 5), :],  # ... unless only used as a mask
+         "(rows IRIS (!! (!! (> (cols_py IRIS 'sepal_len') 5))))",
+         "(rows IRIS (> (cols_py IRIS 'sepal_len') 5))"),
+        (lambda: (~~(iris["sepal_len"] > 5)).ifelse(1, 0),
+         "(ifelse (!! (!! (> (cols_py IRIS 'sepal_len') 5))) 1 0)",
+         "(ifelse (> (cols_py IRIS 'sepal_len') 5) 1 0)"),
+        (lambda: (~~iris["sepal_len"]).log(),  # not a boolean column: double negation must stay
+         "(log (!! (!! (cols_py IRIS 'sepal_len'))))",
+         "(log (!! (!! (cols_py IRIS 'sepal_len'))))"),
+        (lambda: H2OFrame._expr(ExprNode("*", iris["sepal_len"], ExprNode("^", 2, 3))),
+         "(* (cols_py IRIS 'sepal_len') (^ 2 3))",
+         "(* (cols_py IRIS 'sepal_len') 8)"),
+        (lambda: H2OFrame._expr(ExprNode("*", iris["sepal_len"], ExprNode("^", -8, 0.5))),  # NaN: left to the server
+         "(* (cols_py IRIS 'sepal_len') (^ -8 0.5))",
+         "(* (cols_py IRIS 'sepal_len') (^ -8 0.5))"),
+        (assigned,
+         "(:= (:= (:= (:= COPY (* (cols_py OTHER 'sepal_len') 2) 0 []) (+ (cols_py OTHER 'sepal_wid') 1) 1 []) "
+         "5 2 []) 5 3 [])",
+         "(:= (:= COPY (cbind (* (cols_py OTHER 'sepal_len') 2) (+ (cols_py OTHER 'sepal_wid') 1)) [0 1] []) "
+         "5 [2 3] [])"),
+    ]
+    names = {iris.frame_id: "IRIS", other.frame_id: "OTHER", mask.frame_id: "MASK", "iris_copy": "COPY"}
+
+    def rapids_str(fr):
+        res = fr._ex._get_ast_str(False)
+        for frame_id, name in names.items():
+            res = res.replace(frame_id, name)
+        return res
+
+    for i, (make_expr, before, after) in enumerate(corpus):
+        fr = make_expr()
+        raw = fr._ex._get_ast_str(False)
+        assert rapids_str(fr) == before, "Expected %s, got %s" % (before, rapids_str(fr))
+        ExprNode._simplify([fr._ex])
+        assert rapids_str(fr) == after, "Expected %s, got %s" % (after, rapids_str(fr))
+        # The optimised expression must produce the same data as the original one
+        h2o.rapids("(assign unoptimized_%d %s)" % (i, raw))
+        expected_data = h2o.as_list(h2o.get_frame("unoptimized_%d" % i), use_pandas=False)
+        assert h2o.as_list(fr, use_pandas=False) == expected_data
+
+    # Identity operations on columns that are not numeric stay
+    fr = iris["class"] * 1
+    ExprNode._simplify([fr._ex])
+    assert rapids_str(fr) == "(* (cols_py IRIS 'class') 1)", rapids_str(fr)
+
+    # The nodes cut out of the DAG no longer hold the nodes that replace them, which are then not made temps (even
+    # while the cut nodes are still alive, as they may be in a reference cycle)
+    for fr, pos in [(iris[~~(iris["sepal_len"] > 5), :], 1), ((iris["sepal_len"] * 1 + 0).log(), 0)]:
+        cut = fr._ex._children[pos]
+        ExprNode._optimize([fr._ex])
+        assert cut._children is None and "tmp=" not in fr._ex._get_ast_str(False), fr._ex._get_ast_str(False)
+
+
+if __name__ == "__main__":
+    pyunit_utils.standalone_test(expr_simplify)
+else:
+    expr_simplify()
@@ -39,6 +39,18 @@ def test_h2oconnectionconf():
     cconf4 = H2OConnectionConf(conf4)
     assert cconf4.url == 'https://localhost:54321/cluster_4'
 
+    # Verify connection pool settings
+    conf5 = { 'ip': 'localhost', 'port': 54321, 'pool_connections': 2, 'pool_maxsize': 32, 'keep_alive': False}
+    cconf5 = H2OConnectionConf(conf5)
+    assert cconf5.pool_connections == 2
+    assert cconf5.pool_maxsize == 32
+    assert cconf5.keep_alive is False
+    assert H2OConnectionConf(conf1).keep_alive is True
+
+    session = H2OConnection._make_session(pool_maxsize=32, keep_alive=False)
+    assert session.get_adapter("http://localhost:54321/")._pool_maxsize == 32
+    assert session.headers["Connection"] == "close"
+
     # Verify URL pattern
     assert_url_pattern("http://localhost:54321", "http", "localhost", "54321", None)
     assert_url_pattern("http://localhost:54322/", "http", "localhost", "54322", None)
@@ -0,0 +1,41 @@
+from __future__ import print_function
+import sys
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+import numpy as np
+import pandas as pd
+
+
+def iter_chunks():
+    # Several chunks on the server, so that blocks start and end in the middle of the chunks
+    fr = h2o.H2OFrame({"x": list(range(2500)), "y": ["a", "b", "c", "d", "e"] * 500},
+                      column_types={"x": "int", "y": "enum"})
+    fr = fr.rbind(fr).rbind(fr)
+    expected = fr.as_data_frame(columnar=True)
+
+    with pyunit_utils.recording_rapids() as sent:
+        blocks = list(fr.iter_chunks(rows=700))
+    assert not sent, "no frames should be created for the blocks"
+    assert [len(df) for df in blocks] == [700] * 10 + [500]
+    assert blocks[3].index[0] == 2100
+    assert pd.concat(blocks).equals(expected)
+
+    blocks = list(fr.iter_chunks(rows=5000, as_="numpy"))
+    assert len(blocks) == 2
+    data, domains = blocks[1]
+    assert domains == {"y": ["a", "b", "c", "d", "e"]}
+    assert np.array_equal(data["x"], np.arange(5000, 7500) % 2500)
+    assert np.array_equal(data["y"], np.arange(5000, 7500) % 5)
+
+    # Stopping early
+    for df in fr.iter_chunks(rows=100):
+        break
+    assert len(df) == 100
+    assert list(fr.iter_chunks(rows=10**6))[0].shape == (7500, 2)
+
+
+if __name__ == "__main__":
+    pyunit_utils.standalone_test(iter_chunks)
+else:
+    iter_chunks()
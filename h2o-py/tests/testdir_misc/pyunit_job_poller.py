@@ -0,0 +1,82 @@
+from __future__ import print_function
+import sys
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+from concurrent.futures import wait
+from h2o.estimators.deeplearning import H2ODeepLearningEstimator
+from h2o.estimators.gbm import H2OGradientBoostingEstimator
+from h2o.exceptions import H2OConnectionError, H2OJobCancelled, H2OResponseError
+from h2o.job import H2OJob
+
+
+def job_poller():
+    """The shared poller refreshes all the running jobs from one listing per tick."""
+    iris = h2o.import_file(pyunit_utils.locate("smalldata/iris/iris_wheader.csv"))
+    conn = h2o.connection()
+    request = conn.request
+    endpoints = []
+    def recording_request(endpoint, *args, **kwargs):
+        endpoints.append(endpoint)
+        return request(endpoint, *args, **kwargs)
+    conn.request = recording_request
+    try:
+        models = [H2OGradientBoostingEstimator(ntrees=20 + 10 * i, max_depth=3) for i in range(8)]
+        for m in models:
+            m.start(x=list(range(4)), y=4, training_frame=iris)
+        completed = []
+        futures = [m._job.future(callback=completed.append) for m in models]
+        done, pending = wait(futures, timeout=300)
+        assert not pending
+        assert [f.result() for f in futures] == [m._job for m in models]
+        assert sorted(job.job_key for job in completed) == sorted(m._job.job_key for m in models)
+        assert all(job.status == "DONE" and job.progress == 1 for job in completed)
+        assert not any(e.startswith("GET /3/Jobs/") for e in endpoints), endpoints
+        assert 0 < endpoints.count("GET /3/Jobs") < 8 * 20, endpoints
+        for m in models:
+            m.join()
+        assert [m.ntrees for m in models] == [20 + 10 * i for i in range(8)]
+
+        # Cancelling the future cancels the job on the server
+        dl = H2ODeepLearningEstimator(epochs=1e6, hidden=[200, 200])
+        dl.start(x=list(range(4)), y=4, training_frame=iris)
+        future = dl._job.future()
+        assert future.cancel()
+        try:
+            dl.join()
+            assert False, "the job should have been cancelled"
+        except H2OJobCancelled:
+            pass
+        assert "POST /3/Jobs/%s/cancel" % dl._job.job_key in endpoints
+        assert not h2o.job.H2OJobPoller.shared().jobs
+
+        # Transient errors only delay the polling; only the jobs that keep failing fail
+        failures = {"GET /3/Jobs": 3}
+        def failing_request(endpoint, *args, **kwargs):
+            if failures.get(endpoint, 0) > 0:
+                failures[endpoint] -= 1
+                raise H2OConnectionError("Unexpected HTTP error")
+            return recording_request(endpoint, *args, **kwargs)
+        conn.request = failing_request
+        gbm = H2OGradientBoostingEstimator(ntrees=5)
+        gbm.start(x=list(range(4)), y=4, training_frame=iris)
+        assert gbm._job.future().result(timeout=120).status == "DONE"
+        assert failures["GET /3/Jobs"] == 0
+
+        poller = h2o.job.H2OJobPoller()
+        poller.MAX_ERRORS = 3
+        lost = H2OJob({"job": {"key": {"name": "no_such_job"}, "status": "RUNNING", "progress": 0,
+                               "dest": {"name": "no_such_model"}}}, "GBM")
+        lost_future = poller.submit(lost)
+        gbm = H2OGradientBoostingEstimator(ntrees=5)
+        gbm.start(x=list(range(4)), y=4, training_frame=iris)
+        assert poller.submit(gbm._job).result(timeout=120).status == "DONE"
+        assert isinstance(lost_future.exception(timeout=60), H2OResponseError)
+    finally:
+        conn.request = request
+
+
+if __name__ == "__main__":
+    pyunit_utils.standalone_test(job_poller)
+else:
+    job_poller()
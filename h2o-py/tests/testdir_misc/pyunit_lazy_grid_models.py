@@ -0,0 +1,94 @@
+from __future__ import print_function
+import sys
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+import threading
+import time
+from h2o.estimators.gbm import H2OGradientBoostingEstimator
+from h2o.grid.grid_search import H2OGridSearch, _GridModels
+
+
+def lazy_grid_models():
+    """The models of a grid are fetched concurrently when accessed, and shared by the sorted copies of the grid."""
+    prostate = h2o.import_file(pyunit_utils.locate("smalldata/prostate/prostate.csv"))
+    prostate["CAPSULE"] = prostate["CAPSULE"].asfactor()
+
+    conn = h2o.connection()
+    request = conn.request
+    fetched = []
+    in_flight = [0, 0]
+    lock = threading.Lock()
+    def recording_request(endpoint, *args, **kwargs):
+        if not endpoint.startswith("GET /3/Models/"): return request(endpoint, *args, **kwargs)
+        with lock:
+            fetched.append(endpoint.split("/")[-1])
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+        try:
+            time.sleep(0.05)
+            return request(endpoint, *args, **kwargs)
+        finally:
+            with lock:
+                in_flight[0] -= 1
+    conn.request = recording_request
+    max_workers = _GridModels.max_workers
+    threads = threading.active_count()
+    try:
+        _GridModels.max_workers = 3
+        grid = H2OGridSearch(H2OGradientBoostingEstimator(seed=1),
+                             hyper_params={"ntrees": [1, 3, 5], "max_depth": [2, 3, 4]}, grid_id="lazy_grid")
+        grid.train(x=list(range(2, 9)), y="CAPSULE", training_frame=prostate)
+        assert len(grid) == 9
+        assert set(fetched) == {grid.model_ids[0]}, "only the first model should have been fetched"
+
+        # Sorting uses the summary table of the grid only
+        del fetched[:]
+        by_auc = grid.get_grid(sort_by="auc", decreasing=True)
+        by_logloss = grid.get_grid(sort_by="logloss")
+        assert fetched == [], fetched
+        aucs = by_auc.sorted_metric_table()["auc"].astype(float).tolist()
+        assert aucs == sorted(aucs, reverse=True)
+        assert sorted(by_auc.model_ids) == sorted(grid.model_ids)
+
+        # Iterating fetches the models concurrently, and each model only once
+        auc = by_auc.auc()
+        assert sorted(set(fetched)) == sorted(set(grid.model_ids) - {grid.model_ids[0]})
+        assert 1 < in_flight[1] <= 3, in_flight
+        assert [m.model_id for m in by_auc] == by_auc.model_ids
+        assert [auc[m] for m in by_auc.model_ids] == sorted(auc.values(), reverse=True)
+        del fetched[:]
+        assert by_logloss[0] is by_auc[by_auc.model_ids.index(by_logloss.model_ids[0])]
+        assert by_logloss.logloss() == grid.logloss()
+        assert fetched == [], fetched
+
+        # The threads fetching the models end with the fetches
+        for _ in range(50):
+            if threading.active_count() <= threads: break
+            time.sleep(0.1)
+        assert threading.active_count() <= threads, threading.enumerate()
+
+        # The models of the grid are a list
+        models = by_auc.models
+        assert isinstance(models, list) and models is by_auc.models and fetched == []
+        assert models[1:3] == by_auc[1:3] == list(by_auc)[1:3]
+        assert models[:2] + models[2:] == models
+        models.sort(key=lambda m: m.model_id)
+        assert [m.model_id for m in models] == sorted(grid.model_ids)
+        resorted = by_auc.get_grid(sort_by="auc", decreasing=True)
+        assert resorted[0] is by_auc.get_grid(sort_by="auc", decreasing=True).models[0] and fetched == []
+
+        # Grids obtained from the server are lazy too
+        del fetched[:]
+        loaded = h2o.get_grid("lazy_grid")
+        assert sorted(loaded.hyper_params["ntrees"]) == [1, 3, 5]
+        assert len(set(fetched)) == 9 and loaded.auc() == grid.auc()
+    finally:
+        conn.request = request
+        _GridModels.max_workers = max_workers
+
+
+if __name__ == "__main__":
+    pyunit_utils.standalone_test(lazy_grid_models)
+else:
+    lazy_grid_models()
@@ -0,0 +1,102 @@
+from __future__ import print_function
+import sys
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+import json
+import pickle
+from h2o.estimators.gbm import H2OGradientBoostingEstimator
+from h2o.estimators.glm import H2OGeneralizedLinearEstimator
+from h2o.h2o import _model_from_json
+from h2o.model.model_base import _fetch_model_json
+
+
+def lazy_model_json():
+    """The heavy sections of the models' JSON are fetched from the server when they are first accessed."""
+    prostate = h2o.import_file(pyunit_utils.locate("smalldata/prostate/prostate.csv"))
+    prostate["CAPSULE"] = prostate["CAPSULE"].asfactor()
+    gbm = H2OGradientBoostingEstimator(ntrees=10, nfolds=3, seed=1)
+    gbm.train(x=list(range(2, 9)), y="CAPSULE", training_frame=prostate, validation_frame=prostate)
+    glm = H2OGeneralizedLinearEstimator(family="binomial")
+    glm.train(x=list(range(2, 9)), y="CAPSULE", training_frame=prostate)
+
+    conn = h2o.connection()
+    request = conn.request
+    requests = []
+    def recording_request(endpoint, *args, **kwargs):
+        requests.append(endpoint)
+        return request(endpoint, *args, **kwargs)
+    conn.request = recording_request
+    try:
+        for trained in [gbm, glm]:
+            full = _model_from_json(trained.model_id, h2o.api("GET /3/Models/%s" % trained.model_id)["models"][0])
+            for model in [trained, h2o.get_model(trained.model_id)]:
+                report = model.memory_report()
+                assert report["summary"] > 0
+                assert report["scoring_history"] is None, report
+                assert report["training_metrics/thresholds_and_metric_scores"] is None, report
+
+                # The summary metrics are there already
+                del requests[:]
+                assert model.auc() == full.auc() and model.logloss() == full.logloss()
+                assert model.is_cross_validated() == full.is_cross_validated()
+                assert requests == [], requests
+
+                # Each heavy section is fetched on first access, then kept
+                assert model.roc() == full.roc()
+                assert model.scoring_history().equals(full.scoring_history())
+                assert len(requests) == 2, requests
+                assert model.roc() == full.roc() and len(requests) == 2
+                report = model.memory_report()
+                assert report["training_metrics/thresholds_and_metric_scores"] > 0
+                assert report["scoring_history"] > 0
+                assert report["training_metrics/gains_lift_table"] is None
+
+                assert str(model.confusion_matrix()) == str(full.confusion_matrix())
+                assert str(model.gains_lift()) == str(full.gains_lift())
+                if model.algo == "glm":
+                    assert model.coef() == full.coef() and model.coef_norm() == full.coef_norm()
+                else:
+                    assert model.varimp() == full.varimp()
+                    assert model.auc(valid=True, xval=True) == full.auc(valid=True, xval=True)
+                    assert model.roc(xval=True) == full.roc(xval=True)
+                    assert str(model.cross_validation_metrics_summary()) == \
+                        str(full.cross_validation_metrics_summary())
+
+        # Models of a known algo and category are fetched in one request, the others in two
+        del requests[:]
+        h2o.get_model(gbm.model_id)
+        assert len(requests) == 2, requests
+        del requests[:]
+        model_json = _fetch_model_json(gbm.model_id, algo="gbm", category="Binomial")
+        assert len(requests) == 1, requests
+        output = model_json["output"]
+        assert output._pending == {"scoring_history", "cross_validation_metrics_summary", "variable_importances"}
+
+        # The pending sections stay pending through pickling, and are fetched one by one by the iterations
+        output = pickle.loads(pickle.dumps(output))
+        assert output._pending == model_json["output"]._pending
+        del requests[:]
+        assert list(output) == list(model_json["output"]) and requests == []
+        try:
+            json.dumps(output)
+            assert False, "the pending sections should not be silently dropped"
+        except TypeError:
+            pass
+        full = h2o.api("GET /3/Models/%s" % gbm.model_id)["models"][0]["output"]
+        del requests[:]
+        items = iter(output.items())
+        for key, value in items:
+            if key == "scoring_history": break
+        assert len(requests) == 1 and str(value) == str(full["scoring_history"])
+        values = dict(output.items())
+        assert len(requests) == 3 and not output._pending, requests
+        assert {k: str(v) for k, v in values.items()} == {k: str(v) for k, v in full.items()}
+    finally:
+        conn.request = request
+
+
+if __name__ == "__main__":
+    pyunit_utils.standalone_test(lazy_model_json)
+else:
+    lazy_model_json()
@@ -0,0 +1,89 @@
+from __future__ import print_function
+import sys
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+import threading
+import time
+from concurrent.futures import CancelledError
+from h2o.estimators.deeplearning import H2ODeepLearningEstimator
+from h2o.estimators.gbm import H2OGradientBoostingEstimator
+
+
+def model_executor():
+    """The executor keeps at most max_concurrent builds running, and starts them in the order of priorities."""
+    iris = h2o.import_file(pyunit_utils.locate("smalldata/iris/iris_wheader.csv"))
+    conn = h2o.connection()
+    request = conn.request
+    started = []
+    threads = set()
+    max_running = [0]
+    def recording_request(endpoint, data=None, *args, **kwargs):
+        res = request(endpoint, data, *args, **kwargs)
+        if endpoint == "POST /3/ModelBuilders/gbm":
+            started.append(data["model_id"])
+        if endpoint.startswith("POST /3/ModelBuilders/") or endpoint.startswith("GET /3/Models/"):
+            threads.add(threading.current_thread().name)
+        if endpoint == "GET /3/Jobs":
+            ours = [j for j in res["jobs"] if j["dest"]["name"].startswith("executor_") and j["status"] == "RUNNING"]
+            max_running[0] = max(max_running[0], len(ours))
+        return res
+    conn.request = recording_request
+    try:
+        executor = h2o.ModelExecutor(max_concurrent=2)
+        futures = [executor.submit(H2OGradientBoostingEstimator(ntrees=20 + 10 * i, max_depth=3), x=list(range(4)),
+                                   y=4, training_frame=iris, model_id="executor_%d" % i)
+                   for i in range(6)]
+        assert executor.running == 2 and executor.queued == 4
+        models = [f.result(timeout=300) for f in futures]
+        assert [m.model_id for m in models] == ["executor_%d" % i for i in range(6)]
+        assert [m.ntrees for m in models] == [20 + 10 * i for i in range(6)]
+        assert max_running[0] <= 2 and executor.running == 0
+        # The builds are started and their models fetched on the executor's thread, not on the job poller's
+        assert threads == {"ModelExecutor"}, threads
+
+        # Builds of higher priority are started first; cancelled builds are not started at all
+        del started[:]
+        with h2o.ModelExecutor(max_concurrent=1) as executor:
+            first = executor.submit(H2OGradientBoostingEstimator(ntrees=50), x=list(range(4)), y=4,
+                                    training_frame=iris, model_id="executor_first")
+            low = executor.submit(H2OGradientBoostingEstimator(ntrees=5), x=list(range(4)), y=4,
+                                  training_frame=iris, model_id="executor_low")
+            cancelled = executor.submit(H2OGradientBoostingEstimator(ntrees=5), priority=5, x=list(range(4)), y=4,
+                                        training_frame=iris, model_id="executor_cancelled")
+            high = executor.submit(H2OGradientBoostingEstimator(ntrees=5), priority=10, x=list(range(4)), y=4,
+                                   training_frame=iris, model_id="executor_high")
+            assert cancelled.cancel()
+        assert started == ["executor_first", "executor_high", "executor_low"], started
+        assert all(f.result().model_id for f in [first, low, high])
+
+        # Cancelling a running build cancels its job; failed builds resolve with their exceptions
+        executor = h2o.ModelExecutor(max_concurrent=1)
+        estimator = H2ODeepLearningEstimator(epochs=1e6, hidden=[200, 200])
+        dl = executor.submit(estimator, x=list(range(4)), y=4, training_frame=iris)
+        bad = executor.submit(H2OGradientBoostingEstimator(), x=list(range(4)), y="no_such_column",
+                              training_frame=iris)
+        assert executor.running == 1
+        assert dl.cancel()
+        try:
+            dl.result()
+            assert False, "the build should have been cancelled"
+        except CancelledError:
+            pass
+        assert bad.exception(timeout=60) is not None
+        executor.shutdown()
+        assert executor.running == 0
+        job = estimator._job
+        for _ in range(100):
+            job._update_from_json(h2o.api("GET /3/Jobs/%s" % job.job_key))
+            if job.status not in {"RUNNING", "CANCEL_PENDING"}: break
+            time.sleep(0.2)
+        assert job.status == "CANCELLED", job.status
+    finally:
+        conn.request = request
+
+
+if __name__ == "__main__":
+    pyunit_utils.standalone_test(model_executor)
+else:
+    model_executor()
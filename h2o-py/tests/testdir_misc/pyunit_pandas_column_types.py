@@ -0,0 +1,48 @@
+from __future__ import print_function
+import sys
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+import numpy as np
+import pandas as pd
+
+
+def pandas_column_types():
+    """The types of the columns uploaded from pandas and numpy follow from their dtypes."""
+    n = 200
+    df = pd.DataFrame({
+        "i": np.arange(n, dtype=np.int32),
+        "f": np.arange(n) / 2.0,
+        "whole": np.arange(n, dtype=float),
+        "b": np.arange(n) % 2 == 0,
+        "c": pd.Categorical(np.array(["lo", "mid", "hi"])[np.arange(n) % 3]),
+        "t": pd.date_range("2017-01-01", periods=n, freq="h"),
+        "id": ["%06d" % i for i in range(n)],
+        "label": ["abc"[i % 3] for i in range(n)],
+        "objint": pd.Series(list(range(n)), dtype=object),
+    }, columns=["i", "f", "whole", "b", "c", "t", "id", "label", "objint"])
+    df.loc[3, "label"] = None
+
+    fr = h2o.H2OFrame(df)
+    assert fr.types == {"i": "int", "f": "real", "whole": "int", "b": "enum", "c": "enum", "t": "time",
+                        "id": "string", "label": "enum", "objint": "int"}, fr.types
+    # The identifiers that look like numbers stay as they were
+    assert fr[1, "id"] == "000001"
+    assert fr["label"].isna().sum() == 1
+
+    # Explicit types take precedence
+    fr = h2o.H2OFrame(df, column_types={"id": "enum", "i": "real"})
+    assert fr.type("id") == "enum" and fr.type("label") == "enum"
+    fr = h2o.H2OFrame(df[["id", "i"]], column_types=["enum", None])
+    assert fr.types == {"id": "enum", "i": "int"}, fr.types
+
+    fr = h2o.H2OFrame(np.array([["x%d" % i, str(i)] for i in range(n)], dtype=object))
+    assert fr.types == {"C1": "string", "C2": "string"}, fr.types
+    fr = h2o.H2OFrame(np.arange(12).reshape(4, 3))
+    assert set(fr.types.values()) == {"int"}
+
+
+if __name__ == "__main__":
+    pyunit_utils.standalone_test(pandas_column_types)
+else:
+    pandas_column_types()
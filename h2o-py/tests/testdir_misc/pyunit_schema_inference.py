@@ -0,0 +1,68 @@
+from __future__ import print_function
+import sys
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+from h2o.frame import H2OFrame
+
+
+def check_inferred(label, fr):
+    """Every part of the schema inferred on the client must agree with the evaluated frame."""
+    cache = fr._ex._cache
+    nrows, ncols, names, types = cache.nrows, cache.ncols, cache.names, cache.types
+    print("%-24s %s" % (label, (nrows, ncols, names, types)))
+    evaluated = H2OFrame.get_frame(fr.frame_id)
+    if nrows >= 0: assert nrows == evaluated.nrows, (label, nrows, evaluated.nrows)
+    if ncols >= 0: assert ncols == evaluated.ncols, (label, ncols, evaluated.ncols)
+    if names is not None: assert names == evaluated.names, (label, names, evaluated.names)
+    if types is not None: assert types == evaluated.types, (label, types, evaluated.types)
+
+
+def schema_inference():
+    conn = h2o.connection()
+    iris = h2o.import_file(path=pyunit_utils.locate("smalldata/iris/iris_wheader.csv"))
+    iris["petal_int"] = (iris["petal_len"] * 10).round()
+    iris.refresh()
+
+    requests = conn.requests_count
+    exprs = [
+        ("columns", iris[["sepal_len", "class"]]),
+        ("column slice", iris[1:3]),
+        ("rows", iris[10:20, :]),
+        ("row filter", iris[iris["sepal_len"] > 5, :]),
+        ("int arithmetic", iris["petal_int"] * 2 + 1),
+        ("division", iris["petal_int"] / 3),
+        ("comparison", iris[:4] > 2),
+        ("column broadcast", iris["sepal_len"] - iris[:4]),
+        ("row broadcast", iris[:4] - iris[0, :4]),
+        ("not", (iris["sepal_len"] > 5).logical_negation()),
+        ("log", iris["sepal_len"].log()),
+        ("ifelse", (iris["sepal_len"] > 5).ifelse(1, 0)),
+        ("asfactor", iris["petal_int"].asfactor()),
+        ("cbind", iris["sepal_len"].cbind(iris[["petal_wid", "class"]])),
+        ("rbind", iris[:10, :].rbind(iris[20:30, :])),
+        ("group by", iris.group_by("class").mean(["sepal_len", "petal_len"]).count().get_frame()),
+    ]
+    pipeline = iris[["sepal_len", "sepal_wid", "petal_int"]]
+    pipeline["ratio"] = pipeline["sepal_len"] / pipeline["sepal_wid"]
+    pipeline["flag"] = pipeline["petal_int"] > 20
+    pipeline["petal_int"] = pipeline["petal_int"] - 1
+    pipeline[pipeline["flag"] == 1, "petal_int"] = 0
+    exprs.append(("pipeline", pipeline))
+
+    # Validation that only needs the structure of the frames does not evaluate them
+    assert pipeline.ncols == 5
+    assert pipeline.names[-2:] == ["ratio", "flag"]
+    assert exprs[12][1].type("petal_int") == "enum"
+    assert exprs[1][1].names == ["sepal_wid", "petal_len"]
+    assert exprs[8][1]._ex._cache.nrows == -1, "broadcasting rows is left to the server"
+    assert conn.requests_count == requests, "schema inference should not contact the server"
+
+    for label, fr in exprs:
+        check_inferred(label, fr)
+
+
+if __name__ == "__main__":
+    pyunit_utils.standalone_test(schema_inference)
+else:
+    schema_inference()
@@ -0,0 +1,60 @@
+from __future__ import print_function
+import sys
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+from h2o.estimators.glm import H2OGeneralizedLinearEstimator
+
+
+def frame_keys():
+    return {fr["frame_id"]["name"] for fr in h2o.api("GET /3/Frames")["frames"]}
+
+
+def scope():
+    iris = h2o.import_file(path=pyunit_utils.locate("smalldata/iris/iris_wheader.csv"))
+    before = frame_keys()
+
+    with h2o.scope() as s:
+        scaled = iris[:4] * 10
+        scaled.refresh()
+        train, test = iris.split_frame([0.8], seed=1)
+        model = H2OGeneralizedLinearEstimator()
+        model.train(x=["sepal_wid", "petal_len"], y="sepal_len", training_frame=train)
+        preds = model.predict(test)
+        kept = scaled + 1
+        s.keep([kept, model])
+
+    print("Removed %d keys, %d bytes freed" % (len(s.removed), s.bytes_freed))
+    assert scaled.frame_id in s.removed
+    assert preds.frame_id in s.removed
+    assert model.model_id not in s.removed
+    assert s.bytes_freed > 0
+    remaining = frame_keys()
+    assert not remaining.intersection(s.removed)
+    assert before <= remaining
+    assert kept.frame_id in remaining
+    assert kept.nrow == 150 and abs(kept.max() - (iris[:4].max() * 10 + 1)) < 1e-8
+    assert h2o.get_model(model.model_id) is not None
+
+    # A lazy frame created before the block is not removed, even if it is computed within the block
+    pre = iris["sepal_len"] * 2
+    with h2o.scope() as s:
+        pre.refresh()
+    assert pre.frame_id not in s.removed
+    assert pre.frame_id in frame_keys()
+    assert pre.max() == iris["sepal_len"].max() * 2
+
+    # Nested scopes: keys kept by the inner scope are removed by the outer one
+    with h2o.scope() as outer:
+        with h2o.scope() as inner:
+            tmp = iris["sepal_len"] + 1
+            tmp.refresh()
+            inner.keep(tmp)
+        assert inner.removed == []
+    assert tmp.frame_id in outer.removed
+
+
+if __name__ == "__main__":
+    pyunit_utils.standalone_test(scope)
+else:
+    scope()
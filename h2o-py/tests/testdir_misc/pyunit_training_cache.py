@@ -0,0 +1,76 @@
+from __future__ import print_function
+import sys
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+import os
+import shutil
+import tempfile
+from h2o.estimators.gbm import H2OGradientBoostingEstimator
+
+
+def training_cache():
+    """With the training cache enabled, the models built from the same data with the same parameters are reused."""
+    tmpdir = tempfile.mkdtemp()
+    conn = h2o.connection()
+    request = conn.request
+    builds = []
+    def recording_request(endpoint, *args, **kwargs):
+        if endpoint.startswith("POST /3/ModelBuilders/"): builds.append(endpoint)
+        return request(endpoint, *args, **kwargs)
+    conn.request = recording_request
+    try:
+        path = pyunit_utils.locate("smalldata/iris/iris_wheader.csv")
+        iris = h2o.import_file(path)
+        index = os.path.join(tmpdir, "models.json")
+        h2o.enable_training_cache(index, max_models=2)
+
+        gbm = H2OGradientBoostingEstimator(ntrees=5, seed=1)
+        gbm.train(x=list(range(4)), y=4, training_frame=iris)
+        assert len(builds) == 1
+        # The same data in another frame, and the asynchronous builds, reuse the model too
+        again = H2OGradientBoostingEstimator(ntrees=5, seed=1)
+        again.train(x=list(range(4)), y=4, training_frame=h2o.upload_file(path))
+        started = H2OGradientBoostingEstimator(ntrees=5, seed=1)
+        started.start(x=list(range(4)), y=4, training_frame=iris)
+        started.join()
+        assert len(builds) == 1, builds
+        assert again.model_id == started.model_id == gbm.model_id
+        assert again.logloss() == gbm.logloss()
+
+        # Other parameters and other data give other models; force trains the model anyway
+        other = H2OGradientBoostingEstimator(ntrees=6, seed=1)
+        other.train(x=list(range(4)), y=4, training_frame=iris)
+        other.train(x=list(range(3)), y=4, training_frame=iris)
+        other.train(x=list(range(4)), y=4, training_frame=iris[:100, :])
+        assert len(builds) == 4
+        forced = H2OGradientBoostingEstimator(ntrees=6, seed=1)
+        forced.train(x=list(range(3)), y=4, training_frame=iris, force=True)
+        assert len(builds) == 5 and forced.model_id != other.model_id
+
+        # The index keeps the cache for the later sessions; at most max_models are kept
+        h2o.enable_training_cache(index, max_models=2)
+        reused = H2OGradientBoostingEstimator(ntrees=6, seed=1)
+        reused.train(x=list(range(3)), y=4, training_frame=iris)
+        assert len(builds) == 5 and reused.model_id == forced.model_id
+        gbm.train(x=list(range(4)), y=4, training_frame=iris)
+        assert len(builds) == 6, "the first model should have been evicted"
+
+        # Models removed from the cluster are built again
+        h2o.remove(reused.model_id)
+        reused.train(x=list(range(3)), y=4, training_frame=iris)
+        assert len(builds) == 7
+
+        h2o.disable_training_cache()
+        reused.train(x=list(range(3)), y=4, training_frame=iris)
+        assert len(builds) == 8
+    finally:
+        conn.request = request
+        h2o.disable_training_cache()
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    pyunit_utils.standalone_test(training_cache)
+else:
+    training_cache()
@@ -0,0 +1,58 @@
+from __future__ import print_function
+import sys
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+import os
+import shutil
+import tempfile
+import pandas as pd
+
+
+def upload_cache():
+    """With the upload cache enabled, the frames uploaded from unchanged sources are reused."""
+    tmpdir = tempfile.mkdtemp()
+    try:
+        path = os.path.join(tmpdir, "data.csv")
+        shutil.copy(pyunit_utils.locate("smalldata/iris/iris_wheader.csv"), path)
+        index = os.path.join(tmpdir, "index.json")
+
+        h2o.enable_upload_cache(index)
+        fr = h2o.upload_file(path)
+        assert h2o.upload_file(path).frame_id == fr.frame_id
+        assert h2o.upload_file(path).dim == [150, 5]
+        assert h2o.upload_file(path, col_types={"class": "string"}).frame_id != fr.frame_id
+
+        # The index keeps the cache for the later sessions
+        h2o.enable_upload_cache(index)
+        assert h2o.upload_file(path).frame_id == fr.frame_id
+
+        # Modified sources, and frames modified or removed on the server, are uploaded again
+        with open(path, "a") as f:
+            f.write("5.0,3.0,1.5,0.5,Iris-setosa\n")
+        fr2 = h2o.upload_file(path)
+        assert fr2.frame_id != fr.frame_id and fr2.nrow == 151
+        h2o.rapids("(assign %s (rows %s [0:10]))" % (fr2.frame_id, fr2.frame_id))
+        fr3 = h2o.upload_file(path)
+        assert fr3.frame_id != fr2.frame_id and fr3.nrow == 151
+        h2o.remove(fr3)
+        assert h2o.upload_file(path).nrow == 151
+
+        df = pd.DataFrame({"a": [1.5, 2.5, None], "b": ["x", "y", "z"], "c": pd.Categorical(["u", "v", "u"])})
+        fr = h2o.H2OFrame(df)
+        assert h2o.H2OFrame(df.copy()).frame_id == fr.frame_id
+        assert h2o.H2OFrame(df, column_names=["A", "B", "C"]).frame_id != fr.frame_id
+        df.loc[1, "b"] = "w"
+        assert h2o.H2OFrame(df).frame_id != fr.frame_id
+
+        h2o.disable_upload_cache()
+        assert h2o.H2OFrame(df).frame_id != h2o.H2OFrame(df).frame_id
+    finally:
+        h2o.disable_upload_cache()
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    pyunit_utils.standalone_test(upload_cache)
+else:
+    upload_cache()
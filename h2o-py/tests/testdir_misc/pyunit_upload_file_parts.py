@@ -0,0 +1,59 @@
+from __future__ import print_function
+import sys
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+import os
+import shutil
+import tempfile
+import importlib
+from h2o.exceptions import H2OValueError
+
+
+def upload_file_parts():
+    """Parts of large files, and lists of files, are uploaded concurrently and parsed into a single frame."""
+    frame = importlib.import_module("h2o.frame")  # the module, rather than the h2o.frame() function
+    path = pyunit_utils.locate("smalldata/iris/iris_wheader.csv")
+    expected = h2o.upload_file(path).as_data_frame()
+
+    part_size = frame._UPLOAD_PART_SIZE
+    frame._UPLOAD_PART_SIZE = 1000
+    try:
+        parts = frame._split_file(path, frame._UPLOAD_PART_SIZE)
+        assert len(parts) > 3, parts
+        with open(path, "rb") as f:
+            data = f.read()
+        assert b"".join(data[start:end] for _, start, end in parts) == data
+        assert all(data[end - 1:end] == b"\n" for _, _, end in parts)
+
+        fr = h2o.upload_file(path, threads=3)
+        assert fr.as_data_frame().equals(expected)
+    finally:
+        frame._UPLOAD_PART_SIZE = part_size
+
+    # The rows of the files follow each other in the order of the sorted names, each file having its own header
+    tmpdir = tempfile.mkdtemp()
+    try:
+        lines = data.decode("utf-8").splitlines(True)
+        for i, start in enumerate(range(1, len(lines), 40)):
+            with open(os.path.join(tmpdir, "part-%d.csv" % i), "w") as f:
+                f.write(lines[0])
+                f.writelines(lines[start:start + 40])
+        for source in [tmpdir, os.path.join(tmpdir, "part-*.csv"),
+                       [os.path.join(tmpdir, "part-0.csv"), os.path.join(tmpdir, "part-[123].csv")]]:
+            fr = h2o.upload_file(source)
+            assert fr.as_data_frame().equals(expected), source
+
+        try:
+            h2o.upload_file(os.path.join(tmpdir, "*.txt"))
+            assert False, "an empty glob should be rejected"
+        except H2OValueError:
+            pass
+    finally:
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    pyunit_utils.standalone_test(upload_file_parts)
+else:
+    upload_file_parts()
@@ -0,0 +1,62 @@
+from __future__ import print_function
+import sys
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+import tempfile
+import numpy as np
+import pandas as pd
+from h2o.utils import shared_utils
+
+
+def upload_python_streaming():
+    """Python objects are streamed to the server in blocks of CSV, without a temporary file."""
+    def no_temp_file(*args, **kwargs):
+        raise AssertionError("no temporary file should be created")
+    mkstemp = tempfile.mkstemp
+    tempfile.mkstemp = no_temp_file
+    try:
+        n = shared_utils._UPLOAD_BLOCK_ROWS * 2 + 7
+        df = pd.DataFrame({"f": np.arange(n) / 4.0, "i": np.arange(n),
+                           "c": pd.Categorical(np.array(["a", "b", "c"])[np.arange(n) % 3]),
+                           "s": ["x%d" % i for i in range(n)]})
+        df.loc[5, "f"] = np.nan
+        df.loc[6, "c"] = np.nan
+        df.loc[7, "s"] = None
+        fr = h2o.H2OFrame(df)
+        assert fr.dim == [n, 4], fr.dim
+        assert fr.names == ["f", "i", "c", "s"]
+        assert fr.isna().sum(axis=0, return_frame=True).as_data_frame().values.tolist() == [[1, 0, 1, 1]]
+        back = fr.as_data_frame(columnar=True)
+        assert np.allclose(back["f"].values, df["f"].values, equal_nan=True)
+        assert (back["i"].values == df["i"].values).all()
+        assert back["s"].tolist()[-1] == "x%d" % (n - 1)
+
+        arr = np.arange(12.0).reshape(4, 3)
+        arr[1, 1] = np.nan
+        fr = h2o.H2OFrame(arr)
+        assert fr.dim == [4, 3]
+        assert fr.isna().sum() == 1
+        assert fr[3, 2] == 11
+
+        fr = h2o.H2OFrame([[1, "a, b"], [2, None]])
+        assert fr.dim == [2, 2]
+        assert fr[0, 1] == "a, b"
+
+        # The NA of the nullable dtypes is a missing value, not the text "<NA>"
+        if hasattr(pd, "Int64Dtype") and hasattr(pd, "BooleanDtype") and hasattr(pd, "StringDtype"):
+            df = pd.DataFrame({"i": pd.array([1, None, 3], dtype="Int64"),
+                               "b": pd.array([True, False, None], dtype="boolean"),
+                               "s": pd.array([None, "y", "z"], dtype="string")})
+            fr = h2o.H2OFrame(df)
+            assert fr.types == {"i": "int", "b": "enum", "s": "string"}, fr.types
+            assert fr.isna().as_data_frame().values.tolist() == [[0, 0, 1], [1, 0, 0], [0, 1, 0]]
+            assert fr[0, "i"] == 1 and fr[2, "i"] == 3 and fr[2, "s"] == "z"
+    finally:
+        tempfile.mkstemp = mkstemp
+
+
+if __name__ == "__main__":
+    pyunit_utils.standalone_test(upload_python_streaming)
+else:
+    upload_python_streaming()
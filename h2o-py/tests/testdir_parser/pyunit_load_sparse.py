@@ -36,6 +36,21 @@ def test_load_sparse():
     assert fr.as_data_frame(False) == [['C1', 'C2', 'C3', 'C4'], ['3', '0', '1', '0'], ['0', '2', '0', '0'],
                                        ['0', '0', '0', '0'], ['0', '0', '0', '1']]
 
+    # Uploaded in several blocks, with duplicate entries, explicit zeros and empty rows
+    from h2o.utils import shared_utils
+    block_nonzeros = shared_utils._UPLOAD_BLOCK_NONZEROS
+    shared_utils._UPLOAD_BLOCK_NONZEROS = 5
+    try:
+        rows = [i % 20 for i in range(0, 90, 3)] + [1, 1]
+        cols = [(i * 7) % 6 for i in range(0, 90, 3)] + [5, 5]
+        vals = [i % 4 for i in range(0, 90, 3)] + [2, 3]
+        C = sp.coo_matrix((vals, (rows, cols)), shape=(25, 6))
+        fr = h2o.H2OFrame(C)
+        assert fr.shape == (25, 6)
+        assert [[float(v) for v in row] for row in fr.as_data_frame(False)[1:]] == C.toarray().tolist()
+    finally:
+        shared_utils._UPLOAD_BLOCK_NONZEROS = block_nonzeros
+
 if __name__ == "__main__":
     pyunit_utils.standalone_test(test_load_sparse)
 else:
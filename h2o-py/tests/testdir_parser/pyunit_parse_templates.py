@@ -0,0 +1,96 @@
+from __future__ import print_function
+import sys
+sys.path.insert(1,"../../")
+import h2o
+from tests import pyunit_utils
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from h2o.frame import _find_parse_template
+
+
+def parse_templates():
+    """A saved parse setup is reused for the files matching its pattern, unless their layout differs."""
+    tmpdir = tempfile.mkdtemp()
+    conn = h2o.connection()
+    request = conn.request
+    endpoints = []
+    def recording_request(endpoint, *args, **kwargs):
+        endpoints.append(endpoint)
+        return request(endpoint, *args, **kwargs)
+    conn.request = recording_request
+    try:
+        with open(pyunit_utils.locate("smalldata/iris/iris_wheader.csv"), "rb") as f:
+            lines = f.read().splitlines(True)
+        def write(name, data, opener=open):
+            with opener(os.path.join(tmpdir, name), "wb") as f:
+                f.write(b"".join(data))
+            return os.path.join(tmpdir, name)
+        day1 = write("daily_1.csv", lines)
+        day2 = write("daily_2.csv", lines[:1] + lines[51:])
+        day3 = write("daily_3.csv.gz", lines[:101], gzip.open)
+        wider = write("daily_4.csv", [line.rstrip(b"\r\n") + b",x\n" for line in lines])
+        other = write("other.csv", lines[:11])
+        templates = os.path.join(tmpdir, "templates.json")
+
+        setup = h2o.parse_setup(h2o.lazy_import(day1), column_types={"class": "string", "sepal_len": "enum"})
+        h2o.save_parse_template(setup, "daily_*", templates)
+
+        with open(templates) as f:
+            assert "chunk_size" not in json.load(f)[0]["setup"]
+
+        # The imported files are checked against the guess of the server, which also sizes their chunks
+        del endpoints[:]
+        fr = h2o.import_file(day2, parse_templates=templates)
+        assert endpoints.count("POST /3/ParseSetup") == 1, endpoints
+        assert fr.dim == [100, 5], fr.dim
+        assert fr.names == ["sepal_len", "sepal_wid", "petal_len", "petal_wid", "class"]
+        assert fr.types == {"sepal_len": "enum", "sepal_wid": "real", "petal_len": "real", "petal_wid": "real",
+                            "class": "string"}, fr.types
+
+        del endpoints[:]
+        fr = h2o.upload_file(day3, parse_templates=templates)
+        assert "POST /3/ParseSetup" not in endpoints, endpoints
+        assert fr.dim == [100, 5] and fr.types["class"] == "string"
+
+        # Files on the cluster are checked against the template through the guess of the server
+        template = _find_parse_template(templates, [day1])
+        setup = h2o.parse_setup(h2o.lazy_import(day2), template=template)
+        assert setup["column_types"][4].lower() == '"string"' and setup["chunk_size"] > 0, setup
+        setup = h2o.parse_setup(h2o.lazy_import(wider), template=template)
+        assert setup["number_columns"] == 6 and setup["column_types"][4].lower() == '"enum"', setup["column_types"]
+
+        # Explicit options still apply on top of the template
+        fr = h2o.upload_file(day2, col_types={"sepal_len": "real"}, parse_templates=templates)
+        assert fr.types["sepal_len"] == "real" and fr.types["class"] == "string"
+
+        # Files of a different layout, or not matching any pattern, have their setup guessed
+        for path, dim in [(wider, [150, 6]), (other, [10, 5])]:
+            del endpoints[:]
+            fr = h2o.upload_file(path, parse_templates=templates)
+            assert "POST /3/ParseSetup" in endpoints, endpoints
+            assert fr.dim == dim and fr.types["class"] == "enum", (fr.dim, fr.types)
+
+        # Templates rejected by the server are dropped for its guess
+        with open(templates) as f:
+            broken = json.load(f)
+        broken[0]["setup"]["column_types"][0] = "bogus"
+        with open(templates, "w") as f:
+            json.dump(broken, f)
+        fr = h2o.upload_file(day2, parse_templates=templates)
+        assert fr.dim == [100, 5] and fr.types["class"] == "enum", (fr.dim, fr.types)
+
+        # A template replaces the one with the same pattern
+        h2o.save_parse_template(h2o.parse_setup(h2o.lazy_import(day1)), "daily_*", templates)
+        assert h2o.import_file(day2, parse_templates=templates).types["class"] == "enum"
+    finally:
+        conn.request = request
+        shutil.rmtree(tmpdir)
+
+
+if __name__ == "__main__":
+    pyunit_utils.standalone_test(parse_templates)
+else:
+    parse_templates()